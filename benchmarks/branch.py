@@ -0,0 +1,87 @@
+"""Branch and bound benchmark.
+
+Builds random multi-dimensional knapsack problems, with a mix of binary
+and general integer variables, and solves each by branch and bound with
+every branching rule, solving the nodes' relaxations with the dense
+engine from scratch and with the dual engine warm started from each
+parent's basis.  Reports the nodes solved, the time taken and node
+throughput, the simplex iterations per node, and the objective and gap
+reached within the node limit.
+
+    python benchmarks/branch.py [SIZE ...]
+"""
+
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import numpy as np
+from lpsolve import ir
+from lpsolve.branch import BranchAndBound, BRANCHING
+from lpsolve.presolve import to_standard_form
+from lpsolve.solve import ENGINES
+
+DEFAULT_SIZES   = [10, 20, 30]
+NODE_LIMIT      = 2000
+ITERATION_LIMIT = 5000
+STARTS          = [("dense", False), ("dual", True)]
+
+
+def build(size, seed=0):
+    """Build a random knapsack problem with size columns and size // 2
+    rows, half of the columns binary and half general integers"""
+
+    rng  = np.random.default_rng(seed)
+    rows = max(size // 2, 1)
+    A = rng.integers(1, 20, size=(rows, size)).astype(float)
+
+    problem = ir.LPProblem()
+    binary  = np.arange(size) % 2 == 0
+    problem.add_variables([f"x{j}" for j in range(size)], upper_bounds=np.where(binary, 1.0, 5.0),
+                          binary=binary, integer=~binary)
+    problem.set_objective_coefficients(A.sum(axis=0) * rng.uniform(0.5, 1.5, size), True)
+    problem.add_constraints(A, "<=", A.sum(axis=1) * rng.uniform(0.3, 0.6, rows))
+    return to_standard_form(problem)
+
+
+def relaxation(engine, warm, iterations):
+    """Return a function that solves a node's relaxation with the engine,
+    from its parent's basis if warm, counting the iterations taken"""
+
+    def relax(problem, basis):
+        tableau = ENGINES[engine](problem, basis=basis) if warm and basis is not None else ENGINES[engine](problem)
+        while tableau.status is None and not tableau.optimal() and iterations[0] < ITERATION_LIMIT * NODE_LIMIT:
+            iterations[0] += 1
+            tableau.pivot("lowest")
+        if tableau.status is None and tableau.optimal():
+            tableau.status = "optimal"
+        basis = tableau.get_basis() if hasattr(tableau, "get_basis") else None
+        return ir.Solution(problem, tableau.get_result(), tableau.status == "optimal",
+                           status=tableau.status or "iteration limit", basis=basis)
+    return relax
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'size':>6} {'engine':>8} {'start':>6} {'branching':>11} {'nodes':>7} {'time':>9} {'nodes/s':>9} "
+          f"{'iter/node':>10} {'objective':>12} {'gap':>8}")
+    for size in sizes:
+        # Quieten to_standard_form, the engines and the search
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        problem = build(size)
+        sys.stdout = stdout
+
+        for engine, warm in STARTS:
+            for branching in BRANCHING:
+                iterations = [0]
+                stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+                search   = BranchAndBound(problem, relaxation(engine, warm, iterations), branching, NODE_LIMIT)
+                solution = search.solve()
+                sys.stdout = stdout
+
+                elapsed, nodes, bound, objective = search.history[-1]
+                gap = search._gap(bound)
+                objective = f"{solution.objective:>12.6g}" if search.incumbent is not None else f"{'-':>12}"
+                print(f"{size:>6} {engine:>8} {'warm' if warm else 'cold':>6} {branching:>11} {nodes:>7} "
+                      f"{elapsed:>8.3f}s {nodes / max(elapsed, 1e-9):>9.1f} {iterations[0] / nodes:>10.1f} "
+                      f"{objective} {gap:>8}")
@@ -0,0 +1,69 @@
+"""Bulk model building benchmark.
+
+Builds random models with an increasing number of non-zeroes through
+LPProblem.add_variables and add_constraints, and reports the time taken to
+build and convert them to standard form.  With --text, also reports the time
+taken to build the same model by writing it as LP text and parsing it back.
+Needs scipy to generate the sparse matrices.
+
+    python benchmarks/bulk_build.py [--text] [NONZEROES ...]
+"""
+
+import io, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import numpy as np
+from lpsolve import ir, parser, writer
+from lpsolve.presolve import to_standard_form
+
+try:
+    import scipy.sparse
+except ImportError:
+    sys.exit("This benchmark needs scipy")
+
+DEFAULT_NONZEROES = [10_000, 100_000, 1_000_000]
+TERMS_PER_ROW     = 5
+ROWS_PER_COLUMN   = 2
+
+
+def build(nonzeroes, seed=0):
+
+    rows    = nonzeroes // TERMS_PER_ROW
+    columns = rows // ROWS_PER_COLUMN
+    rng     = np.random.default_rng(seed)
+    A = scipy.sparse.random(rows, columns, density=nonzeroes / (rows * columns), format="csr", random_state=rng,
+                            data_rvs=lambda n: rng.integers(1, 100, n).astype(float))
+
+    problem = ir.LPProblem()
+    problem.add_variables([f"x{i}" for i in range(columns)], upper_bounds=rng.integers(1, 50, columns))
+    problem.set_objective_coefficients(rng.integers(1, 10, columns).astype(float), True)
+    problem.add_constraints(A, "<=", rng.integers(10, 1000, rows))
+    return problem
+
+
+def benchmark(nonzeroes, text=False):
+
+    start   = time.perf_counter()
+    problem = build(nonzeroes)
+    built   = time.perf_counter() - start
+
+    if text:
+        start = time.perf_counter()
+        fout  = io.StringIO()
+        writer.write_lp(problem, fout)
+        parser.parse_string(fout.getvalue())
+        parsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    to_standard_form(problem)
+    standard = time.perf_counter() - start
+
+    print(f"{nonzeroes:>10} non-zeroes {len(problem.constraints):>8} rows | build {built:>7.2f}s | "
+          f"standard form {standard:>7.2f}s" + (f" | via LP text {parsed:>7.2f}s" if text else ""))
+
+
+if __name__ == "__main__":
+    text  = "--text" in sys.argv[1:]
+    sizes = [int(x) for x in sys.argv[1:] if x != "--text"] or DEFAULT_NONZEROES
+    for size in sizes:
+        benchmark(size, text)
@@ -0,0 +1,81 @@
+"""Cutting plane benchmark.
+
+Builds random knapsack problems over binary variables alone, and the mixed
+binary and general integer ones of benchmarks/branch.py, and solves each
+by branch and bound after 0 to 5 rounds of Gomory and cover cuts at the
+root, then with cover cuts in the tree as well.  Reports the root bound
+after the cuts and how far they moved it, the nodes solved and their
+reduction against no cuts, and the time taken, including cutting.
+
+    python benchmarks/cuts.py [SIZE ...]
+"""
+
+import functools, os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import numpy as np
+from lpsolve import ir
+from lpsolve.branch import BranchAndBound
+from lpsolve.cuts import CuttingPlanes
+from lpsolve.presolve import to_standard_form
+from lpsolve.solve import _run
+from branch import build, relaxation
+
+DEFAULT_SIZES   = [20, 30]
+ROUNDS          = [0, 1, 2, 3, 5]
+TREE_DEPTH      = 5
+ENGINE          = "dual"
+NODE_LIMIT      = 5000
+ITERATION_LIMIT = 5000
+
+
+def build_binary(size, seed=0):
+    """Build a random knapsack problem over size binary columns with
+    size // 10 rows"""
+
+    rng  = np.random.default_rng(seed)
+    rows = max(size // 10, 1)
+    A = rng.integers(5, 30, size=(rows, size)).astype(float)
+
+    problem = ir.LPProblem()
+    problem.add_variables([f"x{j}" for j in range(size)], upper_bounds=1.0, binary=True)
+    problem.set_objective_coefficients(A.sum(axis=0) * rng.uniform(0.5, 1.5, size), True)
+    problem.add_constraints(A, "<=", A.sum(axis=1) * rng.uniform(0.3, 0.5, rows))
+    return to_standard_form(problem)
+
+
+def run(problem, rounds, tree_depth):
+    """Cut and search the problem, returning the root bound after cutting,
+    the bound before, the nodes solved, the time taken and the objective"""
+
+    # Quieten the engines, the cut rounds and the search
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    start  = time.perf_counter()
+    planes = CuttingPlanes(problem, functools.partial(_run, iteration_limit=ITERATION_LIMIT, heuristic="lowest",
+                                                      engine=ENGINE), rounds, tree_depth)
+    cut, basis = planes.run()
+    search   = BranchAndBound(cut, relaxation(ENGINE, True, [0]), "fractional", NODE_LIMIT,
+                              cuts=planes if tree_depth > 0 else None)
+    solution = search.solve(basis)
+    elapsed  = time.perf_counter() - start
+    sys.stdout = stdout
+    return planes.history[-1][5], planes.history[0][5], search.nodes, elapsed, solution.objective
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'problem':>8} {'size':>6} {'rounds':>7} {'tree':>5} {'bound':>12} {'moved':>10} {'nodes':>7} "
+          f"{'reduction':>10} {'time':>9} {'objective':>12}")
+    for kind, builder in (("binary", build_binary), ("mixed", build)):
+        for size in sizes:
+            stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+            problem = builder(size)
+            sys.stdout = stdout
+
+            baseline = None
+            for rounds, tree_depth in [(rounds, 0) for rounds in ROUNDS] + [(ROUNDS[-1], TREE_DEPTH)]:
+                bound, root, nodes, elapsed, objective = run(problem, rounds, tree_depth)
+                baseline = baseline or nodes
+                print(f"{kind:>8} {size:>6} {rounds:>7} {tree_depth:>5} {bound:>12.6g} {bound - root:>10.4g} "
+                      f"{nodes:>7} {1.0 - nodes / baseline:>9.1%} {elapsed:>8.3f}s {objective:>12.6g}")
@@ -0,0 +1,106 @@
+"""Simplex engine benchmark.
+
+Builds random LPs (maximise c.x subject to Ax <= b, x >= 0) of increasing
+size and compares the engines selectable by solve(): the time to build
+each tableau, the time per pivot over the first few pivots and the memory
+held by the tableau (or, for the revised engine, the matrix and factors).
+Problems small enough are also solved to the end by every engine, to check
+that they agree.  The dict of dicts tableau is slow and memory hungry on large
+problems, so is only run up to a limit unless --all is given.
+
+    python benchmarks/engines.py [--all] [SIZE ...]
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import numpy as np
+from lpsolve import ir
+from lpsolve.presolve import to_standard_form
+from lpsolve.solve import ENGINES
+
+DEFAULT_SIZES   = [50, 100, 200, 500, 1000, 2000]
+PIVOTS          = 20
+DENSITY         = 0.05
+DICT_LIMIT      = 500
+FULL_SOLVE      = 200
+ITERATION_LIMIT = 5000
+
+
+def build(size, seed=0):
+    """Build a random problem with size rows and size columns"""
+
+    rng = np.random.default_rng(seed)
+    A = rng.uniform(1, 10, size=(size, size)) * (rng.random((size, size)) < DENSITY)
+    A[np.arange(size), rng.permutation(size)] = rng.uniform(1, 10, size)
+
+    problem = ir.LPProblem()
+    problem.add_variables([f"x{j}" for j in range(size)])
+    problem.set_objective_coefficients(rng.uniform(1, 10, size), True)
+    problem.add_constraints(A, ["<="] * size, rng.uniform(10, 100, size))
+    return to_standard_form(problem)
+
+
+def footprint(tableau):
+    """Return the bytes held by an engine's numeric arrays, or None for the
+    dict of dicts tableau"""
+
+    if hasattr(tableau, "lu"):
+        matrix  = tableau.matrix
+        factors = (tableau.lu.L.nnz + tableau.lu.U.nnz) * 12
+        etas    = sum(others.nbytes + values.nbytes for _, _, others, values in tableau.etas)
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes + factors + etas
+    if hasattr(tableau, "values"):
+        return tableau.table.nbytes
+    return None
+
+
+def run(engine, problem, pivots):
+    """Build a tableau and make up to the given number of pivots, returning
+    the build time, the pivots made, the time they took, the objective if
+    the tableau became optimal and the memory held"""
+
+    start   = time.perf_counter()
+    tableau = ENGINES[engine](problem)
+    built   = time.perf_counter() - start
+
+    start = time.perf_counter()
+    made  = 0
+    while tableau.status is None and not tableau.optimal() and made < pivots:
+        tableau.pivot("lowest")
+        made += 1
+    elapsed = time.perf_counter() - start
+
+    objective = None
+    if tableau.status is None and tableau.optimal():
+        objective = tableau.get_result()[problem.symbols.get(ir.OBJECTIVE_VARIABLE_NAME)]
+    return built, made, elapsed, objective, footprint(tableau)
+
+
+if __name__ == "__main__":
+    run_all = "--all" in sys.argv[1:]
+    sizes   = [int(arg) for arg in sys.argv[1:] if arg != "--all"] or DEFAULT_SIZES
+
+    print(f"{'size':>6} {'engine':>8} {'build':>9} {'per pivot':>11} {'memory':>9} {'solve':>9} {'iterations':>11} {'objective':>12}")
+    for size in sizes:
+        # Quieten to_standard_form and the engines
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        problem = build(size)
+        sys.stdout = stdout
+
+        for engine in ENGINES:
+            if engine == "tableau" and size > DICT_LIMIT and not run_all:
+                print(f"{size:>6} {engine:>8}   (skipped, pass --all to run)")
+                continue
+
+            stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+            built, made, elapsed, _, memory = run(engine, problem, PIVOTS)
+            solved = run(engine, problem, ITERATION_LIMIT) if size <= FULL_SOLVE else None
+            sys.stdout = stdout
+
+            per_pivot = f"{elapsed / made * 1000:>9.2f}ms" if made else f"{'-':>11}"
+            memory    = f"{memory / (1024 * 1024):>7.1f}MB" if memory is not None else f"{'-':>9}"
+            if solved is not None:
+                print(f"{size:>6} {engine:>8} {built:>8.3f}s {per_pivot} {memory} {solved[2]:>8.3f}s {solved[1]:>11} {solved[3]:>12.6g}")
+            else:
+                print(f"{size:>6} {engine:>8} {built:>8.3f}s {per_pivot} {memory} {'-':>9} {'-':>11} {'-':>12}")
@@ -0,0 +1,29 @@
+"""Generators for synthetic LP problems used by the benchmarks."""
+
+import random
+
+
+def lp_text(constraints, variables=None, terms_per_row=5, seed=0):
+    """Return the text of a random CPLEX LP format problem.
+
+    Each constraint row has `terms_per_row` terms over `variables` columns
+    (defaulting to one column per row), with a bounds section constraining
+    every variable to [0, 100] so the problem is bounded."""
+
+    rng       = random.Random(seed)
+    variables = variables or constraints
+
+    lines = ["maximize",
+             " obj: " + " + ".join(f"{rng.randint(1, 20)} x{j}" for j in range(min(variables, 50))),
+             "subject to"]
+    for i in range(constraints):
+        cols  = rng.sample(range(variables), min(terms_per_row, variables))
+        terms = " + ".join(f"{rng.randint(1, 100) / 10} x{j}" for j in cols)
+        lines.append(f" c{i}: {terms} <= {rng.randint(100, 1000)}")
+    lines.append("bounds")
+    for j in range(variables):
+        lines.append(f" 0 <= x{j} <= 100")
+    lines.append("end")
+    lines.append("")
+
+    return "\n".join(lines)
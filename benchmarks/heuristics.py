@@ -0,0 +1,70 @@
+"""Primal heuristics benchmark.
+
+Solves the binary knapsack problems of benchmarks/cuts.py and the mixed
+binary and general integer ones of benchmarks/branch.py by branch and
+bound with no primal heuristics, with each heuristic alone and with all of
+them.  Reports the time and nodes to the first incumbent, its objective
+and its gap to the best objective found, and the total nodes and time.
+The incumbents found over time with every heuristic are listed after each
+problem.
+
+    python benchmarks/heuristics.py [SIZE ...]
+"""
+
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lpsolve.branch import BranchAndBound
+from lpsolve.heuristics import HEURISTICS, PrimalHeuristics
+from branch import build, relaxation
+from cuts import build_binary
+
+DEFAULT_SIZES = [30, 60]
+ENGINE        = "dual"
+NODE_LIMIT    = 2000
+
+
+def run(problem, names):
+    """Search the problem with the named heuristics, returning the search"""
+
+    # Quieten the engines, the heuristics and the search
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    relax  = relaxation(ENGINE, True, [0])
+    search = BranchAndBound(problem, relax, "pseudocost", NODE_LIMIT,
+                            heuristics=PrimalHeuristics(problem, relax, names) if names else None)
+    search.solve()
+    sys.stdout = stdout
+    return search
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    for kind, builder in (("binary", build_binary), ("mixed", build)):
+        for size in sizes:
+            stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+            problem = builder(size)
+            sys.stdout = stdout
+
+            runs = [("none", ())] + [(name, (name,)) for name in HEURISTICS] + [("all", HEURISTICS)]
+            searches = [(label, run(problem, names)) for label, names in runs]
+            best = max((search.incumbent.objective for _, search in searches if search.incumbent is not None),
+                       default=None)
+
+            print(f"{kind} problem, {size} columns")
+            print(f"{'heuristics':>11} {'first':>9} {'at node':>8} {'from':>11} {'objective':>12} {'gap':>8} "
+                  f"{'nodes':>7} {'time':>9}")
+            for label, search in searches:
+                if not search.incumbents:
+                    print(f"{label:>11} {'-':>9} {'-':>8} {'-':>11} {'-':>12} {'-':>8} {search.nodes:>7} "
+                          f"{search.elapsed:>8.3f}s")
+                    continue
+                elapsed, nodes, objective, source = search.incumbents[0]
+                gap = abs(best - objective) / max(abs(best), 1.0)
+                print(f"{label:>11} {elapsed:>8.3f}s {nodes:>8} {source:>11} {objective:>12.6g} {gap:>8.2%} "
+                      f"{search.nodes:>7} {search.elapsed:>8.3f}s")
+
+            print("Incumbents with every heuristic:")
+            for elapsed, nodes, objective, source in searches[-1][1].incumbents:
+                print(f"  {elapsed:>8.3f}s {nodes:>7} nodes {objective:>12.6g}  {source}")
+            print("")
@@ -0,0 +1,84 @@
+"""Interior point benchmark.
+
+Solves the random LPs of benchmarks/engines.py with the simplex engines
+and with the interior point engine, solving its normal equations densely,
+sparsely and by conjugate gradients, with and without crossover to a
+vertex.  Reports the time and iterations each takes, the time the interior
+point engine spends factorising and in crossover, and how far each
+objective is from the revised simplex method's.  The dense tableau engine is
+only run up to a limit, as for benchmarks/engines.py.
+
+    python benchmarks/interior.py [SIZE ...]
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lpsolve import ir
+from lpsolve.interior import InteriorPoint
+from lpsolve.solve import ENGINES
+from engines import build
+
+DEFAULT_SIZES   = [100, 200, 500, 1000]
+SIMPLEX         = ["revised", "dual", "dense"]
+DENSE_LIMIT     = 500
+NORMAL          = ["dense", "sparse", "cg"]
+ITERATION_LIMIT = 10000
+
+
+def solve(tableau, problem):
+    """Pivot a tableau to the end, returning the iterations, the time taken
+    and the objective, or None if it did not become optimal"""
+
+    start = time.perf_counter()
+    iterations = 0
+    while tableau.status is None and not tableau.optimal() and iterations < ITERATION_LIMIT:
+        tableau.pivot("lowest")
+        iterations += 1
+    elapsed = time.perf_counter() - start
+
+    objective = None
+    if tableau.status is None and tableau.optimal():
+        objective = tableau.get_result()[problem.symbols.get(ir.OBJECTIVE_VARIABLE_NAME)]
+    return iterations, elapsed, objective
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'size':>6} {'engine':>18} {'iterations':>11} {'time':>9} {'factorise':>10} {'crossover':>10} "
+          f"{'objective':>14} {'difference':>11}")
+    for size in sizes:
+        # Quieten to_standard_form and the engines
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        problem = build(size)
+        sys.stdout = stdout
+
+        runs = [(engine, lambda engine=engine: ENGINES[engine](problem)) for engine in SIMPLEX
+                if engine != "dense" or size <= DENSE_LIMIT]
+        runs += [(f"interior {normal}{' x' if crossover else ''}",
+                  lambda normal=normal, crossover=crossover: InteriorPoint(problem, normal_equations=normal,
+                                                                           crossover=crossover))
+                 for normal in NORMAL for crossover in (False, True)]
+
+        reference = None
+        for label, make in runs:
+            stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+            start   = time.perf_counter()
+            tableau = make()
+            built   = time.perf_counter() - start
+            iterations, elapsed, objective = solve(tableau, problem)
+            sys.stdout = stdout
+
+            if label == "revised":
+                reference = objective
+            timings = getattr(tableau, "elapsed", None)
+            factorise = f"{timings['factorise']:>9.3f}s" if timings else f"{'-':>10}"
+            crossover = f"{timings['crossover']:>9.3f}s" if timings and tableau.crossover else f"{'-':>10}"
+            if objective is None:
+                print(f"{size:>6} {label:>18} {iterations:>11} {built + elapsed:>8.3f}s {factorise} {crossover} "
+                      f"{'-':>14} {'-':>11}")
+                continue
+            difference = abs(objective - reference) / max(abs(reference), 1.0) if reference is not None else 0.0
+            print(f"{size:>6} {label:>18} {iterations:>11} {built + elapsed:>8.3f}s {factorise} {crossover} "
+                  f"{objective:>14.8g} {difference:>11.2e}")
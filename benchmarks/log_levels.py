@@ -0,0 +1,53 @@
+"""Logging overhead benchmark.
+
+Solves the random LPs of benchmarks/engines.py with solve() at each log
+level, with the messages written to /dev/null, and once more at the
+default level with an iteration callback.  Reports the time each takes
+and the iterations the callback saw, to show what the per-iteration
+messages and tableau dumps cost.
+
+    python benchmarks/log_levels.py [SIZE ...]
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lpsolve import log
+from lpsolve.solve import solve
+from engines import build
+
+DEFAULT_SIZES   = [20, 50, 100]
+ENGINES         = ["tableau", "dense"]
+ITERATION_LIMIT = 5000
+
+
+def run(problem, engine, level, callback=None):
+    """Solve the problem with messages at level going to /dev/null,
+    returning the time taken"""
+
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    log.configure(level)
+    start = time.perf_counter()
+    solve(problem, ITERATION_LIMIT, engine=engine, callback=callback)
+    elapsed = time.perf_counter() - start
+    sys.stdout = stdout
+    return elapsed
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'size':>6} {'engine':>8} " + " ".join(f"{level:>9}" for level in log.LEVELS) +
+          f" {'callback':>9} {'iterations':>11}")
+    for size in sizes:
+        # Quieten to_standard_form
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        problem = build(size)
+        sys.stdout = stdout
+
+        for engine in ENGINES:
+            times = [run(problem, engine, level) for level in log.LEVELS]
+            iterations = []
+            times.append(run(problem, engine, "info", iterations.append))
+            print(f"{size:>6} {engine:>8} " + " ".join(f"{elapsed:>8.3f}s" for elapsed in times) +
+                  f" {len(iterations):>11}")
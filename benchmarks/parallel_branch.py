@@ -0,0 +1,74 @@
+"""Parallel branch and bound benchmark.
+
+Solves a random knapsack problem (see benchmarks/branch.py) by branch and
+bound with node relaxations solved by the dual engine across 1, 2, 4 and 8
+worker processes, both taking nodes as they finish and in the
+deterministic mode.  Reports the nodes solved, the time taken, node
+throughput and the speedup over a single process, and checks that every
+run reaches the same objective.  Speedup depends on the cores available;
+the deterministic mode also waits on slow nodes, so it gains less.
+
+    python benchmarks/parallel_branch.py [SIZE] [PROCESSES ...]
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lpsolve import ir
+from lpsolve.branch import BranchAndBound
+from lpsolve.solve import ENGINES
+from branch import build
+
+DEFAULT_SIZE      = 40
+DEFAULT_PROCESSES = [1, 2, 4, 8]
+ENGINE            = "dual"
+NODE_LIMIT        = 5000
+ITERATION_LIMIT   = 5000
+
+
+def relax(problem, basis):
+    """Solve a node's relaxation from its parent's basis, in whichever
+    process it is sent to"""
+
+    tableau = ENGINES[ENGINE](problem, basis=basis) if basis is not None else ENGINES[ENGINE](problem)
+    iterations = 0
+    while tableau.status is None and not tableau.optimal() and iterations < ITERATION_LIMIT:
+        iterations += 1
+        tableau.pivot("lowest")
+    if tableau.status is None and tableau.optimal():
+        tableau.status = "optimal"
+    return ir.Solution(problem, tableau.get_result(), tableau.status == "optimal",
+                       status=tableau.status or "iteration limit", basis=tableau.get_basis())
+
+
+def run(problem, processes, deterministic):
+    """Search the problem's tree, returning the nodes solved, the time and
+    the objective reached"""
+
+    # Quieten the engines and the search, including in the worker processes
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    start    = time.perf_counter()
+    search   = BranchAndBound(problem, relax, "pseudocost", NODE_LIMIT, processes, deterministic)
+    solution = search.solve()
+    elapsed  = time.perf_counter() - start
+    sys.stdout = stdout
+    return search.nodes, elapsed, solution.objective
+
+
+if __name__ == "__main__":
+    size      = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE
+    processes = [int(arg) for arg in sys.argv[2:]] or DEFAULT_PROCESSES
+
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    problem = build(size)
+    sys.stdout = stdout
+
+    print(f"{size} columns, {os.cpu_count()} cores")
+    print(f"{'processes':>10} {'mode':>14} {'nodes':>7} {'time':>9} {'nodes/s':>9} {'speedup':>8} {'objective':>12}")
+    for deterministic in (False, True):
+        serial = None
+        for count in processes:
+            nodes, elapsed, objective = run(problem, count, deterministic)
+            serial = serial or elapsed
+            print(f"{count:>10} {'deterministic' if deterministic else 'as finished':>14} {nodes:>7} {elapsed:>8.3f}s "
+                  f"{nodes / elapsed:>9.1f} {serial / elapsed:>7.2f}x {objective:>12.6g}")
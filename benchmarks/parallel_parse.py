@@ -0,0 +1,35 @@
+"""Parallel parsing benchmark.
+
+Parses a generated LP file with an increasing number of processes and
+reports the wall time and speedup over a serial parse.
+
+    python benchmarks/parallel_parse.py [CONSTRAINTS] [PROCESSES ...]
+"""
+
+import os, sys, time, tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lpsolve import parser
+from generate import lp_text
+
+DEFAULT_CONSTRAINTS = 200_000
+DEFAULT_PROCESSES   = [1, 2, 4, 8]
+
+
+if __name__ == "__main__":
+    constraints = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CONSTRAINTS
+    processes   = [int(x) for x in sys.argv[2:]] or DEFAULT_PROCESSES
+
+    with tempfile.NamedTemporaryFile("w", suffix=".lp", delete=False) as fout:
+        fout.write(lp_text(constraints))
+
+    print(f"{constraints} constraints, {os.cpu_count()} CPUs available")
+    serial = None
+    for count in processes:
+        start = time.perf_counter()
+        parser.parse_file(fout.name, processes=count)
+        elapsed = time.perf_counter() - start
+        serial  = serial or elapsed
+        print(f"{count:>3} processes: {elapsed:>7.2f}s  speedup {serial / elapsed:>5.2f}x")
+
+    os.unlink(fout.name)
@@ -0,0 +1,60 @@
+"""Parser throughput benchmark.
+
+Generates LP files with an increasing number of constraints and reports the
+throughput of the tokeniser and of the full parse, in MB/s and tokens/s.
+With --memory, also reports the peak memory used by parse_file to stream
+each file from disk.
+
+    python benchmarks/parser_throughput.py [--memory] [SIZE ...]
+"""
+
+import os, sys, time, tempfile, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lpsolve import parser
+from generate import lp_text
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def benchmark(constraints, memory=False):
+
+    text     = lp_text(constraints)
+    megabytes = len(text) / 1e6
+
+    # Tokenise only
+    start    = time.perf_counter()
+    tokens   = 0
+    for section in parser._stream_sections(text.splitlines()):
+        for _ in section.buf.tokens():
+            tokens += 1
+    tokenise_time = time.perf_counter() - start
+
+    # Full parse into the IR
+    start = time.perf_counter()
+    parser.parse_string(text)
+    parse_time = time.perf_counter() - start
+
+    print(f"{constraints:>10} rows {megabytes:>8.2f} MB {tokens:>10} tokens | "
+          f"tokenise {tokenise_time:>7.2f}s {megabytes / tokenise_time:>6.2f} MB/s {tokens / tokenise_time:>10.0f} tokens/s | "
+          f"parse {parse_time:>7.2f}s {megabytes / parse_time:>6.2f} MB/s {tokens / parse_time:>10.0f} tokens/s")
+
+    if memory:
+        with tempfile.NamedTemporaryFile("w", suffix=".lp", delete=False) as fout:
+            fout.write(text)
+        del text
+
+        tracemalloc.start()
+        parser.parse_file(fout.name)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        os.unlink(fout.name)
+
+        print(f"{'':>10}      peak memory streaming from disk: {peak / 1e6:.1f} MB ({peak / (megabytes * 1e6):.2f}x file size)")
+
+
+if __name__ == "__main__":
+    memory = "--memory" in sys.argv[1:]
+    sizes  = [int(x) for x in sys.argv[1:] if x != "--memory"] or DEFAULT_SIZES
+    for size in sizes:
+        benchmark(size, memory)
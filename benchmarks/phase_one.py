@@ -0,0 +1,89 @@
+"""Phase one benchmark.
+
+Builds random feasible LPs in which most rows are equations, the rest
+split between <= and >=, and solves each with the engines selectable by
+solve(), starting both from a crash basis and from slack variables and
+artificial variables alone.  Reports the artificial variables each start
+needed, the iterations spent in phase one and in all, and the time taken.
+
+    python benchmarks/phase_one.py [SIZE ...]
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import numpy as np
+from lpsolve import ir
+from lpsolve.presolve import to_standard_form
+from lpsolve.solve import ENGINES
+
+DEFAULT_SIZES   = [50, 100, 200, 400]
+DENSITY         = 0.05
+EQUATIONS       = 0.7
+DICT_LIMIT      = 100
+ITERATION_LIMIT = 20_000
+
+
+def build(size, seed=0):
+    """Build a random problem with size rows and 2 * size columns, feasible
+    at a random point within the variables' bounds"""
+
+    rng = np.random.default_rng(seed)
+    columns = 2 * size
+    A = rng.uniform(-10, 10, size=(size, columns)) * (rng.random((size, columns)) < DENSITY)
+    A[np.arange(size), rng.permutation(columns)[:size]] = rng.uniform(1, 10, size)
+
+    point     = rng.uniform(0, 5, columns)
+    relations = rng.choice(["=", "<=", ">="], size=size, p=[EQUATIONS, (1 - EQUATIONS) / 2, (1 - EQUATIONS) / 2])
+    constants = A @ point + np.where(relations == "<=", 1, np.where(relations == ">=", -1, 0)) * rng.uniform(0, 10, size)
+
+    problem = ir.LPProblem()
+    problem.add_variables([f"x{j}" for j in range(columns)], upper_bounds=10.0)
+    problem.set_objective_coefficients(rng.uniform(-10, 10, columns), True)
+    problem.add_constraints(A, list(relations), constants)
+    return to_standard_form(problem)
+
+
+def run(engine, problem, crash):
+    """Solve from the given start, returning the artificial variables it
+    needed, the iterations in phase one and in all, the time and the
+    objective"""
+
+    start   = time.perf_counter()
+    tableau = ENGINES[engine](problem, crash=crash)
+    artificials = len(tableau.artificial_rows)
+
+    phase_one = iterations = 0
+    while tableau.status is None and not tableau.optimal() and iterations < ITERATION_LIMIT:
+        phase_one  += tableau.phase == 1
+        iterations += 1
+        tableau.pivot("lowest")
+    elapsed = time.perf_counter() - start
+
+    objective = None
+    if tableau.status is None and tableau.optimal():
+        objective = tableau.get_result()[problem.symbols.get(ir.OBJECTIVE_VARIABLE_NAME)]
+    return artificials, phase_one, iterations, elapsed, objective
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'size':>6} {'engine':>8} {'start':>6} {'artificial':>11} {'phase one':>10} {'iterations':>11} {'time':>9} {'objective':>12}")
+    for size in sizes:
+        # Quieten to_standard_form and the engines
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        problem = build(size)
+        sys.stdout = stdout
+
+        for engine in ENGINES:
+            if engine == "tableau" and size > DICT_LIMIT:
+                continue
+            for crash in (True, False):
+                stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+                artificials, phase_one, iterations, elapsed, objective = run(engine, problem, crash)
+                sys.stdout = stdout
+
+                objective = f"{objective:>12.6g}" if objective is not None else f"{'-':>12}"
+                print(f"{size:>6} {engine:>8} {'crash' if crash else 'slack':>6} {artificials:>11} {phase_one:>10} "
+                      f"{iterations:>11} {elapsed:>8.3f}s {objective}")
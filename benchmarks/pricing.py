@@ -0,0 +1,88 @@
+"""Pricing strategy benchmark.
+
+Builds random feasible LPs, square ones and a wide one with many more
+columns than rows, and solves each with every pricing strategy of the
+dense, revised and dual engines.  Reports the iterations and time each
+took and the objective reached, which should agree between strategies.
+Devex and steepest edge should need the fewest iterations, and partial
+pricing the least time per iteration on the wide problem.
+
+    python benchmarks/pricing.py [SIZE ...]
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import numpy as np
+from lpsolve import ir
+from lpsolve.presolve import to_standard_form
+from lpsolve.pricing import PRICING
+from lpsolve.solve import ENGINES
+
+DEFAULT_SIZES   = [100, 200, 400]
+WIDE_ROWS       = 50
+WIDE_COLUMNS    = 2500
+DENSITY         = 0.05
+ENGINE_NAMES    = ["dense", "revised", "dual"]
+ITERATION_LIMIT = 20_000
+
+
+def build(rows, columns, seed=0):
+    """Build a random problem with the given rows and columns, with a mix
+    of <= and >= rows and bounded variables, feasible at a random point"""
+
+    rng = np.random.default_rng(seed)
+    A = rng.uniform(-10, 10, size=(rows, columns)) * (rng.random((rows, columns)) < DENSITY)
+    A[np.arange(rows), rng.permutation(columns)[:rows]] = rng.uniform(1, 10, rows)
+
+    point     = rng.uniform(0, 5, columns)
+    relations = rng.choice(["<=", ">="], size=rows)
+    constants = A @ point + np.where(relations == "<=", 1, -1) * rng.uniform(0, 10, rows)
+
+    problem = ir.LPProblem()
+    problem.add_variables([f"x{j}" for j in range(columns)], upper_bounds=10.0)
+    problem.set_objective_coefficients(rng.uniform(-10, 10, columns), True)
+    problem.add_constraints(A, list(relations), constants)
+    return to_standard_form(problem)
+
+
+def run(engine, problem, pricing):
+    """Solve with the given strategy, returning the iterations, the time
+    and the objective"""
+
+    start   = time.perf_counter()
+    tableau = ENGINES[engine](problem, pricing=pricing)
+
+    iterations = 0
+    while tableau.status is None and not tableau.optimal() and iterations < ITERATION_LIMIT:
+        iterations += 1
+        tableau.pivot(pricing)
+    elapsed = time.perf_counter() - start
+
+    objective = None
+    if tableau.status is None and tableau.optimal():
+        objective = tableau.get_result()[problem.symbols.get(ir.OBJECTIVE_VARIABLE_NAME)]
+    return iterations, elapsed, objective
+
+
+if __name__ == "__main__":
+    shapes = [(size, size) for size in [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES]
+    shapes.append((WIDE_ROWS, WIDE_COLUMNS))
+
+    print(f"{'rows':>6} {'columns':>8} {'engine':>8} {'pricing':>9} {'iterations':>11} {'time':>9} {'per iter':>10} {'objective':>12}")
+    for rows, columns in shapes:
+        # Quieten to_standard_form and the engines
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        problem = build(rows, columns)
+        sys.stdout = stdout
+
+        for engine in ENGINE_NAMES:
+            for pricing in PRICING:
+                stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+                iterations, elapsed, objective = run(engine, problem, pricing)
+                sys.stdout = stdout
+
+                per_iteration = f"{elapsed / iterations * 1000:>8.2f}ms" if iterations else f"{'-':>10}"
+                objective     = f"{objective:>12.6g}" if objective is not None else f"{'-':>12}"
+                print(f"{rows:>6} {columns:>8} {engine:>8} {pricing:>9} {iterations:>11} {elapsed:>8.3f}s "
+                      f"{per_iteration} {objective}")
@@ -0,0 +1,57 @@
+"""Profiling overhead benchmark.
+
+Solves the random LPs of benchmarks/engines.py with each engine, with
+statistics collection disabled and then enabled, and reports both times,
+and from the enabled run how the time divides between building, pricing,
+ratio tests and pivots, the pivots per second and the peak memory.
+Collection traces memory allocations with tracemalloc, which accounts for
+most of its cost.
+
+    python benchmarks/profiling.py [SIZE ...]
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lpsolve import stats
+from lpsolve.solve import solve
+from engines import build
+
+DEFAULT_SIZES   = [50, 100, 200]
+ENGINES         = ["tableau", "dense", "revised"]
+DICT_LIMIT      = 100
+ITERATION_LIMIT = 5000
+TIMERS          = ["build", "pricing", "ratio_test", "pivot"]
+
+
+def run(problem, engine):
+    """Solve the problem, returning the time taken"""
+
+    start = time.perf_counter()
+    solve(problem, ITERATION_LIMIT, engine=engine)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'size':>6} {'engine':>8} {'disabled':>9} {'enabled':>9} " +
+          " ".join(f"{timer:>10}" for timer in TIMERS) + f" {'pivots/s':>9} {'peak MB':>8}")
+    for size in sizes:
+        # Quieten to_standard_form
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        problem = build(size)
+        sys.stdout = stdout
+
+        for engine in ENGINES:
+            if engine == "tableau" and size > DICT_LIMIT:
+                continue
+            disabled = run(problem, engine)
+            stats.enable()
+            enabled = run(problem, engine)
+            report  = stats.disable().report()
+
+            timers = [report["timers"].get(timer, {"seconds": 0.0})["seconds"] for timer in TIMERS]
+            print(f"{size:>6} {engine:>8} {disabled:>8.3f}s {enabled:>8.3f}s " +
+                  " ".join(f"{seconds:>9.3f}s" for seconds in timers) +
+                  f" {report['pivots_per_second']:>9.0f} {report['peak_memory'] / 1e6:>8.2f}")
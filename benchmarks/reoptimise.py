@@ -0,0 +1,81 @@
+"""Re-optimisation benchmark.
+
+Solves a random LP (as benchmarks/engines.py builds) with the dual simplex
+engine, then repeatedly changes it, tightening a variable's upper bound or
+moving a constraint's constant, and solves again both from the previous
+optimal basis and from scratch.  Reports the iterations and time each
+takes.  Needs scipy.
+
+    python benchmarks/reoptimise.py [SIZE] [CHANGES]
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import numpy as np
+from lpsolve import ir
+from lpsolve.dual import DualSimplex
+from engines import build
+
+DEFAULT_SIZE    = 300
+DEFAULT_CHANGES = 10
+ITERATION_LIMIT = 10_000
+
+
+def run(problem, basis=None):
+    """Solve with the dual simplex engine, returning the iterations, the
+    time, the objective, the status, the final basis and the values"""
+
+    start   = time.perf_counter()
+    tableau = DualSimplex(problem, basis=basis)
+    iterations = 0
+    while tableau.status is None and not tableau.optimal() and iterations < ITERATION_LIMIT:
+        tableau.pivot("lowest")
+        iterations += 1
+    elapsed = time.perf_counter() - start
+
+    values = tableau.get_result()
+    objective = values[problem.symbols.get(ir.OBJECTIVE_VARIABLE_NAME)]
+    return iterations, elapsed, objective, tableau.status or "optimal", tableau.get_basis(), values
+
+
+def change(problem, values, rng):
+    """Tighten the upper bound of a variable in use, or move a constant"""
+
+    if rng.random() < 0.5:
+        used = [var for var in problem.symbols if not var.slack and values[var] > 0]
+        var  = used[rng.integers(len(used))]
+        var.set_upper_bound(values[var] * rng.uniform(0.5, 0.9))
+        return f"bound on {var.name}"
+
+    key = list(problem.constraints.keys())[rng.integers(len(problem.constraints))]
+    problem.constraints[key].constant *= rng.uniform(0.8, 1.2)
+    return f"constant of {key}"
+
+
+if __name__ == "__main__":
+    size    = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHANGES
+    rng     = np.random.default_rng(0)
+
+    # Quieten to_standard_form and the engine
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    problem = build(size)
+    iterations, elapsed, objective, status, basis, values = run(problem)
+    sys.stdout = stdout
+    print(f"{size}x{size} problem solved in {iterations} iterations, {elapsed:.3f}s, objective {objective:.6g}")
+
+    print(f"{'change':>32} {'warm':>6} {'time':>9} {'cold':>6} {'time':>9} {'objective':>12}")
+    totals = np.zeros(4)
+    for _ in range(changes):
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        what = change(problem, values, rng)
+        warm = run(problem, basis)
+        cold = run(problem)
+        sys.stdout = stdout
+
+        basis, values = warm[4], warm[5]
+        totals += [warm[0], warm[1], cold[0], cold[1]]
+        print(f"{what:>32} {warm[0]:>6} {warm[1]:>8.3f}s {cold[0]:>6} {cold[1]:>8.3f}s {warm[2]:>12.6g}  {warm[3]}")
+
+    print(f"{'total':>32} {int(totals[0]):>6} {totals[1]:>8.3f}s {int(totals[2]):>6} {totals[3]:>8.3f}s")
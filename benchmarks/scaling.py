@@ -0,0 +1,86 @@
+"""Scaling benchmark.
+
+Generates random LPs (maximise c.x subject to Ax <= b, x >= 0) and then
+spoils their scaling by multiplying each row and column by a power of ten
+between 1e-4 and 1e6.  Each problem is solved with and without the
+scaling stage, and the iteration count, time and objective are reported
+alongside those of the well scaled original.
+
+    python benchmarks/scaling.py [ROWS] [COLUMNS] [PROBLEMS]
+"""
+
+import os, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import numpy as np
+from lpsolve import ir
+from lpsolve.presolve import to_standard_form
+from lpsolve.scaling import Scaler
+from lpsolve.solve import Tableau
+
+DEFAULT_ROWS     = 30
+DEFAULT_COLUMNS  = 40
+DEFAULT_PROBLEMS = 5
+ITERATION_LIMIT  = 1000
+DENSITY          = 0.3
+
+
+def build(rows, columns, seed, spoil):
+    """Build a random problem, with rows and columns badly scaled if spoil is
+    set.  Spoiling changes the variables but not the optimal objective"""
+
+    rng = np.random.default_rng(seed)
+    A = rng.uniform(1, 10, size=(rows, columns)) * (rng.random((rows, columns)) < DENSITY)
+    A[np.arange(rows), rng.integers(0, columns, rows)] = rng.uniform(1, 10, rows)
+    b = rng.uniform(10, 100, rows)
+    c = rng.uniform(1, 10, columns)
+
+    if spoil:
+        row_scale    = 10.0 ** rng.integers(-4, 7, rows)
+        column_scale = 10.0 ** rng.integers(-4, 7, columns)
+        A = A * row_scale[:, None] * column_scale[None, :]
+        b = b * row_scale
+        c = c * column_scale
+
+    problem = ir.LPProblem()
+    problem.add_variables([f"x{j}" for j in range(columns)])
+    problem.set_objective_coefficients(c, True)
+    problem.add_constraints(A, ["<="] * rows, b)
+    return to_standard_form(problem)
+
+
+def run(problem, scale):
+    """Solve, returning the iterations taken, the time and the objective"""
+
+    start = time.perf_counter()
+    if scale:
+        Scaler(problem).scale()
+    tableau    = Tableau(problem)
+    iterations = 0
+    while tableau.status is None and not tableau.optimal() and iterations < ITERATION_LIMIT:
+        tableau.pivot("lowest")
+        iterations += 1
+    elapsed = time.perf_counter() - start
+
+    objective = tableau.get_result()[problem.symbols.get(ir.OBJECTIVE_VARIABLE_NAME)]
+    status    = tableau.status or ("optimal" if tableau.optimal() else "iteration limit")
+    return iterations, elapsed, objective, status
+
+
+if __name__ == "__main__":
+    rows     = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    columns  = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_COLUMNS
+    problems = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_PROBLEMS
+
+    print(f"{problems} problems of {rows} rows and {columns} columns")
+    print(f"{'problem':>8} {'case':>18} {'iterations':>11} {'time':>9} {'objective':>14}  status")
+    for seed in range(problems):
+        cases = [("original", False, False), ("spoilt, unscaled", True, False), ("spoilt, scaled", True, True)]
+        for name, spoil, scale in cases:
+            # Quieten to_standard_form and the solver
+            stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+            problem = build(rows, columns, seed, spoil)
+            iterations, elapsed, objective, status = run(problem, scale)
+            sys.stdout = stdout
+
+            print(f"{seed:>8} {name:>18} {iterations:>11} {elapsed:>8.3f}s {objective:>14.6g}  {status}")
@@ -0,0 +1,63 @@
+"""Scenario benchmark.
+
+Parses a generated LP file once, then builds what-if scenarios from it,
+each changing a few constants, bounds and objective coefficients before
+being converted to standard form.  Reports the time per scenario when each
+is made with LPProblem.clone and when each re-parses the file.
+
+    python benchmarks/scenarios.py [CONSTRAINTS] [SCENARIOS]
+"""
+
+import os, sys, time, random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lpsolve import parser
+from lpsolve.presolve import to_standard_form
+from generate import lp_text
+
+DEFAULT_CONSTRAINTS = 20_000
+DEFAULT_SCENARIOS   = 20
+REPARSED_SCENARIOS  = 2
+CHANGES             = 10
+
+
+def scenario(problem, seed):
+    """Change a few constants, bounds and objective coefficients, and convert
+    to standard form"""
+
+    rng   = random.Random(seed)
+    names = list(problem.constraints.keys())
+    for _ in range(CHANGES):
+        problem.constraints[rng.choice(names)].constant *= 1.1
+        problem.symbols.variable(rng.randrange(len(problem.symbols))).set_upper_bound(rng.randint(10, 100))
+        problem.objective.set_coefficient(problem.symbols.variable(rng.randrange(len(problem.symbols))), rng.randint(1, 20))
+
+    to_standard_form(problem)
+
+
+if __name__ == "__main__":
+    constraints = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CONSTRAINTS
+    scenarios   = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SCENARIOS
+    text        = lp_text(constraints)
+
+    # Quieten to_standard_form
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+
+    start = time.perf_counter()
+    base  = parser.parse_string(text)
+    parse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(scenarios):
+        scenario(base.clone(), i)
+    clone_time = (time.perf_counter() - start) / scenarios
+
+    start = time.perf_counter()
+    for i in range(REPARSED_SCENARIOS):
+        scenario(parser.parse_string(text), i)
+    reparse_time = (time.perf_counter() - start) / REPARSED_SCENARIOS
+
+    sys.stdout = stdout
+    print(f"{constraints} constraints, initial parse {parse_time:.2f}s")
+    print(f"  clone:    {clone_time:>7.3f}s per scenario ({scenarios} scenarios)")
+    print(f"  re-parse: {reparse_time:>7.3f}s per scenario ({REPARSED_SCENARIOS} scenarios)")
@@ -0,0 +1,40 @@
+"""Symbol table memory benchmark.
+
+Creates an increasing number of variables, with bounds and binary flags set
+on some of them, and reports the memory held by the symbol table per
+variable and the time taken to fill it.
+
+    python benchmarks/symbol_memory.py [COUNT ...]
+"""
+
+import os, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lpsolve.ir import SymbolTable
+
+DEFAULT_COUNTS = [10_000, 100_000, 500_000]
+
+
+def benchmark(count):
+
+    tracemalloc.start()
+    start   = time.perf_counter()
+    symbols = SymbolTable()
+    for i in range(count):
+        var = symbols.new_variable(f"x{i}")
+        var.set_upper_bound(float(i % 10 + 1))
+        if i % 7 == 0:
+            var.set_binary(True)
+    del var
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{count:>10} variables: {current / 1e6:>8.1f} MB, {current / count:>6.1f} bytes/variable, "
+          f"built in {elapsed:>6.2f}s")
+
+
+if __name__ == "__main__":
+    counts = [int(x) for x in sys.argv[1:]] or DEFAULT_COUNTS
+    for count in counts:
+        benchmark(count)
@@ -1,8 +1,17 @@
 
-import os, sys
-from .parser import parse_file
-from .presolve import to_standard_form
-from .solve import solve
+import argparse, os, sys
+from . import stats
+from .parser import read_problem
+from .presolve import to_standard_form, Presolver
+from .scaling import Scaler
+from .solve import solve, ENGINES, ITERATION_LIMIT
+from .pricing import PRICING
+from .branch import BRANCHING
+from .heuristics import HEURISTICS
+from .interior import NORMAL_EQUATIONS
+from .log import LEVELS, configure
+from .cache import cached_parse_file, DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE
+from .writer import write_lp_file, write_mps_file
 
 VERSION = "0.1.0"
 
@@ -11,38 +20,151 @@ def main():
 
     print(f"Steve's LP Solver {VERSION}")
 
-    if len(sys.argv) != 3:
-        print(f"USAGE: lpsolve --lp FILE")
-        sys.exit(1)
-
-    filename = sys.argv[2]
-    iteration_limit = 20
-    heuristic = "lowest"
+    argparser = argparse.ArgumentParser(prog="lpsolve")
+    inputs = argparser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--lp", metavar="FILE",
+                        help="CPLEX LP format file to solve")
+    inputs.add_argument("--mps", metavar="FILE",
+                        help="free format MPS file to solve")
+    inputs.add_argument("--fixed-mps", metavar="FILE",
+                        help="fixed format MPS file to solve")
+    argparser.add_argument("--no-cache", action="store_true",
+                           help="always parse FILE rather than reusing a compiled copy")
+    argparser.add_argument("--cache-dir", metavar="DIR",
+                           default=os.environ.get("LPSOLVE_CACHE_DIR", DEFAULT_CACHE_DIR),
+                           help=f"directory for compiled problems (default: {DEFAULT_CACHE_DIR})")
+    argparser.add_argument("--cache-size", metavar="MB", type=float,
+                           default=DEFAULT_CACHE_SIZE / (1024 * 1024),
+                           help="evict compiled problems once the cache exceeds this size")
+    argparser.add_argument("--processes", metavar="N", type=int, default=1,
+                           help="parse large constraint sections, and solve branch and bound nodes, across N processes")
+    argparser.add_argument("--no-presolve", action="store_true",
+                           help="solve the problem as read, without removing redundant rows and columns")
+    argparser.add_argument("--no-scaling", action="store_true",
+                           help="solve with the coefficients as given, rather than scaling rows and columns")
+    argparser.add_argument("--engine", choices=list(ENGINES), default="tableau",
+                           help="simplex implementation, or the interior point method, to solve with "
+                                "(default: tableau)")
+    argparser.add_argument("--pricing", choices=list(PRICING), default="lowest",
+                           help="pricing strategy for choosing pivots; the tableau engine has only lowest and bland "
+                                "(default: lowest)")
+    argparser.add_argument("--iteration-limit", metavar="N", type=int, default=ITERATION_LIMIT,
+                           help="iterations allowed in each LP solve, including every branch and bound node and cut "
+                                f"round (default: {ITERATION_LIMIT})")
+    argparser.add_argument("--normal-equations", choices=NORMAL_EQUATIONS, default="auto",
+                           help="with the interior engine, how to solve the normal equations; auto is dense for small "
+                                "problems and sparse for large ones (default: auto)")
+    argparser.add_argument("--crossover", action="store_true",
+                           help="with the interior engine, finish at a vertex and basis with the revised simplex method")
+    argparser.add_argument("--branching", choices=BRANCHING, default="fractional",
+                           help="variable to branch on when solving a problem with integer variables "
+                                "(default: fractional)")
+    argparser.add_argument("--deterministic", action="store_true",
+                           help="with --processes, search branch and bound nodes in the same order on every run")
+    argparser.add_argument("--cuts", metavar="ROUNDS", type=int, default=0,
+                           help="rounds of Gomory and cover cuts to add at the root before branch and bound")
+    argparser.add_argument("--tree-cuts", metavar="DEPTH", type=int, default=0,
+                           help="also add cover cuts at branch and bound nodes up to DEPTH deep")
+    argparser.add_argument("--heuristics", metavar="NAME", nargs="*", choices=HEURISTICS,
+                           help=f"primal heuristics to find integer solutions with early, any of {', '.join(HEURISTICS)} "
+                                f"(all of them if none are named)")
+    argparser.add_argument("--relax", action="store_true",
+                           help="solve only the LP relaxation, ignoring integer variables")
+    argparser.add_argument("--export", metavar="FILE",
+                           help="write the problem in standard form to FILE, as MPS if it ends in .mps or LP otherwise")
+    argparser.add_argument("--log-level", choices=list(LEVELS), default="info",
+                           help="solver messages to show: quiet for warnings alone, debug for every iteration's "
+                                "pivot and trace for the tableau after it as well (default: info)")
+    argparser.add_argument("--stats", metavar="FILE",
+                           help="write the time and peak memory of each stage, and the time spent parsing, building, "
+                                "pricing, in ratio tests and pivoting, to FILE as JSON")
+    args = argparser.parse_args()
+    configure(args.log_level)
+    if args.stats:
+        stats.enable()
+    if args.pricing not in getattr(ENGINES[args.engine], "PRICING", PRICING):
+        argparser.error(f"the {args.engine} engine does not support {args.pricing} pricing")
+
+    if args.lp:
+        filename, file_format = args.lp, "lp"
+    elif args.mps:
+        filename, file_format = args.mps, "mps"
+    else:
+        filename, file_format = args.fixed_mps, "fixed-mps"
+    iteration_limit = args.iteration_limit
+    heuristic = args.pricing
 
     # 1) Load the problem from disk
     print("")
-    print(f"1) Loading LP problem from CPLEX LP format, filename={filename}...")
-    problem = parse_file(filename)
+    print(f"1) Loading LP problem from {file_format.upper()} format, filename={filename}...")
+    with stats.phase("load"):
+        if args.no_cache:
+            problem = read_problem(filename, file_format, args.processes)
+        else:
+            problem = cached_parse_file(filename, args.cache_dir, int(args.cache_size * 1024 * 1024),
+                                        args.processes, file_format)
     problem.summarise()
 
-
-
-
-
-    # 2) Convert to standard form symbolically
+    # 2) Presolve
+    presolver = None
+    if not args.no_presolve:
+        print("")
+        print("2) Presolving...")
+        with stats.phase("presolve"):
+            presolver = Presolver(problem)
+            problem   = presolver.reduce()
+        presolver.summarise()
+        if presolver.status is not None:
+            _write_stats(args.stats)
+            return
+
+    # 3) Convert to standard form symbolically
     print("")
-    print("2) Converting to standard form...")
-    problem = to_standard_form(problem)
-
-
-
-    # 3) Build a tableau and assess optimality
+    print("3) Converting to standard form...")
+    with stats.phase("standard_form"):
+        problem = to_standard_form(problem)
+
+    if args.export:
+        print(f"Writing standard form problem to {args.export}")
+        if args.export.lower().endswith(".mps"):
+            write_mps_file(problem, args.export)
+        else:
+            write_lp_file(problem, args.export)
+
+    # Scale rows and columns so that coefficients are close to one
+    scaler = None
+    if not args.no_scaling:
+        print("Scaling...")
+        with stats.phase("scaling"):
+            scaler = Scaler(problem)
+            scaler.scale()
+        scaler.summarise()
+
+    # 4) Build a tableau and assess optimality
     print("")
-    print(f"3) Solving with iteration limit of {iteration_limit} using heuristic '{heuristic}'")
-    solution = solve(problem, iteration_limit, heuristic)
-
+    print(f"4) Solving with iteration limit of {iteration_limit} using heuristic '{heuristic}' and engine '{args.engine}'")
+    with stats.phase("solve"):
+        solution = solve(problem, iteration_limit, heuristic, args.engine, branching=args.branching, relax=args.relax,
+                         processes=args.processes, deterministic=args.deterministic, cuts=args.cuts,
+                         tree_cuts=args.tree_cuts,
+                         heuristics=HEURISTICS if args.heuristics == [] else args.heuristics or (),
+                         crossover=args.crossover, normal_equations=args.normal_equations)
+    with stats.phase("postsolve"):
+        if scaler is not None:
+            solution = scaler.unscale(solution)
+        if presolver is not None:
+            solution = presolver.postsolve(solution)
 
     print("")
-    print(f"4) Solution summary")
+    print(f"5) Solution summary")
     solution.summarise()
+    _write_stats(args.stats)
+
+
+def _write_stats(filename):
+    """Stop collecting statistics and write them to filename, if given"""
+
+    if filename:
+        stats.disable().write(filename)
+        print(f"Statistics written to {filename}")
 
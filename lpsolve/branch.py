@@ -0,0 +1,412 @@
+import heapq, math, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+import numpy as np
+from . import ir, stats
+from .log import logger
+
+# A value within this of an integer is taken to be one
+INTEGER_TOLERANCE = 1e-6
+
+# Nodes whose bound is no better than the incumbent's objective by more
+# than this are pruned
+PRUNE_TOLERANCE = 1e-6
+
+# Nodes between progress lines, and the most nodes to solve
+LOG_INTERVAL = 100
+NODE_LIMIT   = 100_000
+
+# Nodes between runs of the primal heuristics in the tree
+HEURISTIC_INTERVAL = 50
+
+# Pseudo-cost scores are products of the down and up estimates, each at
+# least this
+PSEUDO_COST_MINIMUM = 1e-6
+
+
+class Node:
+    """A subproblem: the root problem with some of its integer variables'
+    bounds tightened.  bound is the objective of the parent's relaxation,
+    which the node's can be no better than."""
+
+    __slots__ = ("bounds", "depth", "bound", "basis", "branch")
+
+    def __init__(self, bounds, depth, bound, basis=None, branch=None):
+
+        self.bounds = bounds    # Column -> (lower, upper), for tightened columns
+        self.depth  = depth
+        self.bound  = bound
+        self.basis  = basis     # Parent's final basis, to start from
+        self.branch = branch    # (column, "down" or "up", distance moved) that made the node
+
+
+class BranchAndBound:
+    """Solves a problem in standard form with integer variables by branch
+    and bound, solving each node's LP relaxation with relax(problem, basis),
+    which returns a Solution.
+
+    Each node tightens the bounds of one integer variable whose value in
+    its parent's relaxation was fractional, to round it down in one child
+    and up in the other.  A node is pruned when its relaxation is
+    infeasible or can do no better than the incumbent, the best integer
+    solution found so far, and otherwise becomes a new incumbent if its
+    solution is integer.
+
+    Nodes are taken depth first, diving from each node into one of its
+    children, until the dive ends in a pruned or integer node; the next
+    dive starts from the open node with the best bound.  Before the first
+    incumbent this is simply a depth first search, which finds one
+    quickly.  Each child starts from its parent's final basis, which the
+    dual engine re-optimises in a few pivots.
+
+    With processes more than one, node relaxations are solved by a pool of
+    worker processes, each continuing a dive of its own.  Workers are given
+    the problem once, and each node as its bound changes and parent basis.
+    The incumbent, the open nodes and every pruning decision stay with
+    this process, so a node is pruned against the best solution found by
+    any worker.  Nodes are taken as they finish, unless deterministic is
+    True, when they are taken in the order they were started so that the
+    search is the same from run to run.
+
+    cuts, a cuts.CuttingPlanes, adds the cover cuts violated by each
+    fractional node's solution to the problem, for the nodes after it,
+    when nodes are solved in this process.
+
+    heuristics, a heuristics.PrimalHeuristics, looks for integer solutions
+    from the root's relaxation and from every HEURISTIC_INTERVAL-th node's
+    after, in this process.  Each incumbent is recorded in incumbents with
+    the time it was found and where from.
+
+    branching chooses the variable to branch on:
+
+    fractional --- the most fractional variable
+    pseudocost --- the variable with the largest product of the estimated
+                   objective loss in each direction, from the average loss
+                   per unit seen when branching on it before"""
+
+    def __init__(self, problem, relax, branching="fractional", node_limit=NODE_LIMIT, processes=1,
+                 deterministic=False, cuts=None, heuristics=None):
+
+        if branching not in BRANCHING:
+            raise ValueError(f"Unknown branching rule '{branching}', expected one of {', '.join(BRANCHING)}")
+
+        self.problem    = problem
+        self.relax      = relax
+        self.branching  = branching
+        self.node_limit = node_limit
+        self.processes  = max(processes, 1)
+        self.deterministic = deterministic
+        self.cuts       = cuts if self.processes == 1 else None
+        self.heuristics = heuristics
+        self.integer    = np.flatnonzero((problem.symbols.flags & ir.INTEGER_FLAGS) != 0)
+        self.lower      = problem.symbols.lower_bounds.copy()
+        self.upper      = problem.symbols.upper_bounds.copy()
+
+        self.incumbent  = None      # Relaxation of the best integer solution found
+        self.nodes      = 0
+        self.pruned     = 0
+        self.unresolved = 0         # Nodes whose relaxation stopped short of optimal
+        self.history    = []        # (time, nodes, best bound, incumbent objective) at each progress line
+        self.incumbents = []        # (time, nodes, objective, found by) for each incumbent
+        self.start      = None
+        self.elapsed    = 0.0
+
+        # Objective lost per unit of rounding, summed and counted by column
+        self.pseudo_costs = {"down": np.zeros(len(problem.symbols)), "up": np.zeros(len(problem.symbols))}
+        self.pseudo_count = {"down": np.zeros(len(problem.symbols)), "up": np.zeros(len(problem.symbols))}
+
+    def solve(self, basis=None):
+        """Search the tree, starting the root's relaxation from basis if
+        given, returning the best integer Solution, or the root
+        relaxation's Solution if there is none"""
+
+        start   = self.start = time.perf_counter()
+        queue   = []            # (-bound, -depth, sequence, node), best bound first
+        ready   = [Node({}, 0, math.inf, basis)]    # Children to continue dives with
+        pending = deque()       # (future, node), in the order submitted
+        counter = solved = 0
+        root    = None
+        pool    = None
+        if self.processes > 1:
+            pool = ProcessPoolExecutor(self.processes, initializer=_start_worker, initargs=(self.problem, self.relax))
+
+        logger.info("Branch and bound over %d integer variables, branching on %s%s", len(self.integer), self.branching,
+                    f" across {self.processes} processes" if pool is not None else "")
+        try:
+            while True:
+                # Keep every process busy, continuing dives before starting new ones
+                while len(pending) < self.processes and self.nodes < self.node_limit:
+                    node = self._next_node(ready, queue)
+                    if node is None:
+                        break
+                    self.nodes += 1
+                    pending.append((self._submit(pool, node), node))
+                if not pending:
+                    break
+
+                node, result = self._collect(pending)
+                solved += 1
+                if root is None:
+                    root = result
+                    if result.status == "unbounded":
+                        logger.info("*** The relaxation is unbounded")
+                        break
+
+                # Dive into the first child, leaving the second for later
+                children = self._branch(node, result)
+                if children:
+                    ready.append(children[0])
+                    for child in children[1:]:
+                        counter += 1
+                        heapq.heappush(queue, (-child.bound, -child.depth, counter, child))
+
+                if solved % LOG_INTERVAL == 0:
+                    self._log(start, queue, ready, pending)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        self.elapsed = time.perf_counter() - start
+        exhausted    = not ready and not queue and not pending
+        self._log(start, queue, ready, pending)
+
+        best_bound = self._best_bound(queue, ready, pending)
+        logger.info("Branch and bound: %d nodes in %.3fs (%.1f nodes/s), %d pruned, gap %s%s", self.nodes, self.elapsed,
+                    self.nodes / max(self.elapsed, 1e-9), self.pruned, self._gap(best_bound),
+                    f", {self.cuts.tree_cuts} cuts in the tree" if self.cuts is not None else "")
+        if self.incumbents:
+            elapsed, nodes, _, source = self.incumbents[0]
+            logger.info("First incumbent after %.3fs and %d nodes, from %s", elapsed, nodes, source)
+
+        if self.incumbent is None:
+            if exhausted and self.unresolved == 0 and root.status != "unbounded":
+                logger.info("*** No integer solution exists")
+                return ir.Solution(self.problem, self._values(root), False, status="infeasible")
+            logger.info("*** No integer solution found")
+            return ir.Solution(self.problem, self._values(root), False,
+                               status=root.status if root.status != "optimal" else "node limit")
+
+        proven = exhausted and self.unresolved == 0
+        if not proven:
+            logger.info("*** Stopped before proving the incumbent optimal")
+        return ir.Solution(self.problem, self._values(self.incumbent), proven, objective=self.incumbent.objective,
+                           status="optimal" if proven else "node limit", basis=self.incumbent.basis)
+
+    def summarise(self):
+        print(f"Nodes: {self.nodes}, pruned: {self.pruned}, time: {self.elapsed:.3f}s")
+        if self.incumbent is not None:
+            print(f"Incumbent objective: {self.incumbent.objective}")
+        for elapsed, nodes, bound, objective in self.history:
+            print(f"  {elapsed:>8.3f}s {nodes:>8} nodes  bound {bound}  incumbent {objective}")
+        if self.incumbents:
+            print("Incumbents:")
+        for elapsed, nodes, objective, source in self.incumbents:
+            print(f"  {elapsed:>8.3f}s {nodes:>8} nodes  objective {objective}  from {source}")
+        if self.heuristics is not None:
+            print("Heuristics:")
+            self.heuristics.summarise()
+
+    def _next_node(self, ready, queue):
+        """Return the next node to solve, the latest child to continue a
+        dive with or else the open node with the best bound, dropping any
+        that the incumbent has overtaken"""
+
+        while ready or queue:
+            node = ready.pop() if ready else heapq.heappop(queue)[3]
+            if self._promising(node.bound):
+                return node
+            self.pruned += 1
+        return None
+
+    def _submit(self, pool, node):
+        """Start solving a node's relaxation, in the pool if there is one"""
+
+        if pool is not None:
+            return pool.submit(_solve_relaxation_in_worker, node.bounds, node.basis)
+        future = Future()
+        future.set_result(_solve_relaxation(self.problem, self.relax, node.bounds, node.basis))
+        return future
+
+    def _collect(self, pending):
+        """Wait for and remove a node from pending, returning it and its
+        Relaxation.  Deterministic searches take nodes in the order they
+        were submitted, so that the search does not depend on how long
+        each took; others take whichever finishes first."""
+
+        if self.deterministic or len(pending) == 1:
+            future, node = pending.popleft()
+            return node, future.result()
+
+        done, _ = wait([future for future, _ in pending], return_when=FIRST_COMPLETED)
+        entry   = next(entry for entry in pending if entry[0] in done)
+        pending.remove(entry)
+        return entry[1], entry[0].result()
+
+    def _branch(self, node, result):
+        """Prune a solved node, take it as the new incumbent, or return the
+        children to branch into in the order to visit them"""
+
+        if result.status != "optimal":
+            if result.status not in ("infeasible", "unbounded"):
+                self.unresolved += 1
+            self.pruned += 1
+            return []
+
+        objective = result.objective
+        if node.branch is not None:
+            self._record_pseudo_cost(node, objective)
+        if not self._promising(objective):
+            self.pruned += 1
+            return []
+
+        values     = result.values
+        fractional = self.integer[np.abs(values[self.integer] - np.round(values[self.integer])) > INTEGER_TOLERANCE]
+        if not len(fractional):
+            self._offer(result, "search", node)
+            return []
+
+        if self.cuts is not None:
+            self.cuts.separate(self.problem, values, node.depth)
+
+        if self.heuristics is not None and (node.depth == 0 or self.nodes % HEURISTIC_INTERVAL == 0):
+            for name, solution in self.heuristics.run(node.bounds, result, self.incumbent, node.depth == 0):
+                self._offer(solution, name, node)
+            if not self._promising(objective):
+                self.pruned += 1
+                return []
+
+        column = self._choose(fractional, values)
+        value  = values[column]
+        lower, upper = node.bounds.get(column, (self.lower[column], self.upper[column]))
+        down = Node({**node.bounds, column: (lower, math.floor(value))}, node.depth + 1, objective, result.basis,
+                    (column, "down", value - math.floor(value)))
+        up   = Node({**node.bounds, column: (math.ceil(value), upper)}, node.depth + 1, objective, result.basis,
+                    (column, "up", math.ceil(value) - value))
+
+        # Dive towards the nearer integer first
+        return [down, up] if value - math.floor(value) <= 0.5 else [up, down]
+
+    def _offer(self, result, source, node):
+        """Take an integer solution as the incumbent if it is better"""
+
+        if not self._promising(result.objective):
+            return
+        elapsed = time.perf_counter() - self.start
+        self.incumbent = result
+        self.incumbents.append((elapsed, self.nodes, result.objective, source))
+        logger.info("New incumbent %s from %s at node %d, depth %d (%.3fs)", result.objective, source, self.nodes,
+                    node.depth, elapsed)
+
+    def _choose(self, fractional, values):
+        """Choose the column to branch on from those with fractional values"""
+
+        parts = values[fractional] - np.floor(values[fractional])
+        if self.branching == "fractional":
+            return int(fractional[np.argmax(np.minimum(parts, 1.0 - parts))])
+
+        down = self._estimates("down", fractional) * parts
+        up   = self._estimates("up", fractional) * (1.0 - parts)
+        return int(fractional[np.argmax(np.maximum(down, PSEUDO_COST_MINIMUM) * np.maximum(up, PSEUDO_COST_MINIMUM))])
+
+    def _estimates(self, direction, columns):
+        """Average objective loss per unit for each column, falling back to
+        the average over all columns for those not yet branched on"""
+
+        costs, counts = self.pseudo_costs[direction], self.pseudo_count[direction]
+        seen    = counts > 0
+        average = costs[seen].sum() / counts[seen].sum() if seen.any() else 1.0
+        return np.where(counts[columns] > 0, costs[columns] / np.maximum(counts[columns], 1), average)
+
+    def _record_pseudo_cost(self, node, objective):
+        column, direction, distance = node.branch
+        if distance > INTEGER_TOLERANCE:
+            self.pseudo_costs[direction][column] += max(node.bound - objective, 0.0) / distance
+            self.pseudo_count[direction][column] += 1
+
+    def _promising(self, bound):
+        """Whether a node with this bound could improve on the incumbent"""
+
+        return self.incumbent is None or bound > self.incumbent.objective + PRUNE_TOLERANCE
+
+    def _best_bound(self, queue, ready, pending):
+        bounds = ([entry[3].bound for entry in queue] + [node.bound for node in ready] +
+                  [node.bound for _, node in pending])
+        if not bounds:
+            return self.incumbent.objective if self.incumbent is not None else None
+        return max(bounds)
+
+    def _gap(self, bound):
+        """Relative gap between the best bound and the incumbent"""
+
+        if self.incumbent is None or bound is None or bound == math.inf:
+            return "-"
+        objective = self.incumbent.objective
+        return f"{abs(bound - objective) / max(abs(objective), 1.0):.2%}"
+
+    def _log(self, start, queue, ready, pending):
+        elapsed = time.perf_counter() - start
+        bound   = self._best_bound(queue, ready, pending)
+        objective = self.incumbent.objective if self.incumbent is not None else None
+        self.history.append((elapsed, self.nodes, bound, objective))
+        logger.info("Node %d: %d open, bound %s, incumbent %s, gap %s, %.3fs (%.1f nodes/s)", self.nodes,
+                    len(queue) + len(ready), bound, objective, self._gap(bound), elapsed,
+                    self.nodes / max(elapsed, 1e-9))
+
+    def _values(self, result):
+        """A node's solution values, keyed by the problem's variables, with
+        integer variables rounded"""
+
+        flags  = self.problem.symbols.flags
+        values = np.zeros(len(flags))
+        values[:len(result.values)] = result.values     # Cuts found since may have added slack columns
+        values = np.where((flags & ir.INTEGER_FLAGS) != 0, np.round(values), values)
+        return dict(zip(self.problem.symbols, values.tolist()))
+
+
+class Relaxation:
+    """What the search needs of a node's solved relaxation, small enough to
+    send back from a worker process: its status and objective, the value
+    of every column and its final basis"""
+
+    __slots__ = ("status", "objective", "values", "basis")
+
+    def __init__(self, status, objective, values, basis):
+
+        self.status    = status
+        self.objective = objective
+        self.values    = values
+        self.basis     = basis
+
+
+def _solve_relaxation(problem, relax, bounds, basis):
+    """Solve the relaxation of the node with the given bounds"""
+
+    node = problem.clone()
+    for column, (lower, upper) in bounds.items():
+        var = node.symbols.variable(column)
+        var.set_lower_bound(lower)
+        var.set_upper_bound(upper)
+    solution = relax(node, basis)
+
+    values = np.zeros(len(problem.symbols))
+    for var, value in list(solution.variables.items()) + list(solution.slack_variables.items()):
+        values[var.index] = value
+    return Relaxation(solution.status, solution.objective, values, solution.basis)
+
+
+# The problem and relax function of a worker process, given once when it
+# starts rather than with every node
+_worker_problem = None
+_worker_relax   = None
+
+def _start_worker(problem, relax):
+    global _worker_problem, _worker_relax
+    _worker_problem, _worker_relax = problem, relax
+    stats.disable()     # A forked worker's statistics would never be reported
+
+def _solve_relaxation_in_worker(bounds, basis):
+    return _solve_relaxation(_worker_problem, _worker_relax, bounds, basis)
+
+
+# Branching rules selectable by solve()
+BRANCHING = ("fractional", "pseudocost")
@@ -0,0 +1,244 @@
+import hashlib, json, mmap, os, struct, tempfile
+import numpy as np
+from . import ir, stats
+from .log import logger
+from .parser import read_problem
+
+# Compiled problem files start with a magic number and version, followed by
+# the length of a JSON header describing the arrays that follow it.  Arrays
+# are stored raw and 8-byte aligned so that they can be mapped straight from
+# disk without copying.
+MAGIC          = b"LPSC"
+FORMAT_VERSION = 4
+PREAMBLE       = struct.Struct("<4sIQ")
+ALIGNMENT      = 8
+EXTENSION      = ".lpc"
+
+DEFAULT_CACHE_DIR  = os.path.join(os.path.expanduser("~"), ".cache", "lpsolve")
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+# Variable flags are stored as the symbol table holds them, with the bits
+# given by ir.FLAG_*
+
+# Bits in the per-constraint flags array
+FLAG_EQUATION     = 1
+FLAG_GREATER_THAN = 2
+FLAG_STRICT       = 4
+
+
+@stats.timed("parse")
+def cached_parse_file(filename, cache_dir=DEFAULT_CACHE_DIR, max_size=DEFAULT_CACHE_SIZE, processes=1, file_format="lp"):
+    """Parse an LP (or other supported format) file, reusing a compiled copy
+    from the cache if the file's contents have been seen before.
+
+    Compiled problems are keyed by a hash of the source file, so an edited
+    file is parsed afresh.  After adding an entry the least recently used
+    entries are evicted until the cache is no larger than max_size bytes.
+    On a miss the file is parsed with the given number of processes."""
+
+    path = os.path.join(cache_dir, f"{content_hash(filename, file_format)}{EXTENSION}")
+
+    if os.path.exists(path):
+        try:
+            problem = load_problem(path)
+            os.utime(path)      # Mark as recently used
+            return problem
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable cache entry %s: %s", path, e)
+
+    problem = read_problem(filename, file_format, processes)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_problem(problem, path)
+        evict(cache_dir, max_size, keep=path)
+    except OSError as e:
+        logger.warning("Unable to write cache entry %s: %s", path, e)
+
+    return problem
+
+
+def content_hash(filename, file_format="lp", chunk_size=1024 * 1024):
+    """Return a hex digest of the file's contents, the format it is read as
+    and the version of the compiled format"""
+
+    digest = hashlib.sha256(MAGIC + struct.pack("<I", FORMAT_VERSION) + file_format.encode("utf-8"))
+    with open(filename, "rb") as fin:
+        for chunk in iter(lambda: fin.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def evict(cache_dir, max_size, keep=None):
+    """Remove least recently used entries until the cache fits in max_size bytes.
+
+    The entry named by `keep` is never removed, even if it alone is larger
+    than the limit."""
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(EXTENSION):
+            path = os.path.join(cache_dir, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_size:
+            break
+        if path != keep:
+            os.remove(path)
+            total -= size
+
+
+def save_problem(problem, path):
+    """Write a compiled copy of a problem to disk.
+
+    The file is written under a temporary name and moved into place, so a
+    concurrent reader never sees a partial file."""
+
+    arrays, meta = _problem_to_arrays(problem)
+
+    # Lay the arrays out after the header, each aligned
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, offset, len(array)]
+        offset += _aligned(array.nbytes)
+
+    header = json.dumps({"meta": meta, "arrays": layout}).encode("utf-8")
+    start  = _aligned(PREAMBLE.size + len(header))
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fout:
+            fout.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+            fout.write(header)
+            fout.write(b"\0" * (start - PREAMBLE.size - len(header)))
+            for array in arrays.values():
+                fout.write(array.tobytes())
+                fout.write(b"\0" * (_aligned(array.nbytes) - array.nbytes))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def load_problem(path):
+    """Load a compiled problem from disk.
+
+    The file is memory mapped and its arrays are read in place, with no
+    intermediate copy of the file."""
+
+    with open(path, "rb") as fin:
+        buf = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, header_length = PREAMBLE.unpack_from(buf, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Not a version {FORMAT_VERSION} compiled problem file")
+
+    header = json.loads(buf[PREAMBLE.size:PREAMBLE.size + header_length].decode("utf-8"))
+    start  = _aligned(PREAMBLE.size + header_length)
+
+    arrays = {}
+    for name, (dtype, offset, count) in header["arrays"].items():
+        if count > 0:
+            arrays[name] = np.frombuffer(buf, dtype=dtype, count=count, offset=start + offset)
+        else:
+            arrays[name] = np.empty(0, dtype=dtype)
+
+    return _arrays_to_problem(arrays, header["meta"])
+
+
+def _aligned(size):
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def _encode_strings(strings):
+    """Pack a list of strings into one UTF-8 blob and an array of end offsets"""
+
+    encoded = [s.encode("utf-8") for s in strings]
+    ends    = np.cumsum([len(s) for s in encoded], dtype=np.int64)
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), ends
+
+
+def _decode_strings(blob, ends):
+    data   = blob.tobytes()
+    starts = [0] + ends[:-1].tolist()
+    return [data[a:b].decode("utf-8") for a, b in zip(starts, ends.tolist())]
+
+
+def _problem_to_arrays(problem):
+    """Flatten a problem into a dict of numpy arrays and a dict of metadata"""
+
+    symbols = problem.symbols
+
+    arrays = {}
+    arrays["var_names"], arrays["var_name_ends"] = _encode_strings(symbols.names)
+    arrays["var_lower"] = symbols.lower_bounds
+    arrays["var_upper"] = symbols.upper_bounds
+    arrays["var_flags"] = symbols.flags
+
+    # Per-constraint flags and constants
+    keys, names, row_flags, constants = [], [], [], []
+    for key, constraint in problem.constraints.items():
+        keys.append(key)
+        names.append(constraint.name)
+        if isinstance(constraint, ir.Equation):
+            row_flags.append(FLAG_EQUATION)
+        else:
+            row_flags.append((FLAG_GREATER_THAN if constraint.greater_than else 0) |
+                             (FLAG_STRICT if constraint.strict else 0))
+        constants.append(constraint.constant)
+
+    arrays["row_keys"], arrays["row_key_ends"]   = _encode_strings(keys)
+    arrays["row_names"], arrays["row_name_ends"] = _encode_strings(names)
+    arrays["row_flags"]     = np.array(row_flags, dtype=np.uint8)
+    arrays["row_constants"] = np.array(constants, dtype=np.float64)
+
+    # The matrix rows of the objective, if any, then each constraint, as CSR
+    rows = [c.expression.row for c in problem.constraints.values()]
+    if problem.objective is not None:
+        rows.insert(0, problem.objective_expression().row)
+    arrays["row_ptr"], arrays["columns"], arrays["values"] = problem.matrix.select_rows(rows)
+
+    meta = {"maximise":         problem.maximise,
+            "objective_name":   problem.objective.name if problem.objective is not None else None,
+            "objective_offset": problem.objective_offset}
+
+    return arrays, meta
+
+
+def _arrays_to_problem(arrays, meta):
+    """Rebuild a problem from the arrays written by _problem_to_arrays"""
+
+    problem = ir.LPProblem()
+
+    # Adopt the mapped arrays as they are; they are only copied if written to
+    names           = _decode_strings(arrays["var_names"], arrays["var_name_ends"])
+    problem.symbols = ir.SymbolTable.from_arrays(names, arrays["var_lower"], arrays["var_upper"], arrays["var_flags"])
+    problem.matrix  = ir.SparseMatrix.from_csr(arrays["row_ptr"], arrays["columns"], arrays["values"])
+
+    row = 0
+    if meta["objective_name"] is not None:
+        problem.set_objective(problem.get_expression(meta["objective_name"], None, row), meta["maximise"])
+        row += 1
+    else:
+        problem.maximise = meta["maximise"]
+    problem.objective_offset = meta.get("objective_offset", 0.0)
+
+    keys  = _decode_strings(arrays["row_keys"], arrays["row_key_ends"])
+    names = _decode_strings(arrays["row_names"], arrays["row_name_ends"])
+    for row, (key, name, flags, constant) in enumerate(zip(keys, names, arrays["row_flags"].tolist(),
+                                                          arrays["row_constants"].tolist()), row):
+        expression = problem.get_expression(name, None, row)
+        if flags & FLAG_EQUATION:
+            constraint = problem.get_equation(name, expression, constant)
+        else:
+            constraint = problem.get_inequality(name, expression, bool(flags & FLAG_GREATER_THAN),
+                                                bool(flags & FLAG_STRICT), constant)
+        problem.add_constraint(key, constraint)
+
+    return problem
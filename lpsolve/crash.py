@@ -0,0 +1,113 @@
+import numpy as np
+
+# A crash pivot must be at least this fraction of the largest coefficient
+# left in its row
+CRASH_PIVOT_TOLERANCE = 0.1
+
+
+def crash_basis(indptr, indices, data, residual, lower, upper, slack, allowed, float_tolerance=0.00001):
+    """Choose a starting basis from the structure of the constraint rows,
+    given as CSR arrays.
+
+    A row whose slack variable would start within its bounds keeps it.
+    The others are given structural columns by a lower triangular crash:
+    the row with the fewest columns still available is taken next, and
+    given whichever of them is found in the fewest of the remaining rows
+    (preferring free variables, then those with one bound, and then the
+    largest coefficient).  Every other column of that row is then made
+    unavailable, so each row's pivot element is left untouched by the
+    pivots before it and the basis needs no elimination to factorise.
+
+    Being triangular, the value each column takes is known as soon as it
+    is chosen, so only columns that would start within their bounds, and
+    keep the slack variables chosen within theirs, are taken.  A row with
+    none is left out, keeping its columns available to later rows.
+
+    residual is each row's right hand side less the contribution of every
+    column at rest, and allowed masks the columns that may be chosen at
+    all.  Returns a list of (row, column) pairs in pivot order, with the
+    slack rows last; rows not in it are left for artificial variables."""
+
+    rows      = len(indptr) - 1
+    indices, data = indices[:indptr[-1]], data[:indptr[-1]]
+    row_of    = np.repeat(np.arange(rows, dtype=np.int64), np.diff(indptr))
+    available = np.ones(rows, dtype=bool)
+
+    # Slacks that start within their bounds
+    slack_pairs = []
+    slack_coefficient = np.zeros(rows)
+    for entry in np.flatnonzero(slack[indices] & (data != 0)).tolist():
+        row, column = int(row_of[entry]), int(indices[entry])
+        if available[row] and allowed[column] and _within(residual[row] / data[entry], lower[column], upper[column],
+                                                          float_tolerance):
+            available[row] = False
+            slack_pairs.append((row, column))
+            slack_coefficient[row] = data[entry]
+    slack_column = np.full(rows, -1, dtype=np.int64)
+    for row, column in slack_pairs:
+        slack_column[row] = column
+
+    # Triangular crash over the rest, counting only the rows it covers
+    columns  = len(allowed)
+    active   = allowed & ~slack & (upper > lower)
+    entries  = np.flatnonzero(available[row_of] & active[indices] & (data != 0))
+    row_count = np.bincount(row_of[entries], minlength=rows)
+    col_count = np.bincount(indices[entries], minlength=columns)
+    by_column = entries[np.argsort(indices[entries], kind="stable")]
+    col_ptr   = np.concatenate(([0], np.cumsum(col_count)))
+    priority  = np.isfinite(lower).astype(np.int64) + np.isfinite(upper)
+
+    # Every entry by column, to follow each choice into the rows it moves
+    all_by_column = np.argsort(indices, kind="stable")
+    all_ptr  = np.concatenate(([0], np.cumsum(np.bincount(indices, minlength=columns))))
+    rest     = np.where(np.isfinite(lower), lower, np.where(np.isfinite(upper), upper, 0.0))
+    residual = np.array(residual, dtype=np.float64)
+
+    def keeps_slacks(column, step):
+        """Whether moving column by step leaves every slack chosen within its bounds"""
+
+        moved = all_by_column[all_ptr[column]:all_ptr[column + 1]]
+        moved = moved[slack_column[row_of[moved]] >= 0]
+        moved_rows = row_of[moved]
+        values = (residual[moved_rows] - data[moved] * step) / slack_coefficient[moved_rows]
+        return _within(values, lower[slack_column[moved_rows]], upper[slack_column[moved_rows]], float_tolerance).all()
+
+    pairs = []
+    while True:
+        remaining = available & (row_count > 0)
+        if not remaining.any():
+            break
+        row = int(np.argmin(np.where(remaining, row_count, np.iinfo(np.int64).max)))
+        available[row] = False
+
+        start, end   = indptr[row], indptr[row + 1]
+        candidates   = indices[start:end]
+        coefficients = data[start:end]
+        keep         = active[candidates] & (coefficients != 0)
+        candidates, coefficients = candidates[keep], coefficients[keep]
+        magnitudes   = np.abs(coefficients)
+        steps        = residual[row] / coefficients
+
+        acceptable = ((magnitudes >= CRASH_PIVOT_TOLERANCE * magnitudes.max()) &
+                      _within(rest[candidates] + steps, lower[candidates], upper[candidates], float_tolerance))
+        order  = np.lexsort((-magnitudes, priority[candidates], col_count[candidates]))
+        chosen = next((i for i in order.tolist() if acceptable[i] and keeps_slacks(candidates[i], steps[i])), None)
+        if chosen is None:
+            continue
+
+        # The rows it is found in now hold it at its new value
+        column = int(candidates[chosen])
+        moved  = all_by_column[all_ptr[column]:all_ptr[column + 1]]
+        residual[row_of[moved]] -= data[moved] * steps[chosen]
+        pairs.append((row, column))
+
+        # Keep the basis triangular by retiring every column of the row
+        active[candidates] = False
+        hit = np.concatenate([by_column[col_ptr[c]:col_ptr[c + 1]] for c in candidates.tolist()])
+        np.subtract.at(row_count, row_of[hit], 1)
+
+    return pairs + slack_pairs
+
+
+def _within(values, lower, upper, float_tolerance):
+    return (values >= lower - float_tolerance) & (values <= upper + float_tolerance)
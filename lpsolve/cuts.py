@@ -0,0 +1,507 @@
+import time
+import numpy as np
+from . import ir
+from .dense import AT_UPPER, BASIC, FREE, relaxed_bounds
+from .log import logger
+
+# Rounds of cuts at the root, and the most cuts added in a round
+CUT_ROUNDS     = 5
+CUTS_PER_ROUND = 50
+
+# Rounds in a row a cut may be slack before it is removed from the problem
+CUT_MAX_AGE = 3
+
+# Gomory cuts are taken only from rows whose basic value is at least this
+# far from an integer
+GOMORY_MIN_FRACTION = 0.01
+
+# Tableau entries smaller than this are taken to be zero
+ZERO_TOLERANCE = 1e-9
+
+# Coefficients smaller than the largest in their cut by more than this
+# factor are moved into the right hand side, or the cut dropped
+CUT_MAX_DYNAMISM = 1e6
+
+# Cuts must be violated by at least this, divided by their norm, to be added
+CUT_MIN_EFFICACY = 1e-4
+
+# A cut whose coefficients are this parallel to one in the pool is not added
+CUT_MAX_PARALLELISM = 0.999
+
+# Root rounds stop once the bound moves by less than this, relative to its size
+CUT_MIN_IMPROVEMENT = 1e-4
+
+# A cut is active, and does not age, when its slack is at most this
+ACTIVE_TOLERANCE = 1e-6
+
+
+class Cut:
+    """An inequality a.x <= rhs over the problem's structural columns,
+    valid for every integer solution.  kind is "gomory" or "cover", and
+    age the number of rounds in a row the LP solution has left it slack."""
+
+    __slots__ = ("name", "kind", "columns", "values", "rhs", "age")
+
+    def __init__(self, kind, columns, values, rhs):
+
+        self.name    = None     # Given when added to a pool
+        self.kind    = kind
+        self.columns = columns
+        self.values  = values
+        self.rhs     = rhs
+        self.age     = 0
+
+    def activity(self, values):
+        return float(self.values @ values[self.columns])
+
+    def efficacy(self, values):
+        """Distance by which values violate the cut"""
+
+        return (self.activity(values) - self.rhs) / float(np.linalg.norm(self.values))
+
+
+class CutPool:
+    """The cuts found so far, to be added to a problem as rows.
+
+    A cut ages by one each round the LP solution leaves it slack, and is
+    reset to zero whenever it is tight.  Cuts slack for more than max_age
+    rounds in a row are removed from the pool, and so from the problem."""
+
+    def __init__(self, max_age=CUT_MAX_AGE):
+
+        self.cuts    = []
+        self.max_age = max_age
+        self.count   = 0        # Cuts ever added, which names them
+        self.removed = 0
+
+    def __len__(self):
+        return len(self.cuts)
+
+    def add(self, cuts, values, limit=CUTS_PER_ROUND):
+        """Add up to limit of the cuts, most violated first, skipping any too
+        weakly violated or too nearly parallel to a cut in the pool, and
+        return those added"""
+
+        added = []
+        for efficacy, cut in sorted(((cut.efficacy(values), cut) for cut in cuts), key=lambda entry: -entry[0]):
+            if len(added) >= limit or efficacy < CUT_MIN_EFFICACY:
+                break
+            if any(_parallel(cut, other) for other in self.cuts):
+                continue
+            cut.name    = f"_cut{self.count}"
+            self.count += 1
+            self.cuts.append(cut)
+            added.append(cut)
+        return added
+
+    def age(self, values):
+        """Age the cuts left slack by values, and remove and return those
+        past max_age"""
+
+        for cut in self.cuts:
+            cut.age = cut.age + 1 if cut.rhs - cut.activity(values) > ACTIVE_TOLERANCE else 0
+        removed   = [cut for cut in self.cuts if cut.age > self.max_age]
+        self.cuts = [cut for cut in self.cuts if cut.age <= self.max_age]
+        self.removed += len(removed)
+        return removed
+
+    def apply(self, problem):
+        """Return a copy of the problem with a row for each cut in the pool"""
+
+        problem = problem.clone()
+        for cut in self.cuts:
+            add_cut(problem, cut)
+        return problem
+
+
+class CuttingPlanes:
+    """Tightens the LP relaxation of a problem in standard form with
+    integer variables by adding cutting planes, so that branch and bound
+    has fewer nodes to search.
+
+    solve_lp(problem, basis) solves a problem's LP relaxation and returns
+    the engine it used, which must give rows of the tableau (the dense,
+    revised or dual engine).  Each round at the root separates cuts that
+    the current LP solution violates and solves the relaxation again with
+    them added:
+
+     - Gomory mixed-integer cuts, from the tableau rows of integer basic
+       variables with fractional values
+     - knapsack cover cuts, from constraint rows over binary variables
+       (after moving other variables to their bounds), extended to every
+       binary variable at least as heavy as the heaviest in the cover
+
+    Cuts are kept in a CutPool, which removes those that stay slack for
+    too long.  Rounds stop when none is violated, the bound stops moving
+    or after rounds rounds, and the bound after each is reported.
+
+    Cover cuts hold for every node, so they may also be separated in the
+    tree, at nodes up to tree_depth deep; Gomory cuts derived at a node
+    would hold only below it, so they are found at the root alone."""
+
+    def __init__(self, problem, solve_lp, rounds=CUT_ROUNDS, tree_depth=0, max_age=CUT_MAX_AGE):
+
+        self.problem    = problem
+        self.solve_lp   = solve_lp
+        self.rounds     = rounds
+        self.tree_depth = tree_depth
+        self.pool       = CutPool(max_age)
+        self.rows       = _Rows(problem)
+        self.lower, self.upper = relaxed_bounds(problem.symbols)
+        self.integer    = (problem.symbols.flags & ir.INTEGER_FLAGS) != 0
+        self.binary     = self.integer & (self.lower == 0.0) & (self.upper == 1.0)
+
+        self.history    = []        # (round, Gomory cuts, cover cuts, removed, pool size, bound) after each round
+        self.tree_cuts  = 0
+        self.elapsed    = 0.0
+
+    def run(self, basis=None):
+        """Run the rounds at the root, starting the first LP from basis if
+        given, and return the problem with the pool's cuts added as rows
+        and the final LP's basis"""
+
+        start   = time.perf_counter()
+        problem = self.problem
+        tableau = self.solve_lp(problem, basis)
+        if tableau.status != "optimal":
+            logger.info("*** No cuts, the root relaxation ended %s", tableau.status or "at the iteration limit")
+            return problem, basis
+
+        basis  = tableau.get_basis() if hasattr(tableau, "get_basis") else None
+        values = _values(problem, tableau)
+        bound  = values[problem.symbols.index[ir.OBJECTIVE_VARIABLE_NAME]]
+        self.history.append((0, 0, 0, 0, 0, bound))
+        logger.info("Cut round 0: bound %s", bound)
+
+        for number in range(1, self.rounds + 1):
+            found = gomory_cuts(tableau, problem, values, self.lower, self.upper) + self._covers(values)
+            added = self.pool.add(found, values)
+            if not added:
+                logger.info("No violated cuts found")
+                break
+
+            problem = self.pool.apply(self.problem)
+            tableau = self.solve_lp(problem, basis)
+            if tableau.status != "optimal":
+                logger.info("*** Stopped cutting, the relaxation ended %s", tableau.status or "at the iteration limit")
+                break
+
+            basis   = tableau.get_basis() if hasattr(tableau, "get_basis") else None
+            values  = _values(problem, tableau)
+            removed = self.pool.age(values)
+            if basis is not None and removed:
+                basis = _without_cuts(basis, removed)
+            gomory  = sum(cut.kind == "gomory" for cut in added)
+            last, bound = bound, values[problem.symbols.index[ir.OBJECTIVE_VARIABLE_NAME]]
+            self.history.append((number, gomory, len(added) - gomory, len(removed), len(self.pool), bound))
+            logger.info("Cut round %d: %d Gomory and %d cover cuts added, %d removed, %d in pool, bound %s (%+.6g)",
+                        number, gomory, len(added) - gomory, len(removed), len(self.pool), bound, bound - last)
+            if last - bound <= CUT_MIN_IMPROVEMENT * max(abs(bound), 1.0):
+                break
+
+        self.elapsed = time.perf_counter() - start
+        root = self.history[0][5]
+        logger.info("Cuts moved the root bound from %s to %s in %d rounds, keeping %d (%.3fs)", root, bound,
+                    len(self.history) - 1, len(self.pool), self.elapsed)
+        return self.pool.apply(self.problem), basis
+
+    def separate(self, problem, values, depth):
+        """Add the cover cuts that a node's solution violates to the problem
+        being searched, if the node is no deeper than tree_depth, and return
+        how many were added"""
+
+        if depth > self.tree_depth:
+            return 0
+        added = self.pool.add(self._covers(values), values)
+        for cut in added:
+            add_cut(problem, cut)
+        self.tree_cuts += len(added)
+        return len(added)
+
+    def restore(self, solution):
+        """Map a solution of the problem with cuts to the problem without"""
+
+        symbols = self.problem.symbols
+        variable_values = {symbols.variable(var.index): value
+                           for var, value in list(solution.variables.items()) + list(solution.slack_variables.items())
+                           if var.index < len(symbols)}
+
+        rows  = {constraint.name for constraint in self.problem.constraints.values()}
+        basis = solution.basis
+        if basis is not None:
+            basis = ir.Basis({row: column for row, column in basis.rows.items() if row in rows},
+                             {column: status for column, status in basis.columns.items() if column in symbols})
+        reduced_costs = duals = None
+        if solution.reduced_costs is not None:
+            reduced_costs = {name: cost for name, cost in solution.reduced_costs.items() if name in symbols}
+        if solution.duals is not None:
+            duals = {name: dual for name, dual in solution.duals.items() if name in rows}
+        return ir.Solution(self.problem, variable_values, solution.optimal, solution.objective, solution.status, basis,
+                           reduced_costs, duals)
+
+    def summarise(self):
+        print(f"Cuts: {self.pool.count} added, {self.pool.removed} removed, {len(self.pool)} kept, "
+              f"{self.tree_cuts} in the tree, time: {self.elapsed:.3f}s")
+        for number, gomory, cover, removed, size, bound in self.history:
+            print(f"  round {number:>3}: {gomory:>4} Gomory {cover:>4} cover {removed:>4} removed {size:>5} in pool  "
+                  f"bound {bound}")
+
+    def _covers(self, values):
+        """Cover cuts violated by values, from each row of the problem
+        without cuts, read as one or two knapsack constraints"""
+
+        rows, cuts = self.rows, []
+        for row in range(len(rows.constants)):
+            columns, coefficients = rows.row(row)
+            for sign, capacity in rows.knapsacks(row, self.lower, self.upper):
+                cut = _cover(columns, sign * coefficients, sign * capacity, values, self.binary, self.lower, self.upper)
+                if cut is not None:
+                    cuts.append(cut)
+        return cuts
+
+
+def gomory_cuts(tableau, problem, values, lower, upper, limit=CUTS_PER_ROUND):
+    """Gomory mixed-integer cuts from the rows of a solved tableau whose
+    basic variable is integer but fractional, the most fractional first.
+
+    With each non-basic variable written as its distance t from the bound
+    it rests at, row i of the tableau reads x_i + sum(a_j t_j) = v, and
+    with f the fractional part of v (and f_j that of a_j) every integer
+    solution has
+
+        sum over integer t_j of  min(f_j / f, (1 - f_j) / (1 - f)) t_j
+        + sum over other t_j of  max(a_j / f, -a_j / (1 - f)) t_j  >=  1
+
+    which the current solution, with every t_j zero, violates.  Slack
+    variables are substituted out, so that the cut is over structural
+    columns only."""
+
+    symbols  = problem.symbols
+    columns  = len(symbols)
+    rows     = _Rows(problem)
+    integer  = (symbols.flags & ir.INTEGER_FLAGS) != 0
+    status   = tableau.status_array[:columns]
+    at_upper = status == AT_UPPER
+    resting  = np.where(at_upper, tableau.upper[:columns], tableau.lower[:columns])
+    fixed    = tableau.lower[:columns] == tableau.upper[:columns]
+    stepped  = integer & (resting == np.round(resting))     # Integer distances from the bound
+
+    # Rows with an integer basic variable at a fractional value, most fractional first
+    candidates = []
+    for row, basic in enumerate(tableau.basis.tolist()):
+        if 0 <= basic < columns and integer[basic]:
+            fraction = values[basic] - np.floor(values[basic])
+            if min(fraction, 1.0 - fraction) >= GOMORY_MIN_FRACTION:
+                candidates.append((-min(fraction, 1.0 - fraction), row, basic, fraction))
+    candidates.sort()
+
+    cuts = []
+    for _, row, basic, fraction in candidates[:limit]:
+        alpha = np.array(tableau._tableau_row(row), dtype=np.float64)[:columns]
+        alpha[(status == BASIC) | fixed | (np.abs(alpha) <= ZERO_TOLERANCE)] = 0.0
+        nonzero = np.flatnonzero(alpha)
+        if (status[nonzero] == FREE).any():
+            continue
+
+        a     = np.where(at_upper[nonzero], -alpha[nonzero], alpha[nonzero])
+        parts = a - np.floor(a)
+        g     = np.where(stepped[nonzero],
+                         np.where(parts <= fraction, parts / fraction, (1.0 - parts) / (1.0 - fraction)),
+                         np.where(a >= 0.0, a / fraction, -a / (1.0 - fraction)))
+
+        # sum(g t) >= 1, with t = x - lower at a lower bound and upper - x at an upper
+        sign = np.where(at_upper[nonzero], -1.0, 1.0)
+        coefficients = np.zeros(columns)
+        coefficients[nonzero] = g * sign
+        rhs = 1.0 + float(np.sum(g * sign * resting[nonzero]))
+        coefficients, rhs = rows.substitute_slacks(-coefficients, -rhs)
+        cut = _cut("gomory", coefficients, rhs, lower, upper)
+        if cut is not None:
+            cuts.append(cut)
+    return cuts
+
+
+def add_cut(problem, cut):
+    """Add a cut to a problem in standard form, as an equation with a slack
+    variable of its own"""
+
+    symbols = problem.symbols
+    slack   = symbols.new_variable(f"_s_{cut.name}", True)
+    terms   = [(value, symbols.variable(column)) for column, value in zip(cut.columns.tolist(), cut.values.tolist())]
+    problem.constraints[cut.name] = ir.Equation(problem, f"_c_{cut.name}", terms + [(1.0, slack)], cut.rhs)
+
+
+class _Rows:
+    """The constraint rows of a problem in standard form as CSR arrays,
+    with the row and coefficient of each slack column"""
+
+    def __init__(self, problem):
+
+        symbols     = problem.symbols
+        constraints = list(problem.constraints.values())
+        self.indptr, self.indices, self.data = problem.matrix.select_rows([c.expression.row for c in constraints])
+        self.constants = np.array([constraint.constant for constraint in constraints], dtype=np.float64)
+        self.owners    = np.repeat(np.arange(len(constraints)), np.diff(self.indptr))
+        self.slack     = (symbols.flags & ir.FLAG_SLACK) != 0
+
+        entries = self.slack[self.indices]
+        self.slack_row         = np.full(len(symbols), -1, dtype=np.int64)
+        self.slack_coefficient = np.zeros(len(symbols))
+        self.slack_row[self.indices[entries]]         = self.owners[entries]
+        self.slack_coefficient[self.indices[entries]] = self.data[entries]
+        self.row_slack = np.full(len(constraints), -1, dtype=np.int64)
+        self.row_slack[self.owners[entries]] = self.indices[entries]
+
+    def row(self, row):
+        """Structural columns and coefficients of a row"""
+
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        keep = ~self.slack[self.indices[start:stop]]
+        return self.indices[start:stop][keep], self.data[start:stop][keep]
+
+    def knapsacks(self, row, lower, upper):
+        """(sign, capacity) for each way of reading a row as
+        sign * a.x <= sign * capacity, given the bounds of its slack"""
+
+        constant = self.constants[row]
+        slack    = self.row_slack[row]
+        if slack < 0:
+            return [(1.0, constant), (-1.0, constant)]
+
+        # a.x = constant - c s, for c s between its least and greatest values
+        coefficient = self.slack_coefficient[slack]
+        least, most = sorted((coefficient * lower[slack], coefficient * upper[slack]))
+        knapsacks = []
+        if np.isfinite(least):
+            knapsacks.append((1.0, constant - least))
+        if np.isfinite(most):
+            knapsacks.append((-1.0, constant - most))
+        return knapsacks
+
+    def substitute_slacks(self, coefficients, rhs):
+        """Rewrite a.x <= rhs without slack columns, replacing each by what
+        its row makes it equal to"""
+
+        slack = np.flatnonzero((self.slack_row >= 0) & (coefficients != 0.0))
+        if not len(slack):
+            return coefficients, rhs
+
+        multipliers = np.zeros(len(self.constants))
+        multipliers[self.slack_row[slack]] = coefficients[slack] / self.slack_coefficient[slack]
+        coefficients = coefficients - np.bincount(self.indices, multipliers[self.owners] * self.data,
+                                                  minlength=len(coefficients))
+        coefficients[slack] = 0.0
+        return coefficients, rhs - float(multipliers @ self.constants)
+
+
+def _cut(kind, coefficients, rhs, lower, upper):
+    """Make a Cut of a.x <= rhs from a dense array of coefficients, scaled
+    so that the largest is one.  Coefficients too small beside the largest
+    are dropped, with the right hand side loosened by the least each term
+    can be.  Returns None if that is unbounded or there is nothing left."""
+
+    magnitude = np.abs(coefficients)
+    largest   = magnitude.max() if len(magnitude) else 0.0
+    if largest <= ZERO_TOLERANCE:
+        return None
+
+    tiny = np.flatnonzero((magnitude > 0.0) & (magnitude < largest / CUT_MAX_DYNAMISM))
+    if len(tiny):
+        least = np.where(coefficients[tiny] > 0.0, coefficients[tiny] * lower[tiny], coefficients[tiny] * upper[tiny])
+        if not np.isfinite(least).all():
+            return None
+        rhs -= float(least.sum())
+
+    columns = np.flatnonzero(magnitude >= largest / CUT_MAX_DYNAMISM)
+    return Cut(kind, columns, coefficients[columns] / largest, rhs / largest)
+
+
+def _cover(columns, coefficients, capacity, values, binary, lower, upper):
+    """A cover cut from the knapsack a.x <= capacity that values violate,
+    or None.
+
+    Other variables are moved to the bound least in the way, and binary
+    variables with negative coefficients complemented (x replaced by 1 - x),
+    leaving sum(a_j y_j) <= capacity with every a_j positive.  A cover is a
+    set C whose weights sum to more than the capacity, so that
+    sum(y_j for j in C) <= |C| - 1; it is chosen greedily, taking the
+    variables with the smallest (1 - y_j) / a_j first, then made minimal."""
+
+    others = ~binary[columns]
+    if others.any():
+        a     = coefficients[others]
+        least = np.where(a > 0.0, a * lower[columns[others]], a * upper[columns[others]])
+        if not np.isfinite(least).all():
+            return None
+        capacity -= float(least.sum())
+
+    keep = ~others & (coefficients != 0.0)
+    columns, coefficients = columns[keep], coefficients[keep]
+    complemented = coefficients < 0.0
+    weights   = np.abs(coefficients)
+    capacity -= float(coefficients[complemented].sum())
+    levels    = np.where(complemented, 1.0 - values[columns], values[columns])
+    if weights.sum() <= capacity + ZERO_TOLERANCE or capacity < 0.0:
+        return None
+
+    order = np.argsort((1.0 - levels) / weights, kind="stable")
+    size  = int(np.searchsorted(np.cumsum(weights[order]), capacity + ZERO_TOLERANCE, side="right")) + 1
+    cover = order[:size].tolist()
+
+    # Drop the least used variables that the cover can do without
+    weight = weights[cover].sum()
+    for item in sorted(cover, key=lambda item: levels[item]):
+        if weight - weights[item] > capacity + ZERO_TOLERANCE:
+            cover.remove(item)
+            weight -= weights[item]
+    if levels[cover].sum() <= len(cover) - 1 + ACTIVE_TOLERANCE:
+        return None
+
+    # Every variable at least as heavy as the heaviest in the cover can join it
+    extended = np.union1d(cover, np.flatnonzero(weights >= weights[cover].max()))
+    signs    = np.where(complemented[extended], -1.0, 1.0)
+    rhs      = len(cover) - 1 - int(complemented[extended].sum())
+    return Cut("cover", columns[extended], signs, float(rhs))
+
+
+def _without_cuts(basis, cuts):
+    """The basis with the rows of the given cuts taken out, so that it fits
+    the problem without them.
+
+    A cut is removed only while it is slack, so its slack variable is basic;
+    dropping it along with the row leaves a basis of the smaller problem.
+    The column basic in the cut's row moves to the row its slack was basic
+    in.  Should a slack not be basic after all, that column is dropped
+    instead, and the row left for the engine to fill."""
+
+    rows    = {f"_c_{cut.name}" for cut in cuts}
+    slacks  = {f"_s_{cut.name}" for cut in cuts}
+    moved   = [column for row, column in basis.rows.items() if row in rows and column not in slacks]
+    kept    = {}
+    for row, column in basis.rows.items():
+        if row in rows:
+            continue
+        if column in slacks:
+            if not moved:
+                continue
+            column = moved.pop()
+        kept[row] = column
+    columns = {column: status for column, status in basis.columns.items() if column not in slacks}
+    return ir.Basis(kept, columns)
+
+
+def _parallel(cut, other):
+    common, first, second = np.intersect1d(cut.columns, other.columns, assume_unique=True, return_indices=True)
+    if not len(common):
+        return False
+    product = float(cut.values[first] @ other.values[second])
+    return product >= CUT_MAX_PARALLELISM * np.linalg.norm(cut.values) * np.linalg.norm(other.values)
+
+
+def _values(problem, tableau):
+    """Value of every column in a solved tableau, by index"""
+
+    values = np.zeros(len(problem.symbols))
+    for var, value in tableau.get_result().items():
+        values[var.index] = value
+    return values
@@ -0,0 +1,432 @@
+import numpy as np
+from . import ir, stats
+from .crash import crash_basis
+from .log import logger
+from .pricing import get_pricing
+
+# Status of each column
+BASIC    = 0
+AT_LOWER = 1
+AT_UPPER = 2
+FREE     = 3
+
+STATUS_NAMES = {AT_LOWER: "lower", AT_UPPER: "upper", FREE: "free"}
+
+# Rows updated at once by a pivot, which bounds the temporary it needs
+PIVOT_BLOCK_ROWS = 256
+
+
+def relaxed_bounds(symbols):
+    """Return copies of the lower and upper bound arrays, with binary
+    variables relaxed to [0, 1] and strictness ignored"""
+
+    lower  = symbols.lower_bounds.copy()
+    upper  = symbols.upper_bounds.copy()
+    binary = (symbols.flags & ir.FLAG_BINARY) != 0
+    lower[binary] = np.maximum(lower[binary], 0.0)
+    upper[binary] = np.minimum(upper[binary], 1.0)
+    return lower, upper
+
+
+class DenseTableau:
+    """A simplex tableau held as a dense float64 array, making the same
+    choices as solve.Tableau but with each step vectorised.
+
+    `table` has a row per constraint and a last row for the objective, and
+    a column per variable.  The values of the basic variables, and of the
+    objective variable in the last row, are held apart in `values`, so a
+    pivot is an in-place rank-1 update of `table` alone.  `basis` holds the
+    basic column of each row (-1 for a row left empty) and `status_array`
+    the status of each column: BASIC, AT_LOWER, AT_UPPER or FREE.  These
+    are updated at every pivot, so the solution, the basis and the reduced
+    costs are read from them without searching the table.
+
+    Rows and columns are named by `row_names` and `columns`, the variables
+    of the problem in column order.
+
+    The starting basis is chosen by crash.crash_basis (or, if crash is
+    False, from slack variables alone).  Any row left without a basic
+    variable, or whose basic variable starts outside its bounds, is given
+    an artificial variable in its place, added as an extra column, and
+    phase one maximises minus their sum with its own objective row on the
+    end of the table.  Once they are all zero the row is dropped, the
+    artificial variables are fixed at zero and phase two carries on from
+    the feasible basis reached; if phase one can go no further with any
+    still positive the problem is infeasible.
+
+    Entering columns are chosen by a strategy from pricing.PRICING, named
+    by pricing or by the method given to pivot()."""
+
+    WARM_START = False  # get_basis gives a basis, but one cannot be started from
+
+    def __init__(self, problem, float_tolerance=0.00001, crash=True, pricing="lowest"):
+
+        self.float_tolerance = float_tolerance
+        self.status          = None     # "optimal", "unbounded" or "infeasible" once known
+
+        symbols      = problem.symbols
+        constraints  = list(problem.constraints.values()) + [problem.objective]
+        self.columns   = list(symbols)
+        self.row_names = [constraint.name for constraint in constraints]
+
+        rows = len(constraints)
+        self.rows = rows - 1
+        indptr, indices, data = problem.matrix.select_rows([c.expression.row for c in constraints])
+        self.table  = np.zeros((rows, len(symbols)))
+        self.table[np.repeat(np.arange(rows), np.diff(indptr)), indices] = data
+        self.values = np.array([constraint.constant for constraint in constraints], dtype=np.float64)
+
+        self.lower, self.upper = relaxed_bounds(symbols)
+        for column in np.flatnonzero(self.lower > self.upper).tolist():
+            logger.info("*** Bounds of %s cannot be met: %s > %s", self.columns[column].name, self.lower[column],
+                        self.upper[column])
+            self.status = "infeasible"
+
+        self.status_array = np.where(np.isfinite(self.lower), AT_LOWER,
+                                     np.where(np.isfinite(self.upper), AT_UPPER, FREE)).astype(np.int8)
+        self.basis = np.full(rows, -1, dtype=np.int64)
+        objective_column = symbols.index[ir.OBJECTIVE_VARIABLE_NAME]
+        self.basis[-1] = objective_column
+        self.status_array[objective_column] = BASIC
+        self.slack = (symbols.flags & ir.FLAG_SLACK) != 0
+
+        # The slack column of each row, or -1 if it has none, whose reduced
+        # cost is the row's dual value
+        owners  = np.repeat(np.arange(rows), np.diff(indptr))
+        entries = self.slack[indices] & (owners < self.rows)     # The objective variable is flagged slack too
+        self.slack_columns = np.full(self.rows, -1, dtype=np.int64)
+        self.slack_columns[owners[entries]] = indices[entries]
+        self.phase = 2
+        self.artificial_rows = np.zeros(0, dtype=np.int64)
+        self.entering = None    # Names of the variables moved by the last pivot
+        self.leaving  = None
+        self._chosen  = None    # (strategy, column) that optimal() priced, for pivot() to take
+
+        self._initial_basis(indptr, indices, data, crash)
+        self._add_artificials()
+        self.pricing = get_pricing(pricing, self)
+
+    def optimal(self):
+        """Check the objective row for a non-basic variable that can move in
+        a direction that improves the objective"""
+
+        self._chosen = (self.pricing, self.pricing.choose())
+        return self._chosen[1] is None
+
+    def _entering(self):
+        """The column optimal() chose, if the strategy is the same and the
+        engine has not pivoted since, or else a fresh choice"""
+
+        chosen, self._chosen = self._chosen, None
+        if chosen is not None and chosen[0] is self.pricing and chosen[1] is not None:
+            return chosen[1]
+        return self.pricing.choose()
+
+    def pivot(self, method):
+        """method names the pricing strategy, one of pricing.PRICING:
+
+        lowest --- selects the most extreme value
+        bland --- implement's bland's rule
+        devex --- devex reference weights
+        steepest --- steepest edge
+        partial --- partial pricing
+        """
+
+        if method != self.pricing.name:
+            self.pricing = get_pricing(method, self)
+        column    = self._entering()
+        direction = 1 if self.table[-1, column] < 0 else -1
+        name      = self._name(column)
+
+        logger.debug("Selected %s to %s from %s", name, "increase" if direction > 0 else "decrease",
+                     STATUS_NAMES[self.status_array[column]])
+        step, row, bound = self._ratio_test(column, direction, self.pricing.bland)
+        self.entering, self.leaving = name, None
+        if step == float("+infinity"):
+            logger.info("*** %s can improve the objective without limit", name)
+            self.status = "unbounded"
+            return
+
+        # Move every basic variable along with the entering one
+        self.values -= self.table[:, column] * (direction * step)
+
+        if row is None:
+            logger.debug("Flipping %s to its %s bound", name, STATUS_NAMES[bound])
+            self.status_array[column] = bound
+        else:
+            value   = self._nonbasic_values()[column] + direction * step
+            leaving = self.basis[row]
+            self.leaving = self._name(leaving)
+            logger.debug("%s leaves the basis at its %s bound (step: %s)", self.leaving, STATUS_NAMES[bound], step)
+            self.pricing.update(column, row, self.table[:self.rows, column])
+            self._pivot(row, column)
+            self.status_array[leaving] = bound
+            self.status_array[column]  = BASIC
+            self.basis[row]  = column
+            self.values[row] = value
+
+            # An artificial variable is not let back in once it has left
+            if leaving >= len(self.columns):
+                self.upper[leaving] = 0.0
+
+        if self.phase == 1:
+            self._check_phase_one()
+
+    def progress(self):
+        """The objective being maximised and the primal and dual
+        infeasibility, as for solve.Iteration"""
+
+        rows   = np.flatnonzero(self.basis[:self.rows] >= 0)
+        basic  = self.basis[rows]
+        values = self.values[rows]
+        primal = (np.maximum(self.lower[basic] - values, 0.0) + np.maximum(values - self.upper[basic], 0.0)).sum()
+        if self.phase == 1:
+            primal += -self.values[-1]
+        return float(self.values[-1]), float(primal), float(np.abs(self.table[-1, self._eligible()]).sum())
+
+    def _reduced_costs(self, columns=slice(None)):
+        return self.table[-1, columns]
+
+    def _eligible(self, columns=slice(None)):
+        """Mask of non-basic columns (of all, or the given slice) whose
+        reduced cost improves the objective in a direction they can move in"""
+
+        costs  = self.table[-1, columns]
+        status = self.status_array[columns]
+        return ((status != BASIC) & (self.upper[columns] > self.lower[columns]) &
+                (((costs < -self.float_tolerance) & (status != AT_UPPER)) |
+                 ((costs > self.float_tolerance) & (status != AT_LOWER))))
+
+    def _tableau_row(self, row):
+        return self.table[row]
+
+    def _column_products(self, vector):
+        """Dot product of each column of the tableau with vector, by row"""
+
+        return vector @ self.table[:self.rows]
+
+    def _column_norms(self):
+        """Squared norm of each column of the tableau"""
+
+        return np.einsum("ij,ij->j", self.table[:self.rows], self.table[:self.rows])
+
+    @stats.timed("ratio_test")
+    def _ratio_test(self, column, direction, bland=False):
+        """Find how far the entering column can move, as solve.Tableau does.
+
+        Returns the step, the row that leaves (None for a bound flip or an
+        unbounded step) and the status the leaving column takes."""
+
+        rows   = np.flatnonzero(self.basis[:-1] >= 0)
+        basic  = self.basis[rows]
+        alpha  = self.table[rows, column] * direction
+        values = self.values[rows]
+        lower, upper = self.lower[basic], self.upper[basic]
+
+        falling = (alpha > self.float_tolerance) & np.isfinite(lower)
+        rising  = (alpha < -self.float_tolerance) & np.isfinite(upper)
+        limits  = np.full(len(rows), np.inf)
+        limits[falling] = (values[falling] - lower[falling]) / alpha[falling]
+        limits[rising]  = (upper[rising] - values[rising]) / -alpha[rising]
+        limits[falling | rising] = np.maximum(limits[falling | rising], 0.0)
+
+        flip = self.upper[column] - self.lower[column]
+        if not (falling | rising).any() or flip <= limits.min():
+            return flip, None, AT_UPPER if direction > 0 else AT_LOWER
+
+        ties = np.flatnonzero(limits <= limits.min() + self.float_tolerance)
+        if bland:
+            chosen = ties[np.argmin(basic[ties])]
+        else:
+            chosen = ties[np.argmax(np.abs(alpha[ties]))]
+
+        return float(limits[chosen]), int(rows[chosen]), AT_LOWER if falling[chosen] else AT_UPPER
+
+    @stats.timed("pivot")
+    def _pivot(self, row, column, include_values=False):
+        """Pivot around a row and column with a rank-1 update of the table,
+        in blocks of rows so that no copy of the whole table is made"""
+
+        table     = self.table
+        pivot_row = table[row]
+        element   = pivot_row[column]
+        pivot_row /= element
+        pivot_row[column] = 1.0
+        if include_values:
+            self.values[row] /= element
+
+        factors = table[:, column].copy()
+        factors[row] = 0.0
+        for start in range(0, len(table), PIVOT_BLOCK_ROWS):
+            block = factors[start:start + PIVOT_BLOCK_ROWS]
+            if block.any():
+                table[start:start + PIVOT_BLOCK_ROWS] -= block[:, None] * pivot_row
+        table[:, column][factors != 0] = 0.0
+
+        if include_values:
+            self.values -= factors * self.values[row]
+
+    def _initial_basis(self, indptr, indices, data, crash=True):
+        """Choose a basic column for as many rows as crash.crash_basis will,
+        given the rows as CSR arrays, and set the values of the basic
+        variables"""
+
+        table    = self.table
+        rows     = len(table) - 1
+        residual = self.values[:-1] - table[:-1] @ self._nonbasic_values()
+        allowed  = self.status_array != BASIC
+        if not crash:
+            allowed &= self.slack
+
+        for row, column in crash_basis(indptr[:rows + 1], indices, data, residual, self.lower, self.upper,
+                                       self.slack, allowed, self.float_tolerance):
+            if not (self.slack[column] and table[row, column] == 1):
+                self._pivot(row, column, include_values=True)
+            self.basis[row] = column
+            self.status_array[column] = BASIC
+
+        # Basic values follow from the non-basic ones
+        self.values -= table @ self._nonbasic_values()
+
+    def _add_artificials(self):
+        """Put an artificial variable in each row that has no basic variable
+        or whose basic variable is outside its bounds, which then rests at
+        the bound it broke, and start phase one if any are needed"""
+
+        rows, columns = len(self.table) - 1, len(self.columns)
+        basic  = self.basis[:-1]
+        values = self.values[:-1]
+        safe   = np.maximum(basic, 0)
+        needed = np.flatnonzero((basic < 0) |
+                                (values < self.lower[safe] - self.float_tolerance) |
+                                (values > self.upper[safe] + self.float_tolerance))
+        if not len(needed):
+            return
+
+        for row in needed.tolist():
+            column   = self.basis[row]
+            residual = self.values[row]
+            if column >= 0:
+                below = residual < self.lower[column]
+                logger.info("*** Starting basis is infeasible: %s = %s, outside [%s, %s]", self._name(column), residual,
+                            self.lower[column], self.upper[column])
+                self.status_array[column] = AT_LOWER if below else AT_UPPER
+                residual -= self.lower[column] if below else self.upper[column]
+
+            # Signed so that the artificial variable starts non-negative
+            if residual < 0:
+                self.table[row] *= -1.0
+            self.values[row] = abs(residual)
+
+        # One column per artificial variable, and the phase one objective row
+        # with them priced out
+        count = len(needed)
+        table = np.zeros((rows + 2, columns + count))
+        table[:-1, :columns] = self.table
+        table[needed, columns + np.arange(count)] = 1.0
+        table[-1, :columns] -= table[needed, :columns].sum(axis=0)
+        self.table = table
+
+        self.basis[needed] = columns + np.arange(count)
+        self.basis  = np.append(self.basis, -1)
+        self.values = np.append(self.values, -self.values[needed].sum())
+        self.lower  = np.concatenate((self.lower, np.zeros(count)))
+        self.upper  = np.concatenate((self.upper, np.full(count, np.inf)))
+        self.slack  = np.concatenate((self.slack, np.zeros(count, dtype=bool)))
+        self.status_array = np.concatenate((self.status_array, np.full(count, BASIC, dtype=np.int8)))
+        self.row_names.append("phase one")
+        self.artificial_rows = needed
+        self.phase = 1
+
+        logger.info("Phase one: %d artificial variables, infeasibility %s", count, -self.values[-1])
+        self._check_phase_one()
+
+    def _check_phase_one(self):
+        """End phase one once the artificial variables are all zero, or
+        report the problem infeasible if they cannot be made so"""
+
+        infeasibility = -self.values[-1]
+        if infeasibility > self.float_tolerance:
+            if not self._eligible().any():
+                logger.info("*** Phase one cannot remove the last %s of infeasibility", infeasibility)
+                self.status = "infeasible"
+            return
+
+        logger.info("Phase one complete, the basis is feasible")
+        self.table  = self.table[:-1]
+        self.values = self.values[:-1]
+        self.basis  = self.basis[:-1]
+        self.row_names.pop()
+        self.upper[len(self.columns):] = 0.0
+        self.phase = 2
+
+    def _nonbasic_values(self):
+        """Values of the non-basic columns, with zero for basic ones"""
+
+        status = self.status_array
+        return np.where(status == AT_LOWER, self.lower, np.where(status == AT_UPPER, self.upper, 0.0))
+
+    def get_result(self):
+        """Extract values from the tableau"""
+
+        values = self._nonbasic_values()
+        rows   = np.flatnonzero(self.basis >= 0)
+        values[self.basis[rows]] = self.values[rows]
+        values = values[:len(self.columns)]
+        values[np.abs(values) < self.float_tolerance] = 0
+
+        return dict(zip(self.columns, values.tolist()))
+
+    def get_basis(self):
+        """Return the current basis, by name, as RevisedSimplex.get_basis
+        does"""
+
+        names   = [var.name for var in self.columns]
+        rows    = {self.row_names[row]: names[column] for row, column in enumerate(self.basis[:self.rows].tolist())
+                   if 0 <= column < len(names)}
+        columns = {name: STATUS_NAMES.get(status, "basic")
+                   for name, status in zip(names, self.status_array[:len(names)].tolist())}
+        return ir.Basis(rows, columns)
+
+    def get_reduced_costs(self):
+        """Return the reduced cost of each variable, by name, from the
+        objective row (see ir.Solution)"""
+
+        reduced = -self.table[self.rows, :len(self.columns)]
+        reduced[self.status_array[:len(self.columns)] == BASIC] = 0.0
+        reduced[np.abs(reduced) < self.float_tolerance] = 0.0
+        return dict(zip([var.name for var in self.columns], reduced.tolist()))
+
+    def get_duals(self):
+        """Return the dual value of each row with a slack variable, by name,
+        from the slack's entry in the objective row"""
+
+        rows  = np.flatnonzero(self.slack_columns >= 0)
+        duals = self.table[self.rows, self.slack_columns[rows]]
+        duals[np.abs(duals) < self.float_tolerance] = 0.0
+        return {self.row_names[row]: dual for row, dual in zip(rows.tolist(), duals.tolist())}
+
+    def _name(self, column):
+        if column < len(self.columns):
+            return self.columns[column].name
+        return f"_a_{self.row_names[self.artificial_rows[column - len(self.columns)]]}"
+
+    def summarise(self):
+
+        CELL_WIDTH = 20
+
+        out = ["expression".rjust(CELL_WIDTH), "basic".rjust(CELL_WIDTH)]
+        out += [self._name(column).rjust(CELL_WIDTH) for column in range(self.table.shape[1])]
+        out.append("__const__".rjust(CELL_WIDTH))
+        print("|".join(out))
+
+        for row, name in enumerate(self.row_names):
+            basic = self.basis[row]
+            out = [name.rjust(CELL_WIDTH), (self._name(basic) if basic >= 0 else "").rjust(CELL_WIDTH)]
+            out += [f"{value}".rjust(CELL_WIDTH) for value in self.table[row].tolist()]
+            out.append(f"{self.values[row]}".rjust(CELL_WIDTH))
+            print("|".join(out))
+
+        at_upper = [self._name(column) for column in np.flatnonzero(self.status_array == AT_UPPER).tolist()]
+        if at_upper:
+            print(f"At upper bound: {', '.join(at_upper)}")
@@ -0,0 +1,132 @@
+import numpy as np
+from . import stats
+from .dense import BASIC, AT_LOWER, AT_UPPER, FREE
+from .log import logger
+from .pricing import DUAL_PRICING, get_pricing
+from .revised import RevisedSimplex
+
+
+class DualSimplex(RevisedSimplex):
+    """The dual simplex method, on the factorised basis of RevisedSimplex.
+
+    Where the primal method keeps the basic variables within their bounds
+    and works towards reduced costs of the right sign, the dual method keeps
+    the reduced costs of the right sign (dual feasibility) and works towards
+    basic variables within their bounds.  An optimal basis stays dual
+    feasible when a constant or bound changes or a row is added, so
+    starting from it (see RevisedSimplex.get_basis) usually needs only a
+    few dual pivots to reach the new optimum.
+
+    Each dual pivot picks the basic variable furthest outside its bounds to
+    leave (or the lowest numbered one, with bland's rule), relative to the
+    weights of the pricing.DUAL_PRICING strategy paired with the primal
+    one, computes its row
+    of the tableau from the dual prices, and lets in the column with the
+    smallest ratio of reduced cost to row entry among those that move the
+    leaving variable towards its bound.  If no column can, the problem is
+    infeasible.  Once the basis is primal feasible any remaining work is
+    done by primal pivots, so a basis that is primal but not dual feasible
+    also solves.  A basis that is neither starts with the primal phase
+    one instead."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dual_pricing = DUAL_PRICING[self.pricing.name](self)
+
+    def optimal(self):
+        return not self._infeasible_rows().any() and super().optimal()
+
+    def pivot(self, method):
+        """method names the pricing strategy, as for RevisedSimplex.pivot:
+
+        lowest --- selects the most infeasible row
+        bland --- implement's bland's rule
+        devex --- dual devex reference weights
+        steepest --- dual steepest edge
+        partial --- as lowest, with partial pricing for primal pivots
+        """
+
+        if method != self.pricing.name:
+            self.pricing      = get_pricing(method, self)
+            self.dual_pricing = DUAL_PRICING[method](self)
+        if not self._infeasible_rows().any():
+            return super().pivot(method)
+
+        infeasible = self._infeasible_rows()
+        below      = self.lower[self.basis] - self.values
+        above      = self.values - self.upper[self.basis]
+        row        = self.dual_pricing.choose(np.where(infeasible, np.maximum(below, above), 0.0))
+
+        leaving  = self.basis[row]
+        to_lower = below[row] > self.float_tolerance
+        target   = self.lower[leaving] if to_lower else self.upper[leaving]
+        logger.debug("Selected %s = %s to leave at its %s bound %s", self._name(leaving), self.values[row],
+                     "lower" if to_lower else "upper", target)
+
+        column = self._dual_ratio_test(row, to_lower, self.dual_pricing.bland)
+        self.entering, self.leaving = None, self._name(leaving)
+        if column is None:
+            logger.info("*** %s cannot be brought within its bounds", self.leaving)
+            self.status = "infeasible"
+            return
+
+        # Move the entering variable just far enough for the leaving one to reach its bound
+        alpha = self._ftran(self._column(column))
+        step  = (self.values[row] - target) / alpha[row]
+        value = self._nonbasic_values()[column] + step
+        self.entering = self._name(column)
+        logger.debug("%s enters the basis (step: %s)", self.entering, step)
+
+        self.values -= alpha * step
+        self._replace(row, column, alpha, value, AT_LOWER if to_lower else AT_UPPER)
+
+    @stats.timed("pivot")
+    def _replace(self, row, column, alpha, value, bound):
+        self.dual_pricing.update(column, row, alpha)
+        super()._replace(row, column, alpha, value, bound)
+
+    def _check_start(self):
+        """A dual feasible start needs no phase one, whatever the values of
+        the basic variables"""
+
+        if self._eligible().any():
+            super()._check_start()
+
+    def _infeasible_rows(self):
+        """Mask of rows whose basic variable is outside its bounds"""
+
+        values = self.values
+        basic  = self.basis
+        return ((values < self.lower[basic] - self.float_tolerance) |
+                (values > self.upper[basic] + self.float_tolerance))
+
+    @stats.timed("ratio_test")
+    def _dual_ratio_test(self, row, to_lower, bland=False):
+        """Choose the column to enter in place of the given row's basic
+        variable, keeping the reduced costs of the right sign.
+
+        The basic variable changes by -a[j] for each unit that column j
+        moves, where a is the row of the tableau, so only columns that can
+        move in the direction that takes it towards its bound are
+        candidates.  Of those, the one whose reduced cost reaches zero first
+        enters, with ties going to the largest row entry, or with bland's
+        rule to the lowest numbered column."""
+
+        entries = self._tableau_row(row)
+        signed  = entries if to_lower else -entries
+        status  = self.status_array
+        tolerance = self.float_tolerance
+
+        candidates = ((status != BASIC) & (self.upper > self.lower) &
+                      (((status == AT_LOWER) & (signed < -tolerance)) |
+                       ((status == AT_UPPER) & (signed > tolerance)) |
+                       ((status == FREE) & (np.abs(signed) > tolerance))))
+        if not candidates.any():
+            return None
+
+        columns = np.flatnonzero(candidates)
+        ratios  = np.abs(self._reduced_costs()[columns]) / np.abs(entries[columns])
+        ties    = columns[ratios <= ratios.min() + tolerance]
+        if bland:
+            return int(ties.min())
+        return int(ties[np.argmax(np.abs(entries[ties]))])
@@ -0,0 +1,226 @@
+import time
+import numpy as np
+from . import ir
+from .branch import INTEGER_TOLERANCE, PRUNE_TOLERANCE, _solve_relaxation
+from .dense import relaxed_bounds
+
+# Roundings tried by randomised rounding
+ROUNDING_TRIES = 5
+
+# Most bound changes in a dive, and LPs in a feasibility pump
+DIVE_LIMIT = 50
+PUMP_LIMIT = 30
+
+# Integer variables flipped when the pump cycles, around this many
+PUMP_FLIPS = 10
+
+# Heuristics too slow to run at every node they are given, which are run
+# at the root alone
+ROOT_ONLY = ("randomised", "pump")
+
+
+class PrimalHeuristics:
+    """Looks for integer feasible solutions near a node's LP solution, to
+    give branch and bound an incumbent well before the search would find
+    one itself.  Binary and general integer variables are treated alike.
+
+    Every LP is solved by relax(problem, basis), as for BranchAndBound,
+    with the node's bounds and further bound changes of the heuristic's
+    own, starting from the basis of the LP before.  A rounding of the
+    integer variables is completed by fixing them and solving for any
+    continuous variables, which fails if the rounding is infeasible.
+
+    names chooses from HEURISTICS:
+
+    rounding --- round each integer variable to the nearest integer
+    randomised --- round each up with probability its fractional part,
+                   ROUNDING_TRIES times
+    diving --- repeatedly bound the integer variable nearest an integer
+               to its rounded value and re-solve, undoing a change that
+               makes the LP infeasible once, until the solution is integer
+    guided --- dive as above, but on the variable nearest its value in the
+               incumbent, towards that value
+    pump --- the feasibility pump: alternately round the LP solution and
+             solve for the LP solution nearest that rounding (by the L1
+             distance over integer variables at a bound), flipping the
+             variables furthest from their rounding when it cycles, until
+             the LP solution is integer
+
+    randomised and pump run at the root only."""
+
+    def __init__(self, problem, relax, names=None, seed=0):
+
+        names = list(HEURISTICS) if names is None else list(names)
+        for name in names:
+            if name not in HEURISTICS:
+                raise ValueError(f"Unknown heuristic '{name}', expected one of {', '.join(HEURISTICS)}")
+
+        self.problem = problem
+        self.relax   = relax
+        self.names   = names
+        self.rng     = np.random.default_rng(seed)
+        self.integer = np.flatnonzero((problem.symbols.flags & ir.INTEGER_FLAGS) != 0)
+        self.lower, self.upper = relaxed_bounds(problem.symbols)
+        self.objective_variable = problem.symbols.get(ir.OBJECTIVE_VARIABLE_NAME)
+        self.stats   = {name: [0, 0, 0.0] for name in names}    # Name -> [calls, solutions found, time]
+
+    def run(self, bounds, result, incumbent=None, root=False):
+        """Run the heuristics from a node's solved Relaxation, given the
+        node's bounds and the incumbent if there is one, and return a list
+        of (name, Relaxation) for each solution found better than the
+        incumbent and those found before it"""
+
+        found = []
+        for name in self.names:
+            if name in ROOT_ONLY and not root:
+                continue
+            if name == "guided" and incumbent is None:
+                continue
+
+            start = time.perf_counter()
+            solution = getattr(self, f"_{name}")(bounds, result, incumbent)
+            stats = self.stats[name]
+            stats[0] += 1
+            stats[2] += time.perf_counter() - start
+            if solution is not None and (incumbent is None or solution.objective > incumbent.objective + PRUNE_TOLERANCE):
+                stats[1] += 1
+                incumbent = solution
+                found.append((name, solution))
+        return found
+
+    def summarise(self):
+        for name, (calls, found, elapsed) in self.stats.items():
+            print(f"  {name:>11}: {calls:>5} runs, {found:>4} solutions, {elapsed:.3f}s")
+
+    def _rounding(self, bounds, result, incumbent):
+        lower, upper = self._integer_bounds(bounds)
+        return self._complete(bounds, np.clip(np.round(result.values[self.integer]), lower, upper), result.basis)
+
+    def _randomised(self, bounds, result, incumbent):
+        values = result.values[self.integer]
+        lower, upper = self._integer_bounds(bounds)
+        best, tried = None, set()
+        for _ in range(ROUNDING_TRIES):
+            rounded = np.floor(values) + (self.rng.random(len(values)) < values - np.floor(values))
+            rounded = np.clip(rounded, lower, upper)
+            key = rounded.tobytes()
+            if key in tried:
+                continue
+            tried.add(key)
+            solution = self._complete(bounds, rounded, result.basis)
+            if solution is not None and (best is None or solution.objective > best.objective):
+                best = solution
+        return best
+
+    def _diving(self, bounds, result, incumbent):
+        return self._dive(bounds, result, incumbent, None)
+
+    def _guided(self, bounds, result, incumbent):
+        return self._dive(bounds, result, incumbent, incumbent.values)
+
+    def _dive(self, bounds, result, incumbent, guide):
+        """Dive from result, towards guide if given or else towards the
+        nearest integer, returning the integer solution reached or None"""
+
+        bounds = dict(bounds)
+        for _ in range(DIVE_LIMIT):
+            values     = result.values[self.integer]
+            distances  = np.abs(values - np.round(values))
+            fractional = np.flatnonzero(distances > INTEGER_TOLERANCE)
+            if not len(fractional):
+                return result
+            if incumbent is not None and result.objective <= incumbent.objective + PRUNE_TOLERANCE:
+                return None
+
+            if guide is None:
+                choice = fractional[np.argmin(distances[fractional])]
+                up     = values[choice] - np.floor(values[choice]) >= 0.5
+            else:
+                targets = guide[self.integer[fractional]]
+                choice  = fractional[np.argmin(np.abs(values[fractional] - targets))]
+                up      = guide[self.integer[choice]] >= values[choice]
+
+            column = int(self.integer[choice])
+            value  = float(values[choice])
+            lower, upper = bounds.get(column, (self.lower[column], self.upper[column]))
+            changes = [(np.ceil(value), upper), (lower, np.floor(value))]
+            if not up:
+                changes.reverse()
+
+            # Try the other direction once if the first makes the LP infeasible
+            for change in changes:
+                attempt = _solve_relaxation(self.problem, self.relax, {**bounds, column: change}, result.basis)
+                if attempt.status == "optimal":
+                    bounds[column] = change
+                    result = attempt
+                    break
+            else:
+                return None
+        return None
+
+    def _pump(self, bounds, result, incumbent):
+        lower, upper = self._integer_bounds(bounds)
+        values  = result.values[self.integer]
+        rounded = np.clip(np.round(values), lower, upper)
+        basis   = result.basis
+        seen    = set()
+        for _ in range(PUMP_LIMIT):
+            if (np.abs(values - np.round(values)) <= INTEGER_TOLERANCE).all():
+                return self._complete(bounds, np.round(values), basis)
+
+            # Flip the variables furthest from their rounding if it has been seen before
+            if rounded.tobytes() in seen:
+                flips   = self.rng.integers(PUMP_FLIPS // 2, PUMP_FLIPS * 3 // 2 + 1)
+                furthest = np.argsort(-np.abs(values - rounded), kind="stable")[:flips]
+                furthest = furthest[np.abs(values[furthest] - rounded[furthest]) > INTEGER_TOLERANCE]
+                rounded[furthest] = np.where(values[furthest] > rounded[furthest], rounded[furthest] + 1.0,
+                                             rounded[furthest] - 1.0)
+                rounded = np.clip(rounded, lower, upper)
+            seen.add(rounded.tobytes())
+
+            # Minimise the distance from the rounding, through integer variables at a bound
+            distance = np.where(rounded <= lower, 1.0, np.where(rounded >= upper, -1.0, 0.0))
+            attempt  = _solve_relaxation(self._distance_problem(distance), self.relax, bounds, basis)
+            if attempt.status != "optimal":
+                return None
+            basis   = attempt.basis
+            values  = attempt.values[self.integer]
+            rounded = np.clip(np.round(values), lower, upper)
+        return None
+
+    def _distance_problem(self, distance):
+        """A copy of the problem whose objective is to minimise the sum of
+        distance times each integer variable"""
+
+        problem = self.problem.clone()
+        symbols = problem.symbols
+        terms   = [(float(coefficient), symbols.variable(int(column)))
+                   for column, coefficient in zip(self.integer, distance) if coefficient != 0.0]
+        problem.objective = ir.Equation(problem, problem.objective.name,
+                                        terms + [(1.0, symbols.variable(self.objective_variable.index))], 0.0)
+        return problem
+
+    def _integer_bounds(self, bounds):
+        """Return the lower and upper bounds of the integer variables at a
+        node with the given bounds, rounded in to the integers within them"""
+
+        pairs = [bounds.get(column, (self.lower[column], self.upper[column])) for column in self.integer.tolist()]
+        lower = np.array([pair[0] for pair in pairs], dtype=np.float64).reshape(-1)
+        upper = np.array([pair[1] for pair in pairs], dtype=np.float64).reshape(-1)
+        return np.ceil(lower - INTEGER_TOLERANCE), np.floor(upper + INTEGER_TOLERANCE)
+
+    def _complete(self, bounds, rounded, basis):
+        """Fix the integer variables at a rounding and solve for the rest,
+        returning the Relaxation if that is feasible.  A rounding outside
+        the node's bounds is not a solution there."""
+
+        lower, upper = self._integer_bounds(bounds)
+        if ((rounded < lower) | (rounded > upper)).any():
+            return None
+        fixed = {**bounds, **{int(column): (value, value) for column, value in zip(self.integer, rounded.tolist())}}
+        solution = _solve_relaxation(self.problem, self.relax, fixed, basis)
+        return solution if solution.status == "optimal" else None
+
+
+# Heuristics selectable by solve(), in the order they are run
+HEURISTICS = ("rounding", "randomised", "diving", "guided", "pump")
@@ -0,0 +1,549 @@
+import time
+import numpy as np
+from . import ir, stats
+from .crash import crash_basis
+from .dense import relaxed_bounds
+from .log import logger
+from .revised import RevisedSimplex
+
+try:
+    import scipy.linalg
+    import scipy.sparse
+    import scipy.sparse.linalg
+except ImportError:
+    scipy = None
+
+# Relative residuals and gap at which the iterates are taken as optimal
+IPM_TOLERANCE = 1e-8
+
+# Fraction of the way to the boundary that each step goes
+STEP_FRACTION = 0.9995
+
+# The normal equations are solved densely for up to this many rows
+DENSE_ROWS = 1000
+
+# Added to the diagonal of the normal equations, relative to its largest
+# entry, if they cannot be factorised as they are, and multiplied by
+# REGULARISATION_GROWTH each time that is not enough
+REGULARISATION        = 1e-12
+REGULARISATION_GROWTH = 100.0
+
+# Most rounds of iterative refinement of each direction, stopping once the
+# error in A dx is this small relative to the residual it should meet
+REFINEMENTS          = 3
+REFINEMENT_TOLERANCE = 1e-12
+
+# Relative accuracy and iteration limit of the conjugate gradient solves
+CG_TOLERANCE  = 1e-10
+CG_ITERATIONS = 1000
+
+# Iterates this large suggest the problem is infeasible or unbounded, as
+# does the complementarity falling below STALLED with the residuals left
+DIVERGENCE = 1e12
+STALLED    = 1e-16
+
+# Most simplex pivots for crossover to take
+CROSSOVER_LIMIT = 10_000
+
+
+class InteriorPoint:
+    """A primal-dual interior point method, Mehrotra's predictor-corrector,
+    on the standard form made by presolve.to_standard_form.
+
+    The problem is taken as minimising c.x subject to A x = b and the
+    bounds of each column, as for revised.RevisedSimplex.  Each column is
+    shifted to its lower bound (or reflected at its upper bound, if it has
+    only that), so that every variable is non-negative, with those that
+    have both bounds given a slack w for their range; free columns are
+    split in two and fixed ones moved into b.  Each iteration (each call
+    to pivot) takes a Newton step towards the central path from x, w and
+    the duals y, z and s, a predictor step with no centring followed by a
+    corrector from the same factorisation, and steps as far as
+    STEP_FRACTION of the way to the boundary.  Both directions come from
+    the normal equations A Theta A^T dy = r, where Theta is diagonal, solved
+    by normal_equations, one of NORMAL_EQUATIONS:
+
+    dense --- Cholesky factorisation of the dense matrix
+    sparse --- sparse LU factorisation, with a symmetric ordering
+    cg --- conjugate gradients with a diagonal preconditioner, without
+           forming the matrix
+    auto --- dense for up to DENSE_ROWS rows, and sparse beyond
+
+    The iterates are optimal once the primal and dual residuals and the
+    duality gap are all within IPM_TOLERANCE, relative to the size of the
+    problem.  They are not a vertex: with crossover, a basis is crashed
+    from the columns away from their bounds (see crash.crash_basis) and
+    the revised simplex method, with pricing, finishes from there, giving
+    a vertex solution and a basis (get_basis) to start other engines from.
+
+    Without a homogeneous embedding, infeasibility and unboundedness only
+    show as the iterates growing without limit or the residuals stalling,
+    which cannot tell them apart, nor always from a badly scaled feasible
+    problem, so the revised simplex method then takes over from its own
+    crash basis and decides.
+
+    Needs scipy."""
+
+    # Interior points cannot be started from a basis
+    WARM_START = False
+
+    def __init__(self, problem, float_tolerance=0.00001, pricing="lowest", normal_equations="auto", crossover=False,
+                 basis=None, tolerance=IPM_TOLERANCE):
+
+        if scipy is None:
+            raise ImportError("The interior point engine needs scipy")
+        if basis is not None:
+            raise ValueError("The interior point engine cannot start from a basis")
+        if normal_equations not in NORMAL_EQUATIONS:
+            raise ValueError(f"Unknown normal equations solver '{normal_equations}', "
+                             f"expected one of {', '.join(NORMAL_EQUATIONS)}")
+
+        self.problem         = problem
+        self.float_tolerance = float_tolerance
+        self.tolerance       = tolerance
+        self.pricing         = pricing
+        self.crossover       = crossover
+        self.status          = None     # "optimal", "unbounded" or "infeasible" once known
+        self.converged       = False
+        self.iterations      = 0
+        self.simplex         = None     # Crossover's simplex engine, once run
+        self.residuals       = None     # (primal, dual, gap), relative, after the last iteration
+        self.fallbacks       = 0        # Iterations in which conjugate gradients gave way to a factorisation
+        self.entering        = None     # A step moves every variable, so no pivot names any
+        self.leaving         = None
+        self.elapsed         = {"factorise": 0.0, "solve": 0.0, "crossover": 0.0}
+
+        symbols          = problem.symbols
+        constraints      = list(problem.constraints.values())
+        self.columns     = list(symbols)
+        self.row_names   = [constraint.name for constraint in constraints]
+        self.rhs         = np.array([constraint.constant for constraint in constraints], dtype=np.float64)
+        self.objective_column = symbols.index[ir.OBJECTIVE_VARIABLE_NAME]
+
+        indptr, indices, data = problem.matrix.select_rows([c.expression.row for c in constraints])
+        self.matrix = scipy.sparse.csr_matrix((data, indices, indptr), shape=(len(constraints), len(symbols))).tocsc()
+        self.matrix.eliminate_zeros()
+
+        columns, values = problem.matrix.row(problem.objective.expression.row)
+        self.costs = np.zeros(len(symbols))
+        self.costs[columns] = values
+        self.costs[self.objective_column] = 0.0
+
+        self.lower, self.upper = relaxed_bounds(symbols)
+        for column in np.flatnonzero(self.lower > self.upper).tolist():
+            logger.info("*** Bounds of %s cannot be met: %s > %s", self.columns[column].name, self.lower[column],
+                        self.upper[column])
+            self.status = "infeasible"
+
+        if normal_equations == "auto":
+            normal_equations = "dense" if len(constraints) <= DENSE_ROWS else "sparse"
+        self.normal_equations = normal_equations
+
+        self._transform()
+        if self.status is None and not self.converged:
+            self._start()
+
+    def optimal(self):
+        """Whether the iterates have converged (and crossover finished)"""
+
+        return self.converged
+
+    def pivot(self, method=None):
+        """Take one predictor-corrector step.  method is the pricing for
+        crossover, if it has not been given already."""
+
+        if method is not None:
+            self.pricing = method
+        self.iterations += 1
+        x, w, z, s = self.x, self.w, self.z, self.s
+        bounded = self.bounded
+
+        start = time.perf_counter()
+        theta = 1.0 / (z / x + np.where(bounded, s / w, 0.0))
+        solve = self._factorise(theta)
+        self.elapsed["factorise"] += time.perf_counter() - start
+
+        # Predictor: the affine scaling direction
+        start = time.perf_counter()
+        r_b, r_u, r_c = self._residuals()
+        mu = self._mu()
+        affine = self._direction(solve, theta, r_b, r_u, r_c, -x * z, np.where(bounded, -w * s, 0.0))
+        primal, dual = self._step_lengths(*affine)
+        dx, dw, dy, dz, ds = affine
+        mu_affine = (((x + primal * dx) @ (z + dual * dz)) +
+                     ((w + primal * dw) @ (s + dual * ds))) / self.complementary
+        sigma = (mu_affine / mu) ** 3 if mu > 0 else 0.0
+
+        # Corrector: centred, and allowing for the second order term the predictor left out
+        target = sigma * mu
+        corrector = self._direction(solve, theta, r_b, r_u, r_c, target - x * z - dx * dz,
+                                    np.where(bounded, target - w * s - dw * ds, 0.0))
+        primal, dual = self._step_lengths(*corrector)
+        self.elapsed["solve"] += time.perf_counter() - start
+
+        dx, dw, dy, dz, ds = corrector
+        self.x = x + primal * dx
+        self.w = np.where(bounded, w + primal * dw, 1.0)
+        self.y = self.y + dual * dy
+        self.z = z + dual * dz
+        self.s = np.where(bounded, s + dual * ds, 0.0)
+
+        self._check()
+        logger.debug("Interior point iteration %d: steps %.4f primal, %.4f dual, mu %.3e, objective %s",
+                     self.iterations, primal, dual, self._mu(), self._objective())
+
+        if self.converged and self.crossover and self.simplex is None:
+            self._crossover()
+
+    def progress(self):
+        """The objective and the relative primal and dual residuals, as for
+        solve.Iteration, or the simplex engine's once it has taken over"""
+
+        if self.simplex is not None:
+            return self.simplex.progress()
+        primal, dual, _ = self.residuals if self.residuals is not None else (np.inf, np.inf, np.inf)
+        return self._objective(), primal, dual
+
+    def get_result(self):
+        """Extract values from the iterates, or from crossover's vertex"""
+
+        if self.simplex is not None:
+            return self.simplex.get_result()
+
+        values = self._values()
+        values[self.objective_column] = -float(self.costs @ values)
+        values[np.abs(values) < self.float_tolerance] = 0
+        return dict(zip(self.columns, values.tolist()))
+
+    def get_basis(self):
+        """Crossover's final basis, or None without crossover"""
+
+        return self.simplex.get_basis() if self.simplex is not None else None
+
+    def get_reduced_costs(self):
+        """Return the reduced cost of each variable, by name, from the dual
+        iterates or crossover's basis (see ir.Solution)"""
+
+        if self.simplex is not None:
+            return self.simplex.get_reduced_costs()
+        if not hasattr(self, "y"):
+            return None     # Never started, the bounds being contradictory
+        reduced = -(self.costs - self.matrix.T @ self.y)
+        reduced[self.objective_column] = 0.0
+        return self._by_name([var.name for var in self.columns], reduced)
+
+    def get_duals(self):
+        """Return the dual value of each row, by name, from the dual
+        iterates or crossover's basis"""
+
+        if self.simplex is not None:
+            return self.simplex.get_duals()
+        if not hasattr(self, "y"):
+            return None     # Never started, the bounds being contradictory
+        return self._by_name(self.row_names, -self.y)
+
+    def _by_name(self, names, values):
+        values = np.where(np.abs(values) < self.float_tolerance, 0.0, values)
+        return dict(zip(names, values.tolist()))
+
+    def summarise(self):
+        if self.residuals is None:
+            print(f"Interior point: {len(self.rhs)} rows, {self.x.shape[0] if self.status is None else 0} "
+                  f"non-negative variables, {self.normal_equations} normal equations")
+            return
+        primal, dual, gap = self.residuals
+        print(f"Residuals: primal {primal:.3e}, dual {dual:.3e}, gap {gap:.3e} "
+              f"({self.elapsed['factorise']:.3f}s factorising, {self.elapsed['solve']:.3f}s solving)")
+
+    def _transform(self):
+        """Write each column as a non-negative variable (or two, if free)
+        and move fixed columns into the right hand side"""
+
+        lower, upper = self.lower, self.upper
+        active     = np.ones(len(self.columns), dtype=bool)
+        active[self.objective_column] = False
+        fixed      = active & (lower == upper)
+        free       = active & ~np.isfinite(lower) & ~np.isfinite(upper)
+        reflected  = active & ~np.isfinite(lower) & np.isfinite(upper)
+        shifted    = active & ~fixed & np.isfinite(lower)
+
+        # Each column's value with its variables at zero
+        self.origin   = np.where(reflected, upper, np.where(shifted | fixed, lower, 0.0))
+        self.origin[~active] = 0.0
+        self.positive = np.flatnonzero(shifted | reflected | free)
+        self.negative = np.flatnonzero(free)
+        self.sign     = np.where(reflected[self.positive], -1.0, 1.0)
+
+        matrix = self.matrix
+        self.b = self.rhs - matrix @ self.origin
+        self.A = scipy.sparse.hstack([matrix[:, self.positive] @ scipy.sparse.diags(self.sign),
+                                      -matrix[:, self.negative]], format="csr")
+        self.c = np.concatenate((self.costs[self.positive] * self.sign, -self.costs[self.negative]))
+        self.constant = float(self.costs @ self.origin)
+
+        ranges = np.where(shifted & np.isfinite(upper), upper - lower, np.inf)
+        self.u = np.concatenate((ranges[self.positive], np.full(len(self.negative), np.inf)))
+        self.bounded = np.isfinite(self.u)
+        self.complementary = len(self.c) + int(self.bounded.sum())
+        self.A_squared = self.A.multiply(self.A).tocsr()
+
+        if not len(self.c):
+            # Nothing left to choose: the fixed columns meet the rows or they don't
+            self.x = self.w = self.z = self.s = np.zeros(0)
+            self.y = np.zeros(len(self.b))
+            if np.abs(self.b).max(initial=0.0) > self.float_tolerance:
+                logger.info("*** The fixed columns cannot meet the rows")
+                self.status = "infeasible"
+            else:
+                self.converged = True
+
+    def _start(self):
+        """Mehrotra's starting point: the least squares solutions of the
+        primal and dual equations, shifted to be strictly positive"""
+
+        A, b, c = self.A, self.b, self.c
+        solve = self._factorise(np.ones(len(c)))
+        x = A.T @ solve(b)
+        y = solve(A @ c)
+        z = c - A.T @ y
+
+        # Columns with a range start inside it, their duals split by sign
+        bounded = self.bounded
+        u = np.where(bounded, self.u, 1.0)
+        x = np.where(bounded, np.clip(x, 0.1 * u, 0.9 * u), x)
+        s = np.where(bounded, np.maximum(-z, 0.0), 0.0)
+        z = np.where(bounded, np.maximum(z, 0.0), z)
+
+        x = x + max(-1.5 * x.min(initial=0.0), 0.0) + 1e-2
+        z = z + max(-1.5 * z.min(initial=0.0), 0.0) + 1e-2
+        x = np.where(bounded, np.minimum(x, 0.9 * u), x)
+        w = np.where(bounded, u - x, 1.0)
+        s = np.where(bounded, s + 1e-2, 0.0)
+
+        # Balance the complementarity products, unless there are none to balance
+        product = x @ z + w[bounded] @ s[bounded]
+        if product > 0.0:
+            tiny = np.finfo(np.float64).tiny
+            x = x + 0.5 * product / max(z.sum() + s.sum(), tiny)
+            dual_shift = 0.5 * product / max(x.sum() + w[bounded].sum(), tiny)
+            z = z + dual_shift
+            s = np.where(bounded, s + dual_shift, 0.0)
+            x = np.where(bounded, np.minimum(x, 0.9 * u), x)
+            w = np.where(bounded, u - x, 1.0)
+
+        self.x, self.w, self.y, self.z, self.s = x, w, y, z, s
+        self._check()
+
+    @stats.timed("factorise")
+    def _factorise(self, theta):
+        """Factorise A Theta A^T, returning a function that solves with it"""
+
+        A = self.A
+        if self.normal_equations == "cg":
+            # Regularised throughout, as rows made dependent by fixed columns leave the matrix singular
+            diagonal = self.A_squared @ theta
+            regularisation = REGULARISATION * max(diagonal.max(initial=0.0), 1.0)
+            diagonal = np.where(diagonal > 0.0, diagonal, 1.0) + regularisation
+            operator = scipy.sparse.linalg.LinearOperator((A.shape[0], A.shape[0]),
+                                                          lambda v: A @ (theta * (A.T @ v)) + regularisation * v)
+            preconditioner = scipy.sparse.linalg.LinearOperator((A.shape[0], A.shape[0]), lambda v: v / diagonal)
+
+            factorised = []
+
+            def solve(rhs, exact=False):
+                """Solve by conjugate gradients, or if they fail to converge
+                or exact is given, by a factorisation for the rest of this
+                iteration"""
+
+                if not factorised and not exact:
+                    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                        result, info = scipy.sparse.linalg.cg(operator, rhs, rtol=CG_TOLERANCE,
+                                                              maxiter=CG_ITERATIONS, M=preconditioner)
+                    if info == 0 and np.isfinite(result).all():
+                        return result
+                if not factorised:
+                    self.fallbacks += 1
+                    factorised.append(self._factorise_matrix(theta, "sparse"))
+                return factorised[0](rhs)
+            return solve
+        return self._factorise_matrix(theta, self.normal_equations)
+
+    def _factorise_matrix(self, theta, method):
+        """Factorise A Theta A^T, formed explicitly, densely or sparsely"""
+
+        A = self.A
+        normal = (A @ scipy.sparse.diags(theta) @ A.T).tocsc()
+        largest = max(abs(normal.diagonal()).max(initial=0.0), 1.0)
+        regularisation = 0.0
+        while True:
+            try:
+                if method == "dense":
+                    factor = scipy.linalg.cho_factor(normal.toarray() + regularisation * np.eye(A.shape[0]))
+                    return lambda rhs, exact=False: scipy.linalg.cho_solve(factor, rhs)
+                factor = scipy.sparse.linalg.splu(normal + regularisation * scipy.sparse.identity(A.shape[0],
+                                                                                                format="csc"),
+                                                  permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0,
+                                                  options={"SymmetricMode": True})
+                return lambda rhs, exact=False: factor.solve(rhs)
+            except (np.linalg.LinAlgError, RuntimeError):
+                regularisation = max(regularisation * REGULARISATION_GROWTH, REGULARISATION * largest)
+                if regularisation > largest:
+                    raise
+
+    def _direction(self, solve, theta, r_b, r_u, r_c, r_xz, r_ws):
+        """Solve the Newton equations for (dx, dw, dy, dz, ds), given the
+        residuals and the complementarity targets, through the normal
+        equations"""
+
+        x, w, z, s, A = self.x, self.w, self.z, self.s, self.A
+        bounded = self.bounded
+        r  = r_c - r_xz / x + np.where(bounded, (r_ws - s * r_u) / w, 0.0)
+        scale = 1.0 + np.abs(r_b).max(initial=0.0)
+
+        # Conjugate gradients give way to a factorisation if their direction stays inaccurate
+        for exact in (False, True):
+            dy = solve(r_b + A @ (theta * r), exact)
+            dx = theta * (A.T @ dy - r)
+
+            # Iterative refinement, since the normal equations grow ill-conditioned near the optimum
+            for _ in range(REFINEMENTS):
+                error = r_b - A @ dx
+                if np.abs(error).max(initial=0.0) <= REFINEMENT_TOLERANCE * scale:
+                    break
+                correction = solve(error, exact)
+                dy += correction
+                dx += theta * (A.T @ correction)
+            if exact or self.normal_equations != "cg" or np.abs(r_b - A @ dx).max(initial=0.0) <= self.tolerance * scale:
+                break
+        dz = (r_xz - z * dx) / x
+        dw = np.where(bounded, r_u - dx, 0.0)
+        ds = np.where(bounded, (r_ws - s * dw) / w, 0.0)
+        return dx, dw, dy, dz, ds
+
+    def _step_lengths(self, dx, dw, dy, dz, ds):
+        """Longest primal and dual steps, up to one, that keep x, w, z and s
+        STEP_FRACTION of the way from zero"""
+
+        def longest(values, changes):
+            falling = changes < 0.0
+            if not falling.any():
+                return 1.0
+            return min(1.0, STEP_FRACTION * float((-values[falling] / changes[falling]).min()))
+
+        bounded = self.bounded
+        primal = min(longest(self.x, dx), longest(self.w[bounded], dw[bounded]))
+        dual   = min(longest(self.z, dz), longest(self.s[bounded], ds[bounded]))
+        return primal, dual
+
+    def _residuals(self):
+        A = self.A
+        r_b = self.b - A @ self.x
+        r_u = np.where(self.bounded, np.where(self.bounded, self.u, 0.0) - self.x - self.w, 0.0)
+        r_c = self.c - A.T @ self.y - self.z + self.s
+        return r_b, r_u, r_c
+
+    def _mu(self):
+        return float(self.x @ self.z + self.w[self.bounded] @ self.s[self.bounded]) / self.complementary
+
+    def _objective(self):
+        """The objective variable's value at the current iterates"""
+
+        return -(float(self.c @ self.x) + self.constant)
+
+    def _check(self):
+        """Update the residuals, and decide whether the iterates have
+        converged or are running away"""
+
+        r_b, r_u, r_c = self._residuals()
+        primal_objective = float(self.c @ self.x)
+        dual_objective   = float(self.b @ self.y) - float(self.u[self.bounded] @ self.s[self.bounded])
+        primal = max(np.linalg.norm(r_b), np.linalg.norm(r_u)) / (1.0 + np.linalg.norm(self.b))
+        dual   = np.linalg.norm(r_c) / (1.0 + np.linalg.norm(self.c))
+        gap    = abs(primal_objective - dual_objective) / (1.0 + abs(primal_objective))
+        self.residuals = (primal, dual, gap)
+        self.converged = max(primal, dual, gap) <= self.tolerance
+
+        if not self.converged:
+            scale = DIVERGENCE * (1.0 + np.abs(self.b).max(initial=0.0) + np.abs(self.c).max(initial=0.0))
+            if not np.abs(self.x).max(initial=0.0) <= scale:
+                reason = "The primal iterates grow without limit"
+            elif not max(np.abs(self.y).max(initial=0.0), np.abs(self.z).max(initial=0.0)) <= scale:
+                reason = "The dual iterates grow without limit"
+            elif self._mu() < STALLED:
+                # Complementary to no end, but the residuals are stuck: as near as the
+                # arithmetic allows if they are small, or else a ray or no solution
+                if max(primal, dual) <= np.sqrt(self.tolerance):
+                    logger.info("Stalled near the optimum, residuals %.3e primal, %.3e dual, gap %.3e", primal, dual, gap)
+                    self.converged = True
+                    return
+                reason = "The primal residuals have stalled" if primal > dual else "The dual residuals have stalled"
+            else:
+                return
+
+            # Which of infeasible and unbounded this points to depends on more than the iterates can
+            # tell without a homogeneous embedding, and a badly scaled feasible problem can look like
+            # either, so the simplex method decides
+            logger.info("*** %s, handing over to the simplex method", reason)
+            self._simplex(None)
+
+    def _values(self):
+        """Value of each of the problem's columns at the current iterates"""
+
+        values = self.origin.copy()
+        count  = len(self.positive)
+        values[self.positive] += self.sign * self.x[:count]
+        values[self.negative] -= self.x[count:]
+        return values
+
+    def _crossover(self):
+        """Move from the interior solution to a vertex, with a basis crashed
+        from the columns away from their bounds and the revised simplex
+        method to finish"""
+
+        start  = time.perf_counter()
+        values = self._values()
+        lower, upper = self.lower, self.upper
+        scale  = self.float_tolerance * (1.0 + np.abs(values))
+        at_lower = np.isfinite(lower) & (values - lower <= scale)
+        at_upper = np.isfinite(upper) & (upper - values <= scale) & ~at_lower
+
+        # Rest the columns at their bounds, and crash the rest into the basis
+        resting  = np.where(at_lower, lower, np.where(at_upper, upper, values))
+        interior = ~at_lower & ~at_upper
+        interior[self.objective_column] = False
+        slack    = (self.problem.symbols.flags & ir.FLAG_SLACK) != 0
+        by_row   = self.matrix.tocsr()
+        rest     = np.where(np.isfinite(lower), lower, np.where(np.isfinite(upper), upper, 0.0))
+        residual = self.rhs - by_row @ np.where(interior, rest, resting)
+        pairs    = crash_basis(by_row.indptr, by_row.indices, by_row.data, residual, lower, upper, slack, interior,
+                               max(self.float_tolerance, 1e-6))
+
+        names  = [var.name for var in self.columns]
+        rows   = {self.row_names[row]: names[column] for row, column in pairs}
+        status = {names[column]: "upper" for column in np.flatnonzero(at_upper).tolist()}
+        pivots = self._simplex(ir.Basis(rows, status))
+        self.elapsed["crossover"] = time.perf_counter() - start
+        logger.info("Crossover: %d of %d rows crashed from the interior, %d simplex pivots to a vertex (%.3fs)",
+                    len(pairs), len(self.rhs), pivots, self.elapsed["crossover"])
+
+    def _simplex(self, basis):
+        """Finish with the revised simplex method from basis (or its own
+        crash basis, if None), taking its solution and status, and return
+        the pivots taken"""
+
+        simplex = RevisedSimplex(self.problem, self.float_tolerance, basis=basis, pricing=self.pricing)
+        pivots  = 0
+        while simplex.status is None and not simplex.optimal() and pivots < CROSSOVER_LIMIT:
+            pivots += 1
+            simplex.pivot(self.pricing)
+        if simplex.status is None and simplex.optimal():
+            simplex.status = "optimal"
+
+        self.simplex   = simplex
+        self.converged = simplex.status == "optimal"
+        self.status    = None if self.converged else simplex.status or "iteration limit"
+        return pivots
+
+
+# Ways of solving the normal equations
+NORMAL_EQUATIONS = ("auto", "dense", "sparse", "cg")
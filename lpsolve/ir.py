@@ -1,17 +1,32 @@
 
 
 
+import numpy as np
+
 OBJECTIVE_VARIABLE_NAME = "_Z_"
 
+# Relations accepted by add_constraints, as (equation, greater_than, strict)
+RELATIONS = {"<":  (False, False, True),
+             "<=": (False, False, False),
+             "=<": (False, False, False),
+             ">":  (False, True, True),
+             ">=": (False, True, False),
+             "=>": (False, True, False),
+             "=":  (True, False, False),
+             "==": (True, False, False)}
+
 
 class LPProblem:
 
     def __init__(self):
 
         self.symbols     = SymbolTable()
+        self.matrix      = SparseMatrix()
         self.objective   = None
         self.constraints = {}
         self.maximise = True
+        self.objective_sign = 1.0   # The objective as given is this times the objective variable (see to_standard_form)
+        self.objective_offset = 0.0 # Constant added to the objective, which the matrix cannot hold
 
     def add_constraint(self, name, constraint):
         self.constraints[name] = constraint
@@ -20,9 +35,17 @@ class LPProblem:
         self.objective = expression
         self.maximise      = maximise
 
-    def get_expression(self, name, terms):
+    def objective_expression(self):
+        """Return the objective's expression, whether or not it has been
+        made into an equation by to_standard_form"""
+
+        if isinstance(self.objective, Equation):
+            return self.objective.expression
+        return self.objective
 
-        expr = Expression(self, name, terms)
+    def get_expression(self, name, terms, row=None):
+
+        expr = Expression(self, name, terms, row)
         return expr
 
     def get_equation(self, name, terms, constant):
@@ -35,23 +58,150 @@ class LPProblem:
         inequal = Inequality(self, name, terms, greater_than, strict, constant)
         return inequal
 
+    def add_variables(self, names, lower_bounds=0.0, upper_bounds=float("+infinity"), binary=False, integer=False):
+        """Add many variables at once, returning an array of their column
+        indices.
+
+        Bounds and binary and (general) integer flags may be single values
+        or arrays with one value per name."""
+
+        names = [str(name) for name in names]
+        count = len(names)
+        flags = (np.where(np.broadcast_to(np.asarray(binary, dtype=bool), (count,)), FLAG_BINARY, 0) |
+                 np.where(np.broadcast_to(np.asarray(integer, dtype=bool), (count,)), FLAG_INTEGER, 0))
+        return self.symbols.add_variables(names,
+                                          np.broadcast_to(np.asarray(lower_bounds, dtype=np.float64), (count,)),
+                                          np.broadcast_to(np.asarray(upper_bounds, dtype=np.float64), (count,)),
+                                          flags.astype(np.uint8))
+
+    def set_objective_coefficients(self, coefficients, maximise, name="obj"):
+        """Set the objective from an array of coefficients, one per column,
+        or a sparse row vector.  Zero coefficients are left out."""
+
+        indptr, columns, values = _csr_arrays(coefficients, len(self.symbols))
+        if len(indptr) != 2:
+            raise ValueError(f"Expected one row of objective coefficients but found {len(indptr) - 1}")
+        row = self.matrix.add_rows(indptr, columns, values)
+        self.set_objective(self.get_expression(name, None, row), maximise)
+
+    def add_constraints(self, A, relations, constants, names=None):
+        """Add one constraint per row of A, returning a list of their names.
+
+        A may be a dense 2-d array, a SparseMatrix or any sparse matrix with
+        a tocsr() method (such as scipy.sparse), with one column per variable in
+        column order.  Relations are given as in LP files ("<=", ">=", "="
+        and so on), either one for all rows or one per row, and constants
+        likewise.  Unnamed constraints are called c0, c1, ... in the order
+        they were added to the problem."""
+
+        indptr, columns, values = _csr_arrays(A, len(self.symbols))
+        count = len(indptr) - 1
+        if len(columns) and (columns.min() < 0 or columns.max() >= len(self.symbols)):
+            raise ValueError(f"Constraint matrix has more columns than the problem's {len(self.symbols)} variables")
+
+        if isinstance(relations, str):
+            relations = [relations] * count
+        constants = np.broadcast_to(np.asarray(constants, dtype=np.float64), (count,)).tolist()
+        if names is None:
+            names = [f"c{i}" for i in range(len(self.constraints), len(self.constraints) + count)]
+        if len(relations) != count or len(names) != count:
+            raise ValueError(f"Expected {count} relations and names, one per row")
+        if len(set(names)) < count or any(name in self.constraints for name in names):
+            raise ValueError("Constraint names must be unique")
+        for relation in set(relations):
+            if relation not in RELATIONS:
+                raise ValueError(f"Unknown relation '{relation}'")
+
+        first = self.matrix.add_rows(indptr, columns, values)
+        for row, (name, relation, constant) in enumerate(zip(names, relations, constants), first):
+            equation, greater_than, strict = RELATIONS[relation]
+            if equation:
+                full_name  = f"constraint_eq_{name}"
+                constraint = Equation(self, full_name, Expression(self, full_name, None, row), constant)
+            else:
+                full_name  = f"constraint_ineq_{name}"
+                constraint = Inequality(self, full_name, Expression(self, full_name, None, row),
+                                        greater_than, strict, constant)
+            self.constraints[name] = constraint
+
+        return list(names)
+
+    def clone(self):
+        """Return a copy of the problem that can be changed, for instance by
+        to_standard_form or a what-if scenario, without changing this one.
+
+        The copy shares this problem's matrix and variable arrays rather
+        than copying them.  Matrix rows are copied one at a time as either
+        problem writes to them, and bound and flag arrays are copied on
+        first write, so a clone costs O(constraints) to make the views over
+        the shared rows."""
+
+        problem          = LPProblem()
+        problem.symbols  = self.symbols.clone()
+        problem.matrix   = self.matrix.clone()
+        problem.maximise = self.maximise
+        problem.objective_sign = self.objective_sign
+        problem.objective_offset = self.objective_offset
+
+        expressions = {}    # Row -> cloned expression, so shared expressions stay shared
+        if self.objective is not None:
+            problem.objective = self.objective._clone(problem, expressions)
+        for name, constraint in self.constraints.items():
+            problem.constraints[name] = constraint._clone(problem, expressions)
+
+        return problem
+
     def summarise(self):
-        print(f"Objective function: {'max' if self.maximise else 'min' }imise {self.objective}")
+        # Once to_standard_form has made the objective an equation, the offset is only added to the result
+        offset = f" + {self.objective_offset}" if self.objective_offset and not isinstance(self.objective, Equation) else ""
+        print(f"Objective function: {'max' if self.maximise else 'min' }imise {self.objective}{offset}")
         print(f"Subject to:")
         for name, c in self.constraints.items():
             print(f"  {name}: {c}")
         print("Across variables:")
-        for name, var in self.symbols.table.items():
-            print(f"  {name}: {var}")
+        for var in self.symbols:
+            print(f"  {var.name}: {var}")
+
+
+class Basis:
+    """A simplex basis, held by name so that it can be carried over to a
+    changed copy of the problem it came from.
+
+    `rows` maps each constraint name to the name of its basic variable and
+    `columns` maps each variable name to "basic", "lower", "upper" or
+    "free"."""
+
+    def __init__(self, rows, columns):
+
+        self.rows    = rows
+        self.columns = columns
+
+    def __repr__(self):
+        return f"Basis({len(self.rows)} rows, {len(self.columns)} columns)"
 
 
 class Solution:
+    """The result of a solve.
 
-    def __init__(self, problem, variable_values, optimal):
+    Simplex engines also give the final basis, the reduced costs and the
+    dual values, each by name.  A reduced cost is the rate at which the
+    objective would change as the variable increased from its value, and
+    a dual value the rate at which it would change as the constraint's
+    constant increased, both zero where the basis does not change.
+    Engines without a factorised basis give dual values only for rows
+    with a slack variable, and rows and columns removed by presolve have
+    none."""
+
+    def __init__(self, problem, variable_values, optimal, objective=None, status=None, basis=None,
+                 reduced_costs=None, duals=None):
 
         self.problem         = problem
         self.optimal         = optimal
-        self.objective       = variable_values[problem.symbols.get(OBJECTIVE_VARIABLE_NAME)]
+        self.status          = status if status is not None else ("optimal" if optimal else "not optimal")
+        self.basis           = basis    # Final basis, from engines that give one, to start another solve from
+        self.reduced_costs   = reduced_costs    # Variable name -> reduced cost, where known
+        self.duals           = duals            # Constraint name -> dual value, where known
+        self.objective       = objective if objective is not None else variable_values[problem.symbols.get(OBJECTIVE_VARIABLE_NAME)]
         self.variables       = {x:y for x, y in variable_values.items() if not x.slack}
         self.slack_variables = {x:y for x, y in variable_values.items() if x.slack}
 
@@ -66,107 +216,327 @@ class Solution:
 
         print(f"Objective value: {self.objective}")
         if not self.optimal:
-            print(f"*** WARNING: final condition not optimal")
+            print(f"*** WARNING: final condition not optimal ({self.status})")
+
+
+# Bits in the symbol table's per-variable flags array
+FLAG_SLACK        = 1
+FLAG_LOWER_STRICT = 2
+FLAG_UPPER_STRICT = 4
+FLAG_BINARY       = 8
+FLAG_INTEGER      = 16   # General integer; binary variables are integer too
+
+# Variables that must take integer values
+INTEGER_FLAGS = FLAG_BINARY | FLAG_INTEGER
 
 
 class Variable:
-    """Represents a variable in the LP problem"""
+    """Represents a variable in the LP problem.
+
+    A variable is a handle on one column of its symbol table, which holds
+    the name, bounds and flags.  Handles are made as needed, so compare them
+    with == rather than is."""
+
+    __slots__ = ("symbols", "index")
 
-    def __init__(self, name, slack=False):
+    def __init__(self, symbols, index):
 
-        self.name  = name
-        self.slack = slack
-        self.set_upper_bound()
-        self.set_lower_bound()
-        self.set_binary(False)
+        self.symbols = symbols
+        self.index   = index        # Column in the problem's matrix
 
     def __str__(self):
         lower_bound = "<" if self.lower_strict else "<="
         upper_bound = "<" if self.upper_strict else "<="
-        return f"{self.lower_bound} {lower_bound} {self.name} {upper_bound} {self.upper_bound} {'(binary)' if self.binary else ''}"
+        kind = "(binary)" if self.binary else "(integer)" if self.integer else ""
+        return f"{self.lower_bound} {lower_bound} {self.name} {upper_bound} {self.upper_bound} {kind}"
+
+    def __repr__(self):
+        return f"Variable({self.name!r}, {self.index})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Variable):
+            return NotImplemented
+        return self.index == other.index and self.symbols is other.symbols
+
+    def __hash__(self):
+        return hash(self.index)
+
+    @property
+    def name(self):
+        return self.symbols.names[self.index]
+
+    @property
+    def slack(self):
+        return self._flag(FLAG_SLACK)
+
+    @property
+    def binary(self):
+        return self._flag(FLAG_BINARY)
+
+    @property
+    def integer(self):
+        """Whether the variable must take an integer value, binary or not"""
+
+        return self._flag(INTEGER_FLAGS)
+
+    @property
+    def lower_strict(self):
+        return self._flag(FLAG_LOWER_STRICT)
+
+    @property
+    def upper_strict(self):
+        return self._flag(FLAG_UPPER_STRICT)
+
+    @property
+    def lower_bound(self):
+        return float(self.symbols._lower[self.index])
+
+    @property
+    def upper_bound(self):
+        return float(self.symbols._upper[self.index])
 
     def set_binary(self, binary):
-        self.binary = binary
+        self._set_flag(FLAG_BINARY, binary)
+
+    def set_integer(self, integer):
+        """Make the variable a general integer one, or continuous; binary
+        variables are made general too"""
+
+        self._set_flag(FLAG_BINARY, False)
+        self._set_flag(FLAG_INTEGER, integer)
 
     def set_lower_bound(self, lower_bound=0.0, strict=False):
-        self.lower_bound = lower_bound
-        self.lower_strict = strict
+        self.symbols._own()
+        self.symbols._lower[self.index] = lower_bound
+        self._set_flag(FLAG_LOWER_STRICT, strict)
 
     def set_upper_bound(self, upper_bound=float("+infinity"), strict=False):
-        self.upper_bound = upper_bound
-        self.upper_strict = strict
+        self.symbols._own()
+        self.symbols._upper[self.index] = upper_bound
+        self._set_flag(FLAG_UPPER_STRICT, strict)
 
     def fixed_value(self):
         return self.upper_bound == self.lower_bound and not self.upper_strict and not self.lower_strict
 
+    def _flag(self, flag):
+        return bool(self.symbols._flags[self.index] & flag)
 
-
+    def _set_flag(self, flag, value):
+        self.symbols._own()
+        if value:
+            self.symbols._flags[self.index] |= flag
+        else:
+            self.symbols._flags[self.index] &= 0xFF ^ flag
 
 
 
 class SymbolTable:
+    """Variables of a problem, held as parallel arrays indexed by column.
+
+    Each name is stored once, shared by the name list and the name to
+    column index.  Bounds are float64 arrays and the slack, strictness,
+    binary and integer flags are bits in a uint8 array, which are exposed
+    through lower_bounds, upper_bounds and flags so that bounds can be read
+    and set for all variables at once.  Arrays adopted with from_arrays may be read
+    only, and are copied the first time they are written to."""
+
+    INITIAL_CAPACITY = 64
 
     def __init__(self):
 
-        self.table = {}
+        self.names  = []        # By column index
+        self.index  = {}        # Name -> column index
+        self._shared_names = False  # Names and index are shared with a clone
+        self._lower = np.empty(SymbolTable.INITIAL_CAPACITY, dtype=np.float64)
+        self._upper = np.empty(SymbolTable.INITIAL_CAPACITY, dtype=np.float64)
+        self._flags = np.empty(SymbolTable.INITIAL_CAPACITY, dtype=np.uint8)
+
+    @classmethod
+    def from_arrays(cls, names, lower_bounds, upper_bounds, flags):
+        """Make a symbol table from a list of names and arrays of bounds and
+        flags, without copying the arrays"""
+
+        symbols        = cls()
+        symbols.names  = list(names)
+        symbols.index  = {name: i for i, name in enumerate(symbols.names)}
+        symbols._lower = lower_bounds
+        symbols._upper = upper_bounds
+        symbols._flags = flags
+        return symbols
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        """Iterate over variables in column order"""
+
+        for i in range(len(self.names)):
+            yield Variable(self, i)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    @property
+    def lower_bounds(self):
+        self._own()
+        return self._lower[:len(self.names)]
+
+    @property
+    def upper_bounds(self):
+        self._own()
+        return self._upper[:len(self.names)]
+
+    @property
+    def flags(self):
+        self._own()
+        return self._flags[:len(self.names)]
+
+    def variable(self, index):
+        return Variable(self, index)
+
+    def add_variables(self, names, lower_bounds, upper_bounds, flags):
+        """Add variables from a list of names and arrays of bounds and
+        flags, returning an array of their column indices"""
+
+        first, count = len(self.names), len(names)
+        if len(set(names)) < count or any(name in self.index for name in names):
+            raise ValueError("Variable names must be unique")
+        self._unshare_names()
+
+        needed = first + count
+        if needed > len(self._lower):
+            self._lower = _grown(self._lower, first, needed)
+            self._upper = _grown(self._upper, first, needed)
+            self._flags = _grown(self._flags, first, needed)
+        else:
+            self._own()
+
+        self.names.extend(names)
+        self.index.update(zip(names, range(first, needed)))
+        self._lower[first:needed] = lower_bounds
+        self._upper[first:needed] = upper_bounds
+        self._flags[first:needed] = flags
 
+        return np.arange(first, needed, dtype=np.int64)
 
     def get(self, name, create=False, slack_if_created=False):
 
-        if name in self.table:
-            return self.table[name]
+        index = self.index.get(name)
+        if index is not None:
+            return Variable(self, index)
         else:
             if create:
-                self.new_variable(name, slack_if_created)
-                return self.get(name)
+                return self.new_variable(name, slack_if_created)
 
 
     def new_variable(self, name, slack=False):
 
-        var              = Variable(name, slack)
-        self.table[name] = var
-
-        return var
+        self._unshare_names()
+        index = len(self.names)
+        if index >= len(self._lower):
+            self._lower = _grown(self._lower, index, index + 1)
+            self._upper = _grown(self._upper, index, index + 1)
+            self._flags = _grown(self._flags, index, index + 1)
+        else:
+            self._own()
+
+        self.names.append(name)
+        self.index[name]   = index
+        self._lower[index] = 0.0
+        self._upper[index] = float("+infinity")
+        self._flags[index] = FLAG_SLACK if slack else 0
+
+        return Variable(self, index)
+
+    def clone(self):
+        """Return a copy of the table that shares its names and arrays until
+        either table changes them"""
+
+        symbols        = SymbolTable()
+        symbols.names  = self.names
+        symbols.index  = self.index
+        symbols._lower = _frozen(self._lower)
+        symbols._upper = _frozen(self._upper)
+        symbols._flags = _frozen(self._flags)
+        symbols._shared_names = self._shared_names = True
+        return symbols
+
+    def _unshare_names(self):
+        if self._shared_names:
+            self.names = list(self.names)
+            self.index = dict(self.index)
+            self._shared_names = False
+
+    def _own(self):
+        """Copy any read-only arrays before writing to them"""
+
+        count = len(self.names)
+        if not self._lower.flags.writeable:
+            self._lower = _grown(self._lower, count, count)
+        if not self._upper.flags.writeable:
+            self._upper = _grown(self._upper, count, count)
+        if not self._flags.flags.writeable:
+            self._flags = _grown(self._flags, count, count)
 
     def __str__(self):
         string = ""
-        for k, v in self.table.items():
-            string += f"{k}: {v}\n"
+        for var in self:
+            string += f"{var.name}: {var}\n"
 
         return string
 
 
 class Expression:
+    """A linear expression, held as one row of the problem's matrix.
 
-    def __init__(self, problem, name, terms):
+    Terms are read from and written to the matrix, so an expression is
+    only a view: two expressions with the same row are the same
+    expression."""
+
+    def __init__(self, problem, name, terms, row=None):
 
         self.symbols = problem.symbols
-        self.terms = terms
-        self.name   = name
+        self.matrix  = problem.matrix
+        self.name    = name
+        if row is None:
+            row = self.matrix.add_row([var.index for _, var in terms], [coefficient for coefficient, _ in terms])
+        self.row = row
 
     def __str__(self):
         terms_as_string = " + ".join([f"{t[0] if t[0] != 1 else ''}{t[1].name}" for t in self.terms])
         return f"{terms_as_string}"
 
-    def multiply(self, coefficient):
-        new_terms = []
-        for term in self.terms:
-            new_terms.append( (term[0] * coefficient, term[1]) )
+    @property
+    def terms(self):
+        """List of (coefficient, variable) terms, in the order first added"""
 
-        self.terms = new_terms
+        columns, values = self.matrix.row(self.row)
+        symbols = self.symbols
+        return [(value, Variable(symbols, column)) for column, value in zip(columns.tolist(), values.tolist())]
+
+    def add_term(self, coefficient, variable):
+        self.matrix.append(self.row, variable.index, coefficient)
+
+    def multiply(self, coefficient):
+        self.matrix.scale_row(self.row, coefficient)
 
     def find_coefficient_for_variable(self, variable, default=None):
-        for coefficient, var in self.terms:
-            if var == variable:
-                return coefficient
-        return default
+        return self.matrix.coefficient(self.row, variable.index, default)
+
+    def set_coefficient(self, variable, coefficient):
+        self.add_term(coefficient - self.find_coefficient_for_variable(variable, 0.0), variable)
+
+    def _clone(self, problem, expressions):
+        if self.row not in expressions:
+            expressions[self.row] = Expression(problem, self.name, None, self.row)
+        return expressions[self.row]
 
 
 class Inequality:
 
     def __init__(self, problem, name, terms, greater_than, strict, constant):
         self.name         = name
-        self.expression   = Expression(problem, name, terms)
+        self.expression   = _as_expression(problem, name, terms)
         self.greater_than = greater_than # Bool
         self.strict       = strict       # Bool
         self.constant     = constant
@@ -183,16 +553,23 @@ class Inequality:
         self.constant    *= -1
         self.greater_than = not self.greater_than
 
+    def _clone(self, problem, expressions):
+        return Inequality(problem, self.name, self.expression._clone(problem, expressions),
+                          self.greater_than, self.strict, self.constant)
+
 class Equation:
 
     def __init__(self, problem, name, terms, constant):
         self.name       = name
-        self.expression = Expression(problem, name, terms)
+        self.expression = _as_expression(problem, name, terms)
         self.constant   = constant
 
     def __str__(self):
         return f"{self.expression} = {self.constant}"
 
+    def _clone(self, problem, expressions):
+        return Equation(problem, self.name, self.expression._clone(problem, expressions), self.constant)
+
 
 class Constraint:
 
@@ -203,3 +580,444 @@ class Constraint:
         self.relation   = relation
         self.constant   = constant
 
+
+def _as_expression(problem, name, terms):
+    """Constraints may be given terms, making a new row, or an existing
+    expression, whose row they then share"""
+
+    if isinstance(terms, Expression):
+        return terms
+    return Expression(problem, name, terms)
+
+
+class SparseMatrix:
+    """Coefficients of a problem's expressions, as a sparse matrix with one
+    row per expression and one column per variable.
+
+    The matrix is stored by row (CSR): indptr[r]:indptr[r+1] indexes the
+    column indices and values of row r, in the order the terms were added.
+    New rows are appended to the end in O(terms).  Terms added to existing
+    rows are held back and merged in, summing any repeated entries, the next
+    time the matrix is read, which costs O(nnz log nnz) however many terms
+    were added.  A by-column (CSC) index is built on demand and kept until
+    the matrix next changes shape.
+
+    Arrays adopted with from_csr may be read only, as when mapped from a
+    file; they are copied the first time they are written to."""
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self):
+
+        self.rows    = 0
+        self.nnz     = 0
+        self.indptr  = np.zeros(SparseMatrix.INITIAL_CAPACITY + 1, dtype=np.int64)
+        self.indices = np.empty(SparseMatrix.INITIAL_CAPACITY, dtype=np.int64)
+        self.data    = np.empty(SparseMatrix.INITIAL_CAPACITY, dtype=np.float64)
+
+        self._pending       = []            # (rows, columns, values) arrays to merge in
+        self._pending_terms = ([], [], [])  # Single terms to merge in
+        self._csc           = None          # (indptr, row indices, positions in data)
+
+    @classmethod
+    def from_csr(cls, indptr, indices, data):
+        """Make a matrix from CSR arrays, without copying them"""
+
+        matrix         = cls()
+        matrix.rows    = len(indptr) - 1
+        matrix.nnz     = len(indices)
+        matrix.indptr  = indptr
+        matrix.indices = indices
+        matrix.data    = data
+        return matrix
+
+    def __str__(self):
+        return f"{self.rows} row sparse matrix with {self.nnz} non-zeroes"
+
+    def add_row(self, columns, values):
+        """Append a row, returning its index"""
+
+        count = len(columns)
+        if count > 1 and len(set(columns)) < count:
+            merged = {}
+            for column, value in zip(columns, values):
+                merged[column] = merged.get(column, 0.0) + value
+            columns, values, count = list(merged.keys()), list(merged.values()), len(merged)
+
+        self._reserve(1, count)
+        self.indices[self.nnz:self.nnz + count] = columns
+        self.data[self.nnz:self.nnz + count]    = values
+        self.nnz  += count
+        self.rows += 1
+        self.indptr[self.rows] = self.nnz
+        self._csc = None
+
+        return self.rows - 1
+
+    def add_rows(self, indptr, columns, values):
+        """Append a block of rows given as CSR arrays, returning the index of
+        the first"""
+
+        indptr  = np.asarray(indptr, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        values  = np.asarray(values, dtype=np.float64)
+        count   = len(indptr) - 1
+        first   = self.rows
+
+        rows = np.repeat(np.arange(count, dtype=np.int64), np.diff(indptr))
+        if len(columns) > 1 and len(np.unique(rows * (columns.max() + 1) + columns)) < len(columns):
+            # Leave merging repeated terms to the next read
+            return self.add_entries(count, rows, columns, values)
+
+        self._reserve(count, len(columns))
+        self.indices[self.nnz:self.nnz + len(columns)] = columns
+        self.data[self.nnz:self.nnz + len(columns)]    = values
+        self.indptr[self.rows + 1:self.rows + count + 1] = indptr[1:] + self.nnz
+        self.nnz  += len(columns)
+        self.rows += count
+        self._csc = None
+
+        return first
+
+    def add_entries(self, count, rows, columns, values):
+        """Append count rows given as (row, column, value) triplets, with rows
+        numbered from zero in any order, returning the index of the first"""
+
+        first = self.rows
+        self._reserve(count, 0)
+        self.indptr[self.rows + 1:self.rows + count + 1] = self.nnz
+        self.rows += count
+        self._pending.append((np.asarray(rows, dtype=np.int64) + first,
+                              np.asarray(columns, dtype=np.int64),
+                              np.asarray(values, dtype=np.float64)))
+        self._csc = None
+
+        return first
+
+    def append(self, row, column, value):
+        """Add a term to an existing row, or to an existing term"""
+
+        self._pending_terms[0].append(row)
+        self._pending_terms[1].append(column)
+        self._pending_terms[2].append(value)
+        self._csc = None
+
+    def copy_row(self, row):
+        """Append a copy of a row, returning the new row's index"""
+
+        columns, values = self.row(row)
+        return self.add_rows([0, len(columns)], columns.copy(), values.copy())
+
+    def row(self, row):
+        """Return the column indices and values of a row"""
+
+        self._merge()
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def column(self, column):
+        """Return the row indices and values of a column"""
+
+        indptr, rows, positions = self._column_index()
+        data = self.csr()[2]
+        if column >= len(indptr) - 1:
+            return rows[:0], data[:0]
+        start, end = indptr[column], indptr[column + 1]
+        return rows[start:end], data[positions[start:end]]
+
+    def coefficient(self, row, column, default=None):
+        """Return the coefficient at a row and column, in O(terms in row)"""
+
+        columns, values = self.row(row)
+        found = np.flatnonzero(columns == column)
+        return float(values[found[0]]) if len(found) else default
+
+    def scale_row(self, row, factor):
+        self._merge()
+        self._own()
+        self.data[self.indptr[row]:self.indptr[row + 1]] *= factor
+
+    def scale(self, row_factors, column_factors):
+        """Multiply every entry by the factors for its row and its column"""
+
+        self._merge()
+        self._own()
+        indptr, indices, data = self.csr()
+        data *= np.repeat(row_factors, np.diff(indptr)) * column_factors[indices]
+
+    def csr(self):
+        """Return the matrix's (indptr, indices, data) arrays"""
+
+        self._merge()
+        return self.indptr[:self.rows + 1], self.indices[:self.nnz], self.data[:self.nnz]
+
+    def csc(self):
+        """Return (indptr, row indices, data) arrays for the matrix by column"""
+
+        indptr, rows, positions = self._column_index()
+        return indptr, rows, self.csr()[2][positions]
+
+    def clone(self):
+        """Return a copy of the matrix that shares its rows.
+
+        The arrays are frozen, so this matrix copies them before it next
+        writes to them, and the copy is an overlay on them."""
+
+        self._merge()
+        self.indptr  = _frozen(self.indptr)
+        self.indices = _frozen(self.indices)
+        self.data    = _frozen(self.data)
+        return MatrixOverlay(*self.csr())
+
+    def select_rows(self, rows):
+        """Return CSR arrays for the given rows, in the order given"""
+
+        indptr, indices, data = self.csr()
+        rows    = np.asarray(rows, dtype=np.int64)
+        starts  = indptr[rows]
+        counts  = indptr[rows + 1] - starts
+        new_ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=new_ptr[1:])
+
+        positions = np.repeat(starts - new_ptr[:-1], counts) + np.arange(new_ptr[-1], dtype=np.int64)
+        return new_ptr, indices[positions], data[positions]
+
+    def _column_index(self):
+        if self._csc is None:
+            indptr, indices, _ = self.csr()
+            positions = np.argsort(indices, kind="stable")
+            rows      = np.repeat(np.arange(self.rows, dtype=np.int64), np.diff(indptr))[positions]
+            columns   = int(indices.max()) + 1 if len(indices) else 0
+            col_ptr   = np.zeros(columns + 1, dtype=np.int64)
+            np.cumsum(np.bincount(indices, minlength=columns), out=col_ptr[1:])
+            self._csc = (col_ptr, rows, positions)
+
+        return self._csc
+
+    def _reserve(self, rows, nnz):
+        """Make room to append rows and non-zeroes, growing geometrically"""
+
+        if self.rows + rows + 1 > len(self.indptr) or not self.indptr.flags.writeable:
+            self.indptr = _grown(self.indptr, self.rows + 1, self.rows + rows + 1)
+        if self.nnz + nnz > len(self.indices) or not self.indices.flags.writeable:
+            self.indices = _grown(self.indices, self.nnz, self.nnz + nnz)
+            self.data    = _grown(self.data, self.nnz, self.nnz + nnz)
+
+    def _own(self):
+        """Copy any read-only arrays before writing to them"""
+
+        self._reserve(0, 0)
+        if not self.data.flags.writeable:
+            self.data = _grown(self.data, self.nnz, self.nnz)
+
+    def _merge(self):
+        """Merge terms added to existing rows into the CSR arrays.
+
+        Repeated (row, column) entries are summed, and each row keeps its
+        terms in the order they were first added."""
+
+        if not self._pending and not self._pending_terms[0]:
+            return
+
+        pending_rows, pending_columns, pending_values = self._pending_terms
+        indptr = self.indptr[:self.rows + 1]
+        rows    = np.concatenate([np.repeat(np.arange(self.rows, dtype=np.int64), np.diff(indptr))]
+                                 + [r for r, _, _ in self._pending]
+                                 + [np.array(pending_rows, dtype=np.int64)])
+        columns = np.concatenate([self.indices[:self.nnz]]
+                                 + [c for _, c, _ in self._pending]
+                                 + [np.array(pending_columns, dtype=np.int64)])
+        values  = np.concatenate([self.data[:self.nnz]]
+                                 + [v for _, _, v in self._pending]
+                                 + [np.array(pending_values, dtype=np.float64)])
+
+        width = int(columns.max()) + 1 if len(columns) else 1
+        keys, first, inverse = np.unique(rows * width + columns, return_index=True, return_inverse=True)
+        sums  = np.bincount(inverse, weights=values, minlength=len(keys))
+        order = np.lexsort((first, keys // width))
+
+        self.indices = (keys % width)[order]
+        self.data    = sums[order]
+        self.nnz     = len(keys)
+        self.indptr  = np.zeros(self.rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // width, minlength=self.rows), out=self.indptr[1:])
+
+        self._pending       = []
+        self._pending_terms = ([], [], [])
+        self._csc           = None
+
+
+def _grown(array, used, needed, minimum=64):
+    """Return a writable copy of the first `used` items of an array, with
+    room for at least `needed`, grown geometrically so that appends are
+    amortised O(1).  An array with room enough keeps its size, so copying
+    a shared array before writing to it does not grow it."""
+
+    size  = len(array) if needed <= len(array) else max(needed, 2 * len(array), minimum)
+    grown = np.empty(size, dtype=array.dtype)
+    grown[:used] = array[:used]
+    return grown
+
+
+def _csr_arrays(matrix, columns):
+    """Return (indptr, indices, data) arrays for a SparseMatrix, a sparse
+    matrix with a tocsr() method, or the non-zeroes of a dense 1-d or 2-d
+    array"""
+
+    if isinstance(matrix, SparseMatrix):
+        return matrix.csr()
+    if hasattr(matrix, "tocsr"):
+        matrix = matrix.tocsr()
+        matrix.sum_duplicates()
+        return (np.asarray(matrix.indptr, dtype=np.int64), np.asarray(matrix.indices, dtype=np.int64),
+                np.asarray(matrix.data, dtype=np.float64))
+
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2 or matrix.shape[1] > columns:
+        raise ValueError(f"Expected a matrix with at most {columns} columns but found shape {matrix.shape}")
+
+    rows, indices = np.nonzero(matrix)
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=matrix.shape[0]), out=indptr[1:])
+    return indptr, indices.astype(np.int64), matrix[rows, indices]
+
+
+class MatrixOverlay(SparseMatrix):
+    """A sparse matrix sharing the rows of a frozen base, as returned by
+    SparseMatrix.clone.
+
+    Base rows are read in place until written to, when they are copied into
+    a private patch matrix, and new rows are added to a private tail
+    matrix, so each change costs O(terms in the row changed) however large
+    the base.  Row indices never change.  Reading the whole matrix joins the
+    three, and the result is kept until the next change."""
+
+    def __init__(self, indptr, indices, data):
+
+        self.base      = (indptr, indices, data)
+        self.base_rows = len(indptr) - 1
+        self.patch     = SparseMatrix()
+        self.patched   = {}     # Base row -> row of patch
+        self.tail      = SparseMatrix()
+        self._joined   = None   # (indptr, indices, data) of the whole matrix
+        self._csc      = None
+
+    @property
+    def rows(self):
+        return self.base_rows + self.tail.rows
+
+    def __str__(self):
+        return f"{self.rows} row sparse matrix with {len(self.csr()[1])} non-zeroes"
+
+    def add_row(self, columns, values):
+        self._changed()
+        return self.base_rows + self.tail.add_row(columns, values)
+
+    def add_rows(self, indptr, columns, values):
+        self._changed()
+        return self.base_rows + self.tail.add_rows(indptr, columns, values)
+
+    def add_entries(self, count, rows, columns, values):
+        self._changed()
+        return self.base_rows + self.tail.add_entries(count, rows, columns, values)
+
+    def append(self, row, column, value):
+        matrix, row = self._writable(row)
+        matrix.append(row, column, value)
+
+    def scale_row(self, row, factor):
+        matrix, row = self._writable(row)
+        matrix.scale_row(row, factor)
+
+    def scale(self, row_factors, column_factors):
+        """Scale every entry, which touches every row, so the result becomes
+        the new base rather than patching each row"""
+
+        indptr, indices, data = self.csr()
+        data = data * np.repeat(row_factors, np.diff(indptr)) * column_factors[indices]
+        self.base      = (indptr, indices, data)
+        self.base_rows = len(indptr) - 1
+        self.patch     = SparseMatrix()
+        self.patched   = {}
+        self.tail      = SparseMatrix()
+        self._joined   = None
+
+    def row(self, row):
+        if row >= self.base_rows:
+            return self.tail.row(row - self.base_rows)
+        if row in self.patched:
+            return self.patch.row(self.patched[row])
+
+        indptr, indices, data = self.base
+        start, end = indptr[row], indptr[row + 1]
+        return indices[start:end], data[start:end]
+
+    def csr(self):
+        if self._joined is None:
+            indptr, indices, data = self.base
+            if self.patched:
+                indptr, indices, data = self._patched_base()
+            if self.tail.rows:
+                tail_ptr, tail_indices, tail_data = self.tail.csr()
+                indptr  = np.concatenate((indptr, tail_ptr[1:] + indptr[-1]))
+                indices = np.concatenate((indices, tail_indices))
+                data    = np.concatenate((data, tail_data))
+            self._joined = (_frozen(indptr), _frozen(indices), _frozen(data))
+
+        return self._joined
+
+    def clone(self):
+        return MatrixOverlay(*self.csr())
+
+    def _patched_base(self):
+        """Return CSR arrays for the base with patched rows substituted"""
+
+        indptr, indices, data = self.base
+        patch_ptr, patch_indices, patch_data = self.patch.csr()
+        rows  = np.fromiter(self.patched.keys(), dtype=np.int64, count=len(self.patched))
+        slots = np.fromiter(self.patched.values(), dtype=np.int64, count=len(self.patched))
+
+        starts = indptr[:-1].copy()
+        counts = np.diff(indptr)
+        starts[rows] = patch_ptr[slots]
+        counts[rows] = patch_ptr[slots + 1] - patch_ptr[slots]
+
+        new_ptr = np.zeros(self.base_rows + 1, dtype=np.int64)
+        np.cumsum(counts, out=new_ptr[1:])
+        positions = np.repeat(starts - new_ptr[:-1], counts) + np.arange(new_ptr[-1], dtype=np.int64)
+        patched   = np.zeros(self.base_rows, dtype=bool)
+        patched[rows] = True
+        from_patch = np.repeat(patched, counts)
+
+        new_indices = np.empty(new_ptr[-1], dtype=np.int64)
+        new_data    = np.empty(new_ptr[-1], dtype=np.float64)
+        new_indices[~from_patch] = indices[positions[~from_patch]]
+        new_data[~from_patch]    = data[positions[~from_patch]]
+        new_indices[from_patch]  = patch_indices[positions[from_patch]]
+        new_data[from_patch]     = patch_data[positions[from_patch]]
+        return new_ptr, new_indices, new_data
+
+    def _writable(self, row):
+        """Return the matrix holding a row and the row's index within it,
+        copying base rows into the patch first"""
+
+        self._changed()
+        if row >= self.base_rows:
+            return self.tail, row - self.base_rows
+        if row not in self.patched:
+            columns, values = self.row(row)
+            self.patched[row] = self.patch.add_row(columns.tolist(), values.tolist())
+        return self.patch, self.patched[row]
+
+    def _changed(self):
+        self._joined = None
+        self._csc    = None
+
+
+def _frozen(array):
+    """Make an array read only, so that its owner copies it before writing"""
+
+    array.flags.writeable = False
+    return array
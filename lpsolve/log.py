@@ -0,0 +1,66 @@
+import contextlib, io, logging, sys
+
+# The solver's messages all go through this logger.  Nothing is shown until
+# configure() is called (the command line does), and each message is only
+# formatted if its level is shown, so the solve loop's per-iteration
+# messages cost next to nothing at the default level
+logger = logging.getLogger("lpsolve")
+logger.addHandler(logging.NullHandler())
+
+# Below DEBUG, for dumps of the whole tableau after every pivot
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+# Levels selectable by configure(), from the quietest:
+#
+# quiet --- warnings alone
+# info --- progress and results of each stage, the default
+# debug --- every iteration's entering and leaving variables
+# trace --- the tableau after every iteration as well
+LEVELS = {"quiet": logging.WARNING, "info": logging.INFO, "debug": logging.DEBUG, "trace": TRACE}
+
+
+class _StandardOutput(logging.Handler):
+    """Writes each message alone to whatever sys.stdout is when it is
+    logged, so that redirecting stdout quietens the solver as before"""
+
+    def emit(self, record):
+        try:
+            sys.stdout.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+def configure(level="info"):
+    """Print the solver's messages at level, one of LEVELS, and above on
+    standard output"""
+
+    if level not in LEVELS:
+        raise ValueError(f"Unknown log level '{level}', expected one of {', '.join(LEVELS)}")
+    for handler in [handler for handler in logger.handlers if isinstance(handler, _StandardOutput)]:
+        logger.removeHandler(handler)
+    logger.addHandler(_StandardOutput())
+    logger.setLevel(LEVELS[level])
+    logger.propagate = False
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the solver's messages for the duration, as for the many
+    small solves made by branch and bound"""
+
+    disabled, logger.disabled = logger.disabled, True
+    try:
+        yield
+    finally:
+        logger.disabled = disabled
+
+
+def dump(report):
+    """Log what report() prints, such as an engine's summarise(), at TRACE
+    level, calling it only if that level is shown"""
+
+    if logger.isEnabledFor(TRACE):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            report()
+        logger.log(TRACE, out.getvalue().rstrip("\n"))
@@ -1,170 +1,193 @@
 
 import re
-from . import ir
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+import numpy as np
+from . import ir, stats
+
+# Token kinds, in priority order.  Where more than one pattern could match at
+# a given position the earliest in this list wins, exactly as if each were tried
+# in turn.
+TOKEN_PATTERNS = [
+    ("number",         r"([0-9]+(.[0-9]+)?(e[0-9]+(\.[0-9]+)?)?|(-|\+)inf(inity)?)"),
+    ("free",           r"free"),
+    ("identifier",     r"[AaBbCcDdFfGgHhIiJjKkLlMmNnOoPpQqRrSsTtUuVvWwXxYyZz\!\"#$%&()/,;?@_`'{}|~][a-zA-Z0-9\!\"#$%&()/,;?@_`'{}|~.]*"),
+    ("operator",       r"(\+|-)"),
+    ("relation",       r"(<=|=<|>=|=>|=|<|>)"),
+    ("name_separator", r"[ \t\f\v\r]*:[ \t\f\v\r]*"),
+    ("whitespace",     r"[ \t\f\v\r]+"),
+    ("mismatch",       r"."),
+]
+TOKEN_PATTERN = re.compile("|".join(f"(?P<{kind}>{pattern})" for kind, pattern in TOKEN_PATTERNS))
 
-class Buffer:
-
-    def __init__(self, string):
-        self.string = string
-        self.line = 0
-        self.char = 0
-
-    def peek(self, pattern, flags=re.MULTILINE):
-        if re.match(pattern, self.string, flags=flags):
-            return True
-        return False
 
-    def consume(self, pattern, flags=re.MULTILINE):
-
-        m = re.match(pattern, self.string, flags=flags)
-        if m is None:
-            return None
+class Buffer:
+    """Holds the raw lines of a section and scans them into tokens.
 
-        # print(f"Matched \"{m.group(0)}\" =~ {pattern}")
-        self.string = self.string[len(m.group(0)):]
-        self.line += len(re.findall("\n", m.group(0)) or "")
-        if re.search("\n", m.group(0)):
-            self.char += len(re.search("\n.*$", m.group(0)).group(0))
-        else:
-            self.char += len(m.group(0))
+    Lines are kept separately along with their line number in the source
+    file, or read lazily from a source iterator when streaming, and each
+    is scanned in one forward pass of the precompiled
+    TOKEN_PATTERN rather than by slicing, so tokenising is linear in the
+    size of the section."""
 
-        return m.group(0)
+    def __init__(self):
+        self.lines        = []
+        self.line_numbers = []
+        self.source       = None
+        self.line         = 0
+        self.char         = 0
+
+    def append(self, string, line_number=None):
+        self.lines.append(string)
+        self.line_numbers.append(len(self.lines) if line_number is None else line_number)
+
+    def numbered_lines(self):
+        if self.source is not None:
+            return self.source
+        return zip(self.lines, self.line_numbers)
+
+    def tokens(self):
+        """Yield (kind, value) tuples for every token in the buffer.
+
+        Each line is preceded by a newline token, mirroring the
+        line-oriented nature of the format."""
+
+        scan = TOKEN_PATTERN.finditer
+        for string, line_number in self.numbered_lines():
+            yield ("newline", "\n")
+
+            for m in scan(string):
+                kind = m.lastgroup
+                if kind == "whitespace":
+                    continue
+                elif kind == "name_separator":
+                    yield ("name_separator", ":")
+                elif kind == "mismatch":
+                    self.line = line_number
+                    self.char = m.start()
+                    error(f"Unknown token at {self.report()}: {string[self.char:self.char+10]}...")
+                else:
+                    yield (kind, m.group())
 
     def report(self):
         return f"line {self.line}, char {self.char}"
 
     def empty(self):
-        return len(self.string) == 0
+        return len(self.lines) == 0 and self.source is None
 
 
 
 
 class Section:
 
+    # Tokens that carry a phrase over a line break, ending one line or starting the next
+    CONTINUES_LINE = ("relation", "operator")
+
     def __init__(self):
-        self.buf = Buffer("")
-        self.tokens = {}
-
-    def append_raw(self, string):
-        self.buf.string += f"\n{string}"
-
-    def tokenise(self):
-
-        IDENTIFIER_PATTERN                  = "[AaBbCcDdFfGgHhIiJjKkLlMmNnOoPpQqRrSsTtUuVvWwXxYyZz\!\"#$%&()/,;?@_`'{}|~][a-zA-Z0-9\!\"#$%&()/,;?@_`'{}|~.]*"
-        NAME_SEPARATOR_PATTERN              = "\s*:\s*"
-        LINE_SEPARATOR_PATTERN              = "\n"
-        NUMBER_PATTERN                      = "([0-9]+(.[0-9]+)?(e[0-9]+(\.[0-9]+)?)?|(-|\+)inf(inity)?)"
-        WHITESPACE_PERMITTED_IN_EXPRESSIONS = "\s+"
-        RELATION_PATTERN                    = "(<=|=<|>=|=>|=|<|>)"
-        OPERATOR_PATTERN                    = "(\+|-)"
-        VARIABLE_FREE_PATTERN               = "free"
-
-        tokens = []
-        while not self.buf.empty():
-            if self.buf.peek(NUMBER_PATTERN):
-                tokens.append( ("number", self.buf.consume(NUMBER_PATTERN)) )
-            elif self.buf.peek(VARIABLE_FREE_PATTERN):
-                tokens.append( ("free", self.buf.consume(VARIABLE_FREE_PATTERN)) )
-            elif self.buf.peek(IDENTIFIER_PATTERN):
-                tokens.append( ("identifier", self.buf.consume(IDENTIFIER_PATTERN)) )
-            elif self.buf.peek(OPERATOR_PATTERN):
-                tokens.append( ("operator", self.buf.consume(OPERATOR_PATTERN)) )
-            elif self.buf.peek(RELATION_PATTERN):
-                tokens.append( ("relation", self.buf.consume(RELATION_PATTERN)) )
-            elif self.buf.consume(LINE_SEPARATOR_PATTERN):
-                tokens.append( ("newline", "\n") )
-            elif self.buf.consume(NAME_SEPARATOR_PATTERN):
-                tokens.append( ("name_separator", ":") )
-            elif self.buf.consume(WHITESPACE_PERMITTED_IN_EXPRESSIONS):
-                pass
-            else:
-                error(f"Unknown token at {self.buf.report()}: {self.buf.string[:10]}...")
+        self.buf          = Buffer()
+        self.phrase_count = 0
+
+    def append_raw(self, string, line_number=None):
+        self.buf.append(string, line_number)
+
+    def stream_from(self, source):
+        """Read this section's lines lazily from an iterable of
+        (line, line_number) pairs rather than from appended text."""
+        self.buf.source = source
 
+    def phrases(self):
+        """Yield (name, tokens) for each phrase in the section, in order.
 
-        # Now simplify tokens to handle known common parsing cases.
-        # Probably not really the place but w/ee
+        Phrases without a label are named after their position in the
+        section."""
 
-        # 1) if an identifier is surrounded by a name separator and a newline then it is an expression label
-        new_tokens = []
-        for i, token in enumerate(tokens):
+        for count, (label, tokens) in enumerate(self.labelled_phrases(), 1):
+            yield (label or f"rule_{count}", tokens)
+
+    def labelled_phrases(self):
+        """Yield (label, tokens) for each phrase in the section, in order,
+        where label is None if the phrase was not given one.
+
+        The raw token stream is simplified in a single pass, using one token
+        of lookbehind and one of lookahead to find phrase labels, 'free'
+        markers and expressions that continue over more than one line."""
+
+        count         = 0
+        phrase_name   = None
+        phrase_tokens = []
+
+        tokens    = self.buf.tokens()
+        token     = next(tokens, None)
+        prev_kind = None
+        while token is not None:
+            following = next(tokens, None)
+            kind      = token[0]
+            next_kind = following[0] if following is not None else None
 
             # Leading newline is a product of the tokeniser.
-            if i == 0 and token[0] == "newline":
+            if prev_kind is None and kind == "newline":
                 pass
 
             # Case where an identifier is used as an expression label
-            elif token[0] == "identifier" and i > 0 and tokens[i-1][0] == "newline" and i < len(tokens)-1 and tokens[i+1][0] == "name_separator":
-                new_tokens.append( ("phrase_label", token[1]) )
+            elif kind == "identifier" and prev_kind == "newline" and next_kind == "name_separator":
+                phrase_name = token[1]
 
             # We have used the name separator character above to identify a label, so can discard this token
-            elif token[0] == "name_separator":
+            elif kind == "name_separator":
                 pass
 
             # If we have variable name followed by "free" then this variable needs omitting and we'll put +-inf on the token
             # list instead to ensure a consistent format
-            elif token[0] == "identifier" and i < len(tokens)-1 and tokens[i+1][0] == "free":
-                new_tokens.append( ("number", float("-infinity")) )
-                new_tokens.append( ("relation", "<=") )
-                new_tokens.append( token )
-                new_tokens.append( ("relation", "<=") )
-                new_tokens.append( ("number", float("+infinity")) )
+            elif kind == "identifier" and next_kind == "free":
+                phrase_tokens.append( ("number", float("-infinity")) )
+                phrase_tokens.append( ("relation", "<=") )
+                phrase_tokens.append( token )
+                phrase_tokens.append( ("relation", "<=") )
+                phrase_tokens.append( ("number", float("+infinity")) )
             # And the case for the 'free' marker to make this work:
-            elif token[0] == "free":
+            elif kind == "free":
                 pass
 
-            # Case where the next token after the newline is an operator or relation, meaning the expression
-            # continues on the next line
-            elif token[0] == "newline" and i < len(tokens)-1 and (tokens[i+1][0] == "relation" or tokens[i+1][0] == "operator"):
-                pass
-
-            # Case where the current token is an operator but the next one is a newline, so the expression continues
-            # on the next line
-            elif token[0] == "newline" and i > 0 and (tokens[i-1][0] == "relation" or tokens[i-1][0] == "operator"):
+            # Case where the line ends on an operator or relation, or the next one begins with one, meaning
+            # the expression continues on the next line
+            elif kind == "newline" and (next_kind in self.CONTINUES_LINE or prev_kind in self.CONTINUES_LINE):
                 pass
 
             # Case where this line ends on an identifier and the next line begins with something other than a relation or operator,
             # meaning this is the end of an expression
-            elif token[0] == "newline" and i > 0 and tokens[i-1][0] != "relation" and tokens[i-1][0] != "operator" and i < len(tokens)-1 and (tokens[i+1][0] != "operator" and tokens[i+1][0] != "relation"):
-                new_tokens.append( ("end_phrase", "\n") )
-
-            elif token[0] == "number":
-                new_tokens.append( ("number", float(token[1])) )
-            else:
-                new_tokens.append(token)
-
-        # Let's always trigger this to make life easier.
-        if len(new_tokens) > 0:
-            new_tokens.append( ("end_phrase", "EOF") )
-
-        # Now let's group these into phrases
-        phrases = {}
-        phrase_name = None
-        phrase_tokens = []
-        for i, token in enumerate(new_tokens):
-            if token[0] == "phrase_label":
-                phrase_name = token[1]
-            elif token[0] == "end_phrase":
-                if phrase_name is None:
-                    phrase_name = f"rule_{len(phrases)+1}"
-                phrases[phrase_name] = phrase_tokens
+            elif kind == "newline" and next_kind is not None:
+                count += 1
+                yield (phrase_name, phrase_tokens)
                 phrase_tokens = []
-                phrase_name = None
+                phrase_name   = None
+
+            elif kind == "number":
+                phrase_tokens.append( ("number", float(token[1])) )
             else:
                 phrase_tokens.append(token)
 
-        # And show the people at home what we've done
-        # print("Tokens:")
-        # for n, tks in phrases.items():
-        #     print(f"{n}: {tks}")
-        # for i, tok in enumerate(new_tokens):
-        #     print(f"[{i}] {tok}")
-        self.tokens = phrases
+            prev_kind = kind
+            token     = following
+
+        # Let's always trigger this to make life easier.
+        if count > 0 or phrase_tokens or phrase_name is not None:
+            yield (phrase_name, phrase_tokens)
 
     def _token_expression_to_terms(self, problem, name, tokens):
         """Converts parsed tokens to algorithmic terms.
 
         Necessary anywhere where expressions are parsed."""
 
+        get = problem.symbols.get
+        return [(coefficient, get(identifier, create=True))
+                for coefficient, identifier in self._token_expression_to_named_terms(name, tokens)]
+
+    def _token_expression_to_named_terms(self, name, tokens):
+        """Converts parsed tokens to (coefficient, variable name) terms,
+        without reference to any problem's symbol table."""
+
         # Parse tokens into another IR that is more suited to computation
         terms = []
         coefficient = 1.0
@@ -175,8 +198,7 @@ class Section:
             elif token[0] == "operator" and token[1] == "-":
                 negative = not negative
             elif token[0] == "identifier":
-                var = problem.symbols.get(token[1], create=True)
-                terms.append( (coefficient * (-1 if negative else 1), var) )
+                terms.append( (coefficient * (-1 if negative else 1), token[1]) )
                 coefficient = 1
                 negative = False
             elif token[0] == "operator" and token[1] == "+":
@@ -188,8 +210,17 @@ class Section:
 
 
     def build_ir(self, problem):
-        print("STUB: Section#parse in parser.py")
-        pass
+        """Read phrases and build each into the problem as soon as it is
+        complete, so only one phrase's tokens are held at a time."""
+
+        for name, tokens in self.phrases():
+            self.phrase_count += 1
+            self.build_phrase(problem, name, tokens)
+
+    def build_phrase(self, problem, name, tokens):
+        """Build one phrase into the problem, as each section defines"""
+
+        raise NotImplementedError(f"{type(self).__name__} does not build phrases")
 
 
 
@@ -202,16 +233,14 @@ class Objective(Section):
         super().__init__()
         self.maximise = maximise
 
-    def build_ir(self, problem):
-        if len(self.tokens) > 1:
+    def build_phrase(self, problem, name, tokens):
+        if self.phrase_count > 1:
             error("Too many objective expressions -- this library only supports one right now")
 
         # Build an expression object out of the token list
         #
         # TODO: I'm not sure how I want to encode this yet, so
         #       will worry about that later.
-        name, tokens = list(self.tokens.items())[0]
-
         terms = self._token_expression_to_terms(problem, name, tokens)
 
         # print(f"{problem.get_expression(name, terms)}")
@@ -220,48 +249,116 @@ class Objective(Section):
 
 class Constraints(Section):
 
-    def build_ir(self, problem):
-        # Add a list of constraints
-        payload = []
-        for name, tokens in self.tokens.items():
+    def build_phrase(self, problem, name, tokens):
+        relation, constant, tokens = self._split_constraint(name, tokens)
+        terms = self._token_expression_to_terms(problem, name, tokens)
+        self._add_constraint(problem, name, relation, constant, terms)
 
-            # Each constraint should be composed of an expression, a relation,
-            # and a number, e.g.:
-            #
-            # - x1 + x2 + x3 + 10 x4 <= 20
+    def _split_constraint(self, name, tokens):
+        """Split a constraint's tokens into its relation, its constant and
+        the tokens of its expression"""
 
+        # Each constraint should be composed of an expression, a relation,
+        # and a number, e.g.:
+        #
+        # - x1 + x2 + x3 + 10 x4 <= 20
 
-            if len(tokens) < 3:
-                error(f"Not enough tokens to form a meaningful constraint, name {name}.  Token list: {tokens}")
-            # We expect the RHS to be a number, so this is the place to patch unary negation
-            if tokens[-1][0] == "number" and tokens[-2][0] == "operator" and tokens[-2][1] == "-":
-                tokens = tokens[:-2] + [("number", -1*float(tokens[-1][1]))]
-            if tokens[-1][0] != "number":
-                error(f"Expected number (coefficient) on RHS of constraint with name {name} but found token: {tokens[-1]}")
-            if tokens[-2][0] != "relation":
-                error(f"Expected a relation as the penultimate token in constraint with name {name}, but found token {tokens[-2]}")
 
+        if len(tokens) < 3:
+            error(f"Not enough tokens to form a meaningful constraint, name {name}.  Token list: {tokens}")
+        # We expect the RHS to be a number, so this is the place to patch unary negation
+        if tokens[-1][0] == "number" and tokens[-2][0] == "operator" and tokens[-2][1] == "-":
+            tokens = tokens[:-2] + [("number", -1*float(tokens[-1][1]))]
+        if tokens[-1][0] != "number":
+            error(f"Expected number (coefficient) on RHS of constraint with name {name} but found token: {tokens[-1]}")
+        if tokens[-2][0] != "relation":
+            error(f"Expected a relation as the penultimate token in constraint with name {name}, but found token {tokens[-2]}")
 
-            relation = tokens[-2][1]    # TODO: represent more usefully
-            constant = tokens[-1][1]    # TODO: parse
 
+        relation = tokens[-2][1]    # TODO: represent more usefully
+        constant = tokens[-1][1]    # TODO: parse
 
-            terms = self._token_expression_to_terms(problem, name, tokens[:-2])
+        return relation, constant, tokens[:-2]
 
+    def _add_constraint(self, problem, name, relation, constant, terms, row=None):
+        """Add a constraint with the given terms, or, if row is given, over
+        that existing row of the problem's matrix"""
 
-            # If the relation is an equals, get an equation
-            if relation == "=":
-                constraint = problem.get_equation(f"constraint_eq_{name}", terms, constant)
-            else:
-                constraint = problem.get_inequality(f"constraint_ineq_{name}", terms,
-                        True if relation in [">", ">=", "=>"] else False, 
-                        False if "=" in relation else True, constant)
+        # If the relation is an equals, get an equation
+        if relation == "=":
+            full_name = f"constraint_eq_{name}"
+        else:
+            full_name = f"constraint_ineq_{name}"
+        if row is not None:
+            terms = problem.get_expression(full_name, None, row)
+
+        if relation == "=":
+            constraint = problem.get_equation(full_name, terms, constant)
+        else:
+            constraint = problem.get_inequality(full_name, terms,
+                    True if relation in [">", ">=", "=>"] else False, 
+                    False if "=" in relation else True, constant)
+
+        problem.add_constraint(name, constraint)
+
+    def build_ir_parallel(self, problem, pool, processes, chunk_lines):
+        """Build the section's constraints using a process pool.
+
+        Lines are read in chunks of roughly chunk_lines, each split where one
+        phrase ends and the next begins, and tokenised and converted to terms
+        by the pool.  Results are merged back in order, so the symbol table
+        and constraints come out exactly as they would from build_ir.  At
+        most two chunks per process are in flight at once."""
+
+        chunks = _phrase_chunks(self.buf.numbered_lines(), chunk_lines)
+        first  = next(chunks, [])
+        second = next(chunks, None)
+
+        # Not worth the round trip for a single chunk
+        if second is None:
+            self.stream_from(first)
+            self.build_ir(problem)
+            return
+
+        in_flight = deque()
+        for chunk in chain([first, second], chunks):
+            in_flight.append(pool.submit(_parse_constraint_chunk, chunk))
+            if len(in_flight) >= 2 * processes:
+                self._merge_constraint_chunk(problem, in_flight.popleft().result())
+        while in_flight:
+            self._merge_constraint_chunk(problem, in_flight.popleft().result())
+
+    def _merge_constraint_chunk(self, problem, result):
+        """Add the constraints returned by _parse_constraint_chunk to the problem"""
+
+        labels, relations, constants, row_ends, names, columns, values = result
+
+        # Rows go into the matrix as one block, renumbered to the problem's columns
+        get     = problem.symbols.get
+        mapping = np.array([get(name, create=True).index for name in names], dtype=np.int64)
+        indptr  = np.concatenate(([0], np.asarray(row_ends, dtype=np.int64)))
+        first   = problem.matrix.add_rows(indptr, mapping[np.asarray(columns, dtype=np.int64)], values)
+
+        for row, (label, relation, constant) in enumerate(zip(labels, relations, constants), first):
+            self.phrase_count += 1
+            self._add_constraint(problem, label or f"rule_{self.phrase_count}", relation, constant, None, row)
 
-            problem.add_constraint(name, constraint)
 
 class Bounds(Section):
     # FIXME: implement these as constraints!
 
+    # A sign is only ever that of a bound's number, as in '-5 <= x', so
+    # one starting a line starts a new bound
+    CONTINUES_LINE = ("relation",)
+
+    RELATION_INVERSION = {">": "<",
+                          ">=": "<=",
+                          "=>": "<=",
+                          "=": "=",
+                          "<": ">",
+                          "<=": ">=",
+                          "=<": ">="}
+
 
     def _set_variable_bounds(self, problem, identifier, relation, number):
         """Sets variable bounds on the assumption that the statement is in the form:
@@ -286,92 +383,102 @@ class Bounds(Section):
             var.set_upper_bound(number, strict=False)
 
 
-    def build_ir(self, problem):
+    def _fold_signs(self, tokens):
+        """Fold a sign at the start of a bound, or just after a relation,
+        into the number that follows it, so that '-5 <= x' is read as a
+        number, a relation and an identifier"""
 
-        RELATION_INVERSION = {">": "<",
-                              ">=": "<=",
-                              "=>": "<=",
-                              "=": "=",
-                              "<": ">",
-                              "<=": ">=",
-                              "=<": ">="}
+        folded = []
+        for token in tokens:
+            if token[0] == "number" and folded and folded[-1][0] == "operator" and \
+                    (len(folded) == 1 or folded[-2][0] == "relation"):
+                sign  = folded.pop()[1]
+                token = ("number", -float(token[1]) if sign == "-" else float(token[1]))
+            folded.append(token)
 
-        payload = []
-        for name, tokens in self.tokens.items():
+        return folded
 
-            # Case where bounds are given as a single, upper or lower:
-            #
-            # x5 >= 3.4
-            # 4.6 <= x2
-            #
-            if len(tokens) == 3:
-                if tokens[1][0] != "relation":
-                    error(f"Bounds given with a single relation, yet that relation is not the middle token.  Bound name: {name}, token list: {tokens}")
+    def build_phrase(self, problem, name, tokens):
 
-                if not ((tokens[0][0] == "identifier" and tokens[2][0] == "number") or (tokens[0][0] == "number" and tokens[2][0] == "identifier")):
-                    error(f"Expected an identifier and number as bounds but found something else.  Bound name: {name}, token list: {tokens}")
+        tokens = self._fold_signs(tokens)
 
+        # Case where bounds are given as a single, upper or lower:
+        #
+        # x5 >= 3.4
+        # 4.6 <= x2
+        #
+        if len(tokens) == 3:
+            if tokens[1][0] != "relation":
+                error(f"Bounds given with a single relation, yet that relation is not the middle token.  Bound name: {name}, token list: {tokens}")
 
-                # Normalise this to have the identifier on the LHS
-                if tokens[0][0] == "identifier":
-                    identifier = tokens[0][1]
-                    relation = tokens[1][1]
-                    number = float(tokens[2][1])
-                elif tokens[0][0] == "number":
-                    identifier = tokens[2][1]
-                    relation = RELATION_INVERSION[tokens[1][1]]
-                    number = float(tokens[0][1])
+            if not ((tokens[0][0] == "identifier" and tokens[2][0] == "number") or (tokens[0][0] == "number" and tokens[2][0] == "identifier")):
+                error(f"Expected an identifier and number as bounds but found something else.  Bound name: {name}, token list: {tokens}")
 
 
-                # We are now of the format:
-                #
-                # identifier relation number, e.g.
-                # x5 > 6
-                # x2 <= 4
-                #
-                self._set_variable_bounds(problem, identifier, relation, number)
+            # Normalise this to have the identifier on the LHS
+            if tokens[0][0] == "identifier":
+                identifier = tokens[0][1]
+                relation = tokens[1][1]
+                number = float(tokens[2][1])
+            elif tokens[0][0] == "number":
+                identifier = tokens[2][1]
+                relation = self.RELATION_INVERSION[tokens[1][1]]
+                number = float(tokens[0][1])
 
 
-            # Case where bounds as given as number relation identifier relation number
+            # We are now of the format:
+            #
+            # identifier relation number, e.g.
+            # x5 > 6
+            # x2 <= 4
             #
-            #  0 <= x1 <= 40
-            #  2 <= x4 <= 3
-            if len(tokens) == 5:
-                if tokens[0][0] != tokens[4][0] or tokens[1][0] != tokens[3][0] or tokens[2][0] != "identifier" or tokens[0][0] != "number" or tokens[1][0] != "relation":
-                    error(f"Expected <number, relation, identifier, relation, number> but got something else.  Bound name: {name}, token list: {tokens}")
+            self._set_variable_bounds(problem, identifier, relation, number)
+
+
+        # Case where bounds as given as number relation identifier relation number
+        #
+        #  0 <= x1 <= 40
+        #  2 <= x4 <= 3
+        if len(tokens) == 5:
+            if tokens[0][0] != tokens[4][0] or tokens[1][0] != tokens[3][0] or tokens[2][0] != "identifier" or tokens[0][0] != "number" or tokens[1][0] != "relation":
+                error(f"Expected <number, relation, identifier, relation, number> but got something else.  Bound name: {name}, token list: {tokens}")
+
+            lower          = float(tokens[0][1])
+            lower_relation = tokens[1][1]
+            identifier     = tokens[2][1]
+            upper_relation = tokens[3][1]
+            upper          = float(tokens[4][1])
 
-                lower          = float(tokens[0][1])
-                lower_relation = tokens[1][1]
-                identifier     = tokens[2][1]
-                upper_relation = tokens[3][1]
-                upper          = float(tokens[4][1])
+            # For us to add these in the same format we need to normalise them to the same format
+            # as the single-bound case above, which means identifier-relation-number.
+            self._set_variable_bounds(problem, identifier, self.RELATION_INVERSION[lower_relation], lower)
+            self._set_variable_bounds(problem, identifier, upper_relation, upper)
+
+        if len(tokens) not in (3, 5):
+            error(f"Expected a bound with one or two relations but got something else.  Bound name: {name}, token list: {tokens}")
 
-                # For us to add these in the same format we need to normalise them to the same format
-                # as the single-bound case above, which means identifier-relation-number.
-                self._set_variable_bounds(problem, identifier, RELATION_INVERSION[lower_relation], lower)
-                self._set_variable_bounds(problem, identifier, upper_relation, upper)
 
 
 class IntVars(Section):
 
-    def build_ir(self, problem):
-        for name, tokens in self.tokens.items():
-            if len(tokens) > 1 and tokens[0][0] != "identifier":
-                error("Expected only a single token identifier to set to general use.  Rule name: {name}, token list: {tokens}")
+    def build_phrase(self, problem, name, tokens):
+        if len(tokens) > 1 and tokens[0][0] != "identifier":
+            error("Expected only a single token identifier to set to general use.  Rule name: {name}, token list: {tokens}")
+
+        var = problem.symbols.get(tokens[0][1], create=True)
+        var.set_integer(True)
 
-            var = problem.symbols.get(tokens[0][1], create=True)
-            var.set_binary(False)
 
 
 class BinVars(Section):
 
-    def build_ir(self, problem):
-        for name, tokens in self.tokens.items():
-            if len(tokens) > 1 and tokens[0][0] != "identifier":
-                error("Expected only a single token identifier to set to binary mode.  Rule name: {name}, token list: {tokens}")
+    def build_phrase(self, problem, name, tokens):
+        if len(tokens) > 1 and tokens[0][0] != "identifier":
+            error("Expected only a single token identifier to set to binary mode.  Rule name: {name}, token list: {tokens}")
+
+        var = problem.symbols.get(tokens[0][1], create=True)
+        var.set_binary(True)
 
-            var = problem.symbols.get(tokens[0][1], create=True)
-            var.set_binary(True)
 
 
 
@@ -382,25 +489,63 @@ class BinVars(Section):
 
 
 
-def parse_file(filename):
+# Lines per chunk handed to each process when parsing constraints in parallel
+PARALLEL_CHUNK_LINES = 10000
+
+FILE_FORMATS = ("lp", "mps", "fixed-mps")
+
+def parse_file(filename, processes=1, chunk_lines=PARALLEL_CHUNK_LINES):
     """Parse a LP file with a given filename, returning an
-    intermediate representation that is of use for further solving."""
+    intermediate representation that is of use for further solving.
+
+    The file is streamed a line at a time, and each phrase is built into
+    the problem as soon as it has been read, so neither the whole file nor
+    its full token list is ever held in memory.  See parse_lines for the
+    parallel options."""
 
     with open(filename) as fin:
-        return parse_string(fin.read())
+        return parse_lines(fin, processes, chunk_lines)
 
-def parse_string(string):
+def parse_string(string, processes=1, chunk_lines=PARALLEL_CHUNK_LINES):
     """Parse an LP-format string, returning an intermediate representation
     that is of use for further solver stages"""
 
+    return parse_lines(string.splitlines(), processes, chunk_lines)
+
+@stats.timed("parse")
+def read_problem(filename, file_format="lp", processes=1):
+    """Parse a file in one of FILE_FORMATS, returning an intermediate
+    representation that is of use for further solving."""
+
+    if file_format == "lp":
+        return parse_file(filename, processes)
+    elif file_format == "mps":
+        return parse_mps_file(filename)
+    elif file_format == "fixed-mps":
+        return parse_mps_file(filename, fixed=True)
+    error(f"Unknown file format '{file_format}', expected one of {', '.join(FILE_FORMATS)}")
+
+def parse_lines(lines, processes=1, chunk_lines=PARALLEL_CHUNK_LINES):
+    """Parse an iterable of LP-format lines, returning an intermediate
+    representation that is of use for further solver stages
+
+    If processes is more than one, constraint sections longer than
+    chunk_lines are tokenised across a pool of that many processes.  The
+    result is identical to a serial parse."""
+
     problem = ir.LPProblem()
-    string = _strip_comments(string)
-    sections = _split_sections(string)
+    pool    = ProcessPoolExecutor(processes) if processes > 1 else None
 
-    # Parse each section
-    for section in sections:
-        section.tokenise()
-        section.build_ir(problem)
+    try:
+        # Parse each section as it is reached
+        for section in _stream_sections(lines):
+            if pool is not None and isinstance(section, Constraints):
+                section.build_ir_parallel(problem, pool, processes, chunk_lines)
+            else:
+                section.build_ir(problem)
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     return problem
 
@@ -410,68 +555,427 @@ def error(msg):
 
 # Comments are a backslash to comment until end of line,
 # or a blank line entirely
-COMMENT_PATTERN = "(\\\\.*$|^$)"
+COMMENT_PATTERN = re.compile("(\\\\.*$|^$)", flags=re.MULTILINE)
 def _strip_comments(string):
 
-    string = re.sub(COMMENT_PATTERN, "", string, flags=re.MULTILINE)
+    string = COMMENT_PATTERN.sub("", string)
     return string
 
 
-SECTION_PATTERN_MAX_OBJECTIVE   = "max(imize|imum)?\s*"
-SECTION_PATTERN_MIN_OBJECTIVE   = "min(imize|imum)?\s*"
-SECTION_PATTERN_CONSTRAINTS = "(subject to|such that|st|s\\.t\\.)\s*"
-SECTION_PATTERN_BOUNDS      = "bounds?\s*"
-SECTION_PATTERN_INT_VARS    = "gen(eral|erals)?\s*"
-SECTION_PATTERN_BIN_VARS    = "bin(aries|ary)?\s*"
-END_PATTERN                 = "end\s*?"
-def _split_sections(string):
-
-    lines = string.splitlines()
-    sections = []
-
-    section = None
-    for i, line in enumerate(lines):
-
-        new_section = None
-        if re.match(SECTION_PATTERN_MAX_OBJECTIVE, line, flags=re.I):
-            new_section = Objective(maximise=True)
-        elif re.match(SECTION_PATTERN_MIN_OBJECTIVE, line, flags=re.I):
-            new_section = Objective(maximise=False)
-        elif re.match(SECTION_PATTERN_CONSTRAINTS, line, flags=re.I):
-            new_section = Constraints()
-        elif re.match(SECTION_PATTERN_BOUNDS, line, flags=re.I):
-            new_section = Bounds()
-        elif re.match(SECTION_PATTERN_INT_VARS, line, flags=re.I):
-            new_section = IntVars()
-        elif re.match(SECTION_PATTERN_BIN_VARS, line, flags=re.I):
-            new_section = BinVars()
-        elif re.match(END_PATTERN, line, flags=re.I):
-            pass    # Throw this one away
-        elif re.match("^\s*$", line, flags=re.I):
-            pass    # empty line
-        else:
-            if section is None:
-                error(f"Error --- non-section statement outside of section: Line {i}, '{line}'")
-            # Add line to section
-            section.append_raw(line)
+SECTION_PATTERN_MAX_OBJECTIVE   = re.compile("max(imize|imum)?\\s*", flags=re.I)
+SECTION_PATTERN_MIN_OBJECTIVE   = re.compile("min(imize|imum)?\\s*", flags=re.I)
+SECTION_PATTERN_CONSTRAINTS = re.compile("(subject to|such that|st|s\\.t\\.)\\s*", flags=re.I)
+SECTION_PATTERN_BOUNDS      = re.compile("bounds?\\s*", flags=re.I)
+SECTION_PATTERN_INT_VARS    = re.compile("gen(eral|erals)?\\s*", flags=re.I)
+SECTION_PATTERN_BIN_VARS    = re.compile("bin(aries|ary)?\\s*", flags=re.I)
+END_PATTERN                 = re.compile("end\\s*?", flags=re.I)
+BLANK_PATTERN               = re.compile("^\\s*$")
+def _new_section(line):
+    """Return a new section if the line is a section header, else None"""
+
+    if SECTION_PATTERN_MAX_OBJECTIVE.match(line):
+        return Objective(maximise=True)
+    elif SECTION_PATTERN_MIN_OBJECTIVE.match(line):
+        return Objective(maximise=False)
+    elif SECTION_PATTERN_CONSTRAINTS.match(line):
+        return Constraints()
+    elif SECTION_PATTERN_BOUNDS.match(line):
+        return Bounds()
+    elif SECTION_PATTERN_INT_VARS.match(line):
+        return IntVars()
+    elif SECTION_PATTERN_BIN_VARS.match(line):
+        return BinVars()
+    return None
+
+def _stream_sections(lines):
+    """Yield sections from an iterable of lines.
+
+    Each section reads its own lines lazily from the shared iterator while
+    it is built, stopping when it reaches the header of the next one."""
+
+    lines   = enumerate(lines, 1)
+    headers = []
+
+    def section_lines():
+        for i, line in lines:
+            line = _strip_comments(line.rstrip("\n"))
+
+            new_section = _new_section(line)
+            if new_section is not None:
+                headers.append(new_section)
+                return
+            elif END_PATTERN.match(line):
+                pass    # Throw this one away
+            elif BLANK_PATTERN.match(line):
+                pass    # empty line
+            else:
+                yield (line, i)
+
+    # Find the first section header
+    for i, line in lines:
+        line    = _strip_comments(line.rstrip("\n"))
+        section = _new_section(line)
+        if section is not None:
+            break
+        elif not END_PATTERN.match(line) and not BLANK_PATTERN.match(line):
+            error(f"Error --- non-section statement outside of section: Line {i}, '{line}'")
+    else:
+        error("No sections found in document.")
 
-        # Do this here to mininmise repetitition above
-        if new_section:
-            sections.append(section)
-            section = new_section
+    while section is not None:
+        body = section_lines()
+        section.stream_from(body)
+        yield section
+
+        # Skip anything the section left unread to find the next header
+        for _ in body:
+            pass
+        section = headers.pop() if headers else None
+
+
+def _continues(previous, line):
+    """True if the phrase on the previous line carries on into this one,
+    because the previous line ends or this line begins with an operator or
+    relation"""
+
+    tail = previous.rstrip()
+    if tail and tail[-1] in "+-<>=":
+        return True
+
+    head = TOKEN_PATTERN.match(line, len(line) - len(line.lstrip()))
+    return head is not None and head.lastgroup in ("operator", "relation")
+
+def _phrase_chunks(lines, size):
+    """Group (line, line_number) pairs into lists of at least size lines
+    (bar the last), each ending at a phrase boundary"""
+
+    chunk    = []
+    previous = None
+    for line, number in lines:
+        if len(chunk) >= size and not _continues(previous, line):
+            yield chunk
+            chunk = []
+        chunk.append((line, number))
+        previous = line
+
+    if chunk:
+        yield chunk
+
+def _parse_constraint_chunk(lines):
+    """Tokenise a chunk of a constraints section and convert its phrases
+    to terms, for use in a worker process.
+
+    Variables are returned by name, as the worker has no symbol table: each
+    name appears once, in order of first use, and terms refer to them by
+    position.  The arrays are compact to send back to the parent."""
+
+    section = Constraints()
+    for line, number in lines:
+        section.append_raw(line, number)
+
+    labels, relations = [], []
+    constants, row_ends = array("d"), array("q")
+    columns, values     = array("q"), array("d")
+    names, index        = [], {}
+
+    for label, tokens in section.labelled_phrases():
+        relation, constant, tokens = section._split_constraint(label, tokens)
+        for coefficient, name in section._token_expression_to_named_terms(label, tokens):
+            if name not in index:
+                index[name] = len(names)
+                names.append(name)
+            columns.append(index[name])
+            values.append(coefficient)
+
+        labels.append(label)
+        relations.append(relation)
+        constants.append(constant)
+        row_ends.append(len(columns))
+
+    return labels, relations, constants, row_ends, names, columns, values
+
+
+
+
+# Field positions for fixed-format MPS, as (start, end) column slices
+MPS_FIXED_FIELDS = [(1, 3), (4, 12), (14, 22), (24, 36), (39, 47), (49, 61)]
+MPS_SECTIONS     = ["NAME", "OBJSENSE", "ROWS", "COLUMNS", "RHS", "RANGES", "BOUNDS", "ENDATA"]
+
+class MPSReader:
+    """Reads free or fixed format MPS into the same IR as the LP parser.
+
+    MPS is column oriented, so coefficients are gathered as (row, column,
+    value) triplets as the COLUMNS section is read, and go into the
+    problem's matrix in one block once the RHS and RANGES that complete the
+    rows have been seen.  Columns inside a MARKER INTORG block, and those
+    given LI or UI bounds, are flagged with set_integer, and BV columns
+    with set_binary."""
+
+    def __init__(self, fixed=False):
+        self.fixed     = fixed
+        self.problem   = ir.LPProblem()
+        self.maximise  = False
+        self.objective = None       # Name of the objective (first N) row
+        self.objective_row = None   # Number of the objective row
+        self.rows      = {}         # Row name -> [sense, row number, rhs, range]
+        self.row_count = 0
+        self.entries   = (array("q"), array("q"), array("d"))   # Matrix triplets
+        self.free_rows = set()      # Additional N rows, which are ignored
+        self.integer   = False      # Inside a MARKER INTORG block
+        self.line      = 0
+
+    def read(self, lines):
+
+        section = None
+        for self.line, line in enumerate(lines, 1):
+            line = line.rstrip("\r\n")
+
+            # Comments and blank lines
+            if not line.strip() or line[0] == "*":
+                continue
+
+            # Section headers start in the first column
+            if not line[0].isspace():
+                words   = line.split()
+                section = words[0].upper()
+                if section not in MPS_SECTIONS:
+                    self._error(f"Unsupported MPS section '{words[0]}'")
+                if section == "OBJSENSE" and len(words) > 1:
+                    self._read_objsense(words[1:])
+                if section == "ENDATA":
+                    break
+                continue
+
+            fields = self._fields(line, section)
+            if section == "OBJSENSE":
+                self._read_objsense(fields)
+            elif section == "ROWS":
+                self._read_row(fields)
+            elif section == "COLUMNS":
+                self._read_column(fields)
+            elif section == "RHS":
+                self._read_rhs(fields)
+            elif section == "RANGES":
+                self._read_range(fields)
+            elif section == "BOUNDS":
+                self._read_bound(fields)
+            elif section != "NAME":
+                self._error(f"Data outside of any section: '{line}'")
+
+        return self._build()
+
+    def _error(self, msg):
+        error(f"MPS line {self.line}: {msg}")
+
+    def _fields(self, line, section):
+        if not self.fixed or section == "OBJSENSE":
+            return line.split()
+
+        # Only rows and bounds use the first field, and names may contain
+        # spaces, so fields are cut by position
+        fields = [line[start:end].strip() for start, end in MPS_FIXED_FIELDS]
+        if section not in ("ROWS", "BOUNDS"):
+            fields = fields[1:]
+        while fields and not fields[-1]:
+            fields.pop()
+        return fields
+
+    def _number(self, string):
+        try:
+            return float(string)
+        except ValueError:
+            self._error(f"Expected a number but found '{string}'")
+
+    def _read_objsense(self, fields):
+        sense = fields[0].upper()
+        if sense not in ("MAX", "MAXIMIZE", "MAXIMISE", "MIN", "MINIMIZE", "MINIMISE"):
+            self._error(f"Unknown objective sense '{fields[0]}'")
+        self.maximise = sense.startswith("MAX")
+
+    def _read_row(self, fields):
+        if len(fields) < 2:
+            self._error(f"Expected a row type and name but found {fields}")
+
+        sense, name = fields[0].upper(), fields[1]
+        if name == self.objective or name in self.rows or name in self.free_rows:
+            self._error(f"Row '{name}' is defined more than once")
+        if sense == "N":
+            if self.objective is None:
+                self.objective     = name
+                self.objective_row = self._new_row()
+            else:
+                self.free_rows.add(name)
+        elif sense in ("L", "G", "E"):
+            self.rows[name] = [sense, self._new_row(), 0.0, None]
+        else:
+            self._error(f"Unknown row type '{fields[0]}'")
 
-    # Catch the last section
-    sections.append(section)
+    def _read_column(self, fields):
 
-    if len(sections) == 0:
-        error("No sections found in document.")
+        # Integer markers delimit blocks of columns rather than adding terms
+        if "'MARKER'" in fields:
+            if "'INTORG'" in fields:
+                self.integer = True
+            elif "'INTEND'" in fields:
+                self.integer = False
+            else:
+                self._error(f"Unknown marker {fields}")
+            return
+
+        if len(fields) not in (3, 5):
+            self._error(f"Expected a column, and one or two row and value pairs, but found {fields}")
+
+        var = self.problem.symbols.get(fields[0], create=True)
+        if self.integer:
+            var.set_integer(True)
+
+        rows, columns, values = self.entries
+        for row, value in zip(fields[1::2], fields[2::2]):
+            coefficient = self._number(value)
+            if row == self.objective:
+                number = self.objective_row
+            elif row in self.rows:
+                number = self.rows[row][1]
+            elif row in self.free_rows:
+                continue
+            else:
+                self._error(f"Column {fields[0]} refers to unknown row '{row}'")
+
+            # Explicit zeroes just declare the column
+            if coefficient != 0:
+                rows.append(number)
+                columns.append(var.index)
+                values.append(coefficient)
+
+    def _new_row(self):
+        self.row_count += 1
+        return self.row_count - 1
+
+    def _row_value_pairs(self, fields):
+        # The RHS and RANGES set names are optional in free MPS
+        if len(fields) % 2 == 1:
+            fields = fields[1:]
+        if len(fields) not in (2, 4):
+            self._error(f"Expected one or two row and value pairs but found {fields}")
+        return [(row, self._number(value)) for row, value in zip(fields[0::2], fields[1::2])]
+
+    def _read_rhs(self, fields):
+        for row, value in self._row_value_pairs(fields):
+            if row in self.rows:
+                self.rows[row][2] = value
+            elif row == self.objective:
+                # Read as most solvers do, as minus a constant added to the objective
+                self.problem.objective_offset = -value
+            elif row not in self.free_rows:
+                self._error(f"RHS given for unknown row '{row}'")
+
+    def _read_range(self, fields):
+        for row, value in self._row_value_pairs(fields):
+            if row not in self.rows:
+                self._error(f"Range given for unknown or free row '{row}'")
+            self.rows[row][3] = value
+
+    def _read_bound(self, fields):
+        if len(fields) < 2:
+            self._error(f"Expected a bound type and column but found {fields}")
+
+        kind = fields[0].upper()
+        if kind in ("FR", "MI", "PL") or (kind == "BV" and len(fields) in (2, 3) and not self._is_number(fields[-1])):
+            value  = None
+            column = fields[-1]
+        else:
+            if len(fields) not in (3, 4):
+                self._error(f"Expected a bound type, column and value but found {fields}")
+            value  = self._number(fields[-1])
+            column = fields[-2]
+
+        var = self.problem.symbols.get(column, create=True)
+        if kind == "UP":
+            # By convention a negative upper bound on an otherwise unbounded
+            # below variable makes it unbounded below
+            if value < 0 and var.lower_bound == 0:
+                var.set_lower_bound(float("-infinity"))
+            var.set_upper_bound(value)
+        elif kind == "LO":
+            var.set_lower_bound(value)
+        elif kind == "FX":
+            var.set_lower_bound(value)
+            var.set_upper_bound(value)
+        elif kind == "FR":
+            var.set_lower_bound(float("-infinity"))
+            var.set_upper_bound(float("+infinity"))
+        elif kind == "MI":
+            var.set_lower_bound(float("-infinity"))
+        elif kind == "PL":
+            var.set_upper_bound(float("+infinity"))
+        elif kind == "BV":
+            var.set_lower_bound(0.0)
+            var.set_upper_bound(1.0)
+            var.set_binary(True)
+        elif kind in ("LI", "UI"):
+            var.set_integer(True)
+            if kind == "LI":
+                var.set_lower_bound(value)
+            else:
+                var.set_upper_bound(value)
+        else:
+            self._error(f"Unsupported bound type '{fields[0]}'")
 
-    return sections[1:]
+    def _is_number(self, string):
+        try:
+            float(string)
+            return True
+        except ValueError:
+            return False
 
+    def _build(self):
+        """Turn the rows read into the objective and constraints of the problem"""
 
+        problem = self.problem
+        first   = problem.matrix.add_entries(self.row_count, *self.entries)
+        if self.objective is not None:
+            objective = problem.get_expression(self.objective, None, first + self.objective_row)
+            problem.set_objective(objective, self.maximise)
+        else:
+            problem.maximise = self.maximise
+
+        for name, (sense, row, rhs, rng) in self.rows.items():
+            kind       = "eq" if sense == "E" and rng is None else "ineq"
+            expression = problem.get_expression(f"constraint_{kind}_{name}", None, first + row)
+
+            # A ranged row is a pair of inequalities bounding it from either
+            # side, the second over a copy of the row
+            if rng is not None:
+                if sense == "L" or (sense == "E" and rng < 0):
+                    lower, upper = rhs - abs(rng), rhs
+                else:
+                    lower, upper = rhs, rhs + abs(rng)
+
+                copy = problem.get_expression(f"constraint_ineq_{name}_range", None, problem.matrix.copy_row(first + row))
+                if sense == "L":
+                    problem.add_constraint(name, problem.get_inequality(f"constraint_ineq_{name}", expression, False, False, upper))
+                    problem.add_constraint(f"{name}_range", problem.get_inequality(f"constraint_ineq_{name}_range", copy, True, False, lower))
+                else:
+                    problem.add_constraint(name, problem.get_inequality(f"constraint_ineq_{name}", expression, True, False, lower))
+                    problem.add_constraint(f"{name}_range", problem.get_inequality(f"constraint_ineq_{name}_range", copy, False, False, upper))
+
+            elif sense == "E":
+                problem.add_constraint(name, problem.get_equation(f"constraint_eq_{name}", expression, rhs))
+            else:
+                problem.add_constraint(name, problem.get_inequality(f"constraint_ineq_{name}", expression, sense == "G", False, rhs))
 
+        return problem
 
 
+def parse_mps_file(filename, fixed=False):
+    """Parse a free (or, with fixed=True, fixed) format MPS file, returning
+    the same intermediate representation as parse_file."""
 
+    with open(filename) as fin:
+        return MPSReader(fixed).read(fin)
 
+def parse_mps_string(string, fixed=False):
+    """Parse an MPS-format string, returning the same intermediate
+    representation as parse_string."""
 
+    return MPSReader(fixed).read(string.splitlines())
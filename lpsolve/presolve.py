@@ -1,19 +1,29 @@
 
 
-from . import ir
+import time
+import numpy as np
+from . import ir, stats
+from .dense import relaxed_bounds
+from .log import logger
 
+@stats.timed("standard_form")
 def to_standard_form(problem):
     """Convert a problem to standard form, suitable for solving using the simplex method
 
     Standard form involves:
      - Maximise-only optimisation target
      - All linear constraints are of the form 'expression <= constant`
-     - All variables are non-negative
+
+    Variables keep their bounds, which the solver handles directly.  The
+    solver maximises the objective variable, which is minus the objective
+    as given if that is minimised, as recorded in problem.objective_sign.
     """
 
+    problem.objective_sign = 1.0 if problem.maximise else -1.0
+
     # Invert objective if suitable
     if problem.maximise:
-        print("Converting minimise objective into maximise")
+        logger.info("Converting minimise objective into maximise")
         invert_objective(problem)
 
     # Convert objective to equality.  Similar to adding slack variables.
@@ -25,11 +35,6 @@ def to_standard_form(problem):
     # Convert constraints to equations by inserting slack variables
     insert_slack_variables(problem)
 
-    # Add constraints to ensure all variables are GTE 0
-    ensure_variables_gte_zero(problem)
-
-    # TODO: lots more preoptimisation!
-
     return problem
 
 
@@ -47,8 +52,11 @@ def invert_objective(problem):
 
 def convert_objective_to_equality(problem):
 
-    new_objective_terms = problem.objective.terms + [(1.0, problem.symbols.new_variable(ir.OBJECTIVE_VARIABLE_NAME, True))]
-    problem.objective = ir.Equation(problem, f"__obj__", new_objective_terms, 0.0)
+    # The objective variable takes whatever value the objective does
+    objective_variable = problem.symbols.new_variable(ir.OBJECTIVE_VARIABLE_NAME, True)
+    objective_variable.set_lower_bound(float("-infinity"))
+    problem.objective.add_term(1.0, objective_variable)
+    problem.objective = ir.Equation(problem, f"__obj__", problem.objective, 0.0)
 
 
 def ensure_upper_bounded_constraints(problem):
@@ -67,8 +75,8 @@ def insert_slack_variables(problem):
     new_constraints = {}
     for name, constraint in problem.constraints.items():
         if isinstance(constraint, ir.Inequality):
-            new_terms = constraint.expression.terms + [(1.0, problem.symbols.new_variable(f"_s_{name}", True))]
-            new_constraints[name] = ir.Equation(problem, f"_c_{name}", new_terms, constraint.constant)
+            constraint.expression.add_term(1.0, problem.symbols.new_variable(f"_s_{name}", True))
+            new_constraints[name] = ir.Equation(problem, f"_c_{name}", constraint.expression, constraint.constant)
         else:
             new_constraints[name] = constraint
 
@@ -76,11 +84,390 @@ def insert_slack_variables(problem):
 
 
 
-def ensure_variables_gte_zero(problem):
-    """Inserts constraints to ensure all variables >= 0"""
-
-    # FIXME: I'm not sure this is correct mathematically.
-    # TODO: Ensure these bounds are enforced
-    for name, var in problem.symbols.table.items():
-        var.set_lower_bound(0, strict=False)
-
+class Presolver:
+    """Removes redundant structure from a problem before it is solved, and
+    maps solutions of the reduced problem back to the original.
+
+    Works on the problem as read, before to_standard_form.  Each constraint
+    is treated as a pair of row bounds (row_lower <= a.x <= row_upper) and
+    the following reductions are repeated until none applies:
+
+     - empty rows are dropped, or the problem found infeasible
+     - fixed variables (lower == upper) are substituted into their rows
+     - empty columns are fixed at whichever bound is best for the objective
+     - singleton rows become bounds on their variable
+     - rows that can never be violated given variable bounds are dropped
+     - forcing rows, satisfiable only with every variable at one bound,
+       fix those variables
+     - duplicate rows (equal up to a multiple) are merged
+
+    Every variable fixed is pushed onto a postsolve stack, which postsolve
+    unwinds to give values for all of the original variables.  Strict
+    inequalities are treated as non-strict, as they are by the solver."""
+
+    def __init__(self, problem, tolerance=1e-9, max_passes=100):
+
+        self.problem    = problem
+        self.tolerance  = tolerance
+        self.max_passes = max_passes
+
+        self.stack     = []         # ("fix", column, value) and ("row", key), in order applied
+        self.status    = None       # "infeasible" if found to be so
+        self.passes    = 0
+        self.elapsed   = 0.0
+        self.rows_removed      = 0
+        self.columns_removed   = 0
+        self.nonzeros_removed  = 0
+
+    def reduce(self):
+        """Return a new, reduced problem.  The original is not changed."""
+
+        start = time.perf_counter()
+        self._load()
+
+        changed = True
+        while changed and self.status is None and self.passes < self.max_passes:
+            self.passes += 1
+            changed = False
+            for reduction in (self._remove_empty_rows, self._substitute_fixed_columns,
+                              self._fix_empty_columns, self._singleton_rows,
+                              self._forcing_and_redundant_rows, self._duplicate_rows):
+                if self.status is None and reduction():
+                    changed = True
+
+        reduced = self._build()
+        self.elapsed = time.perf_counter() - start
+        return reduced
+
+    def postsolve(self, solution):
+        """Map a solution of the reduced problem to one of the original
+        problem, with the objective evaluated in the original's sense"""
+
+        values = np.zeros(len(self.problem.symbols))
+        for var, value in solution.variables.items():
+            column = self.problem.symbols.index.get(var.name)
+            if column is not None and self.column_active[column]:
+                values[column] = value
+
+        # Unwind the stack, although fixes are independent of each other
+        for entry in reversed(self.stack):
+            if entry[0] == "fix":
+                values[entry[1]] = entry[2]
+
+        objective = float(self.original_cost @ values) + self.problem.objective_offset
+        variable_values = {var: float(values[var.index]) for var in self.problem.symbols}
+
+        # Rates carry over for the rows and columns that were kept, solve()
+        # having given them in the objective's sense already
+        return ir.Solution(self.problem, variable_values, solution.optimal, objective, solution.status, solution.basis,
+                           solution.reduced_costs, solution.duals)
+
+    def summarise(self):
+        print(f"Presolve removed {self.rows_removed} rows, {self.columns_removed} columns and "
+              f"{self.nonzeros_removed} non-zeroes in {self.passes} passes ({self.elapsed:.3f}s)")
+        if self.status is not None:
+            print(f"*** Presolve found the problem {self.status}")
+
+    def _load(self):
+        """Read the problem into arrays of row bounds, column bounds, costs
+        and matrix entries"""
+
+        problem = self.problem
+        symbols = problem.symbols
+        self.keys = list(problem.constraints.keys())
+        constraints = list(problem.constraints.values())
+
+        # Explicit zeroes are left out
+        indptr, columns, values = problem.matrix.select_rows([c.expression.row for c in constraints])
+        rows    = np.repeat(np.arange(len(constraints), dtype=np.int64), np.diff(indptr))
+        nonzero = values != 0
+        self.entry_rows    = rows[nonzero]
+        self.entry_columns = columns[nonzero]
+        self.entry_values  = values[nonzero]
+
+        constants = np.array([c.constant for c in constraints], dtype=np.float64)
+        equation  = np.array([isinstance(c, ir.Equation) for c in constraints], dtype=bool)
+        greater   = np.array([not isinstance(c, ir.Equation) and c.greater_than for c in constraints], dtype=bool)
+        self.row_lower = np.where(equation | greater, constants, -np.inf)
+        self.row_upper = np.where(equation | ~greater, constants, np.inf)
+
+        # Binary variables are flagged without their bounds being set, so
+        # relax them to [0, 1] before any are fixed or tightened
+        self.lower, self.upper = relaxed_bounds(symbols)
+        self.binary  = (symbols.flags & ir.FLAG_BINARY) != 0
+        self.integer = (symbols.flags & ir.INTEGER_FLAGS) != 0
+
+        # Round integer columns' own bounds in, so that none is fixed at a fractional value
+        integer = np.flatnonzero(self.integer)
+        self._tighten(integer, self.lower[integer], self.upper[integer])
+
+        # Costs are kept as minimised
+        self.original_cost = np.zeros(len(symbols))
+        if problem.objective is not None:
+            objective_columns, objective_values = problem.matrix.row(problem.objective_expression().row)
+            np.add.at(self.original_cost, objective_columns, objective_values)
+        self.cost = -self.original_cost if problem.maximise else self.original_cost.copy()
+
+        self.row_active    = np.ones(len(constraints), dtype=bool)
+        self.column_active = np.ones(len(symbols), dtype=bool)
+
+    def _entries(self):
+        """Return a mask of the matrix entries in active rows and columns,
+        and the number of such entries in each row and column"""
+
+        active = self.row_active[self.entry_rows] & self.column_active[self.entry_columns]
+        row_counts    = np.bincount(self.entry_rows[active], minlength=len(self.row_active))
+        column_counts = np.bincount(self.entry_columns[active], minlength=len(self.column_active))
+        return active, row_counts, column_counts
+
+    def _tolerance(self, x):
+        return self.tolerance * (1 + np.abs(np.where(np.isfinite(x), x, 0)))
+
+    def _remove_rows(self, rows):
+        active, _, _ = self._entries()
+        self.nonzeros_removed += int(np.count_nonzero(active & np.isin(self.entry_rows, rows)))
+        self.row_active[rows] = False
+        self.rows_removed += len(rows)
+        for row in rows.tolist():
+            self.stack.append(("row", self.keys[row]))
+
+    def _fix_columns(self, columns, values):
+        """Fix columns at values, moving their terms into the row bounds"""
+
+        self.lower[columns] = values
+        self.upper[columns] = values
+        fixed = np.zeros(len(self.column_active), dtype=bool)
+        fixed[columns] = True
+
+        active, _, _ = self._entries()
+        moved = active & fixed[self.entry_columns]
+        shift = np.bincount(self.entry_rows[moved], weights=self.entry_values[moved] * self.lower[self.entry_columns[moved]],
+                            minlength=len(self.row_active))
+        self.row_lower -= shift
+        self.row_upper -= shift
+
+        self.nonzeros_removed += int(np.count_nonzero(moved))
+        self.column_active[columns] = False
+        self.columns_removed += len(columns)
+        for column, value in zip(columns.tolist(), self.lower[columns].tolist()):
+            self.stack.append(("fix", column, value))
+
+    def _remove_empty_rows(self):
+        _, row_counts, _ = self._entries()
+        empty = np.flatnonzero(self.row_active & (row_counts == 0))
+        if not len(empty):
+            return False
+
+        if np.any((self.row_lower[empty] > self._tolerance(self.row_lower[empty])) |
+                  (self.row_upper[empty] < -self._tolerance(self.row_upper[empty]))):
+            self.status = "infeasible"
+            return False
+
+        self._remove_rows(empty)
+        return True
+
+    def _substitute_fixed_columns(self):
+        fixed = np.flatnonzero(self.column_active & (self.lower == self.upper))
+        if not len(fixed):
+            return False
+
+        self._fix_columns(fixed, self.lower[fixed])
+        return True
+
+    def _fix_empty_columns(self):
+        _, _, column_counts = self._entries()
+        empty = self.column_active & (column_counts == 0)
+
+        # A column that would improve the objective without limit makes the
+        # problem unbounded if the rest is feasible, which is left to the solver
+        unbounded = ((self.cost > 0) & np.isneginf(self.lower)) | ((self.cost < 0) & np.isposinf(self.upper))
+        empty = np.flatnonzero(empty & ~unbounded)
+        if not len(empty):
+            return False
+
+        cost, lower, upper = self.cost[empty], self.lower[empty], self.upper[empty]
+
+        # With no cost, any finite bound (or zero, if free) will do
+        values = np.where(cost > 0, lower, np.where(cost < 0, upper,
+                          np.where(np.isfinite(lower), lower, np.where(np.isfinite(upper), upper, 0.0))))
+        self._fix_columns(empty, values)
+        return True
+
+    def _singleton_rows(self):
+        active, row_counts, _ = self._entries()
+        singleton = self.row_active & (row_counts == 1)
+        if not np.any(singleton):
+            return False
+
+        entries = np.flatnonzero(active & singleton[self.entry_rows])
+        rows    = self.entry_rows[entries]
+        columns = self.entry_columns[entries]
+        values  = self.entry_values[entries]
+
+        # a.x in [l, u] gives x in [l/a, u/a], reversed if a < 0
+        with np.errstate(invalid="ignore"):
+            low  = np.where(values > 0, self.row_lower[rows], self.row_upper[rows]) / values
+            high = np.where(values > 0, self.row_upper[rows], self.row_lower[rows]) / values
+        self._tighten(columns, low, high)
+
+        self._remove_rows(rows)
+        return True
+
+    def _tighten(self, columns, low, high):
+        """Tighten column bounds, rounding those of integer columns"""
+
+        integer = self.integer[columns]
+        low  = np.where(integer, np.ceil(low - self._tolerance(low)), low)
+        high = np.where(integer, np.floor(high + self._tolerance(high)), high)
+        np.maximum.at(self.lower, columns, low)
+        np.minimum.at(self.upper, columns, high)
+
+        crossed = self.lower[columns] - self.upper[columns]
+        if np.any(crossed > self._tolerance(self.upper[columns])):
+            self.status = "infeasible"
+        else:
+            # Snap bounds that cross by rounding error to one value
+            close = columns[crossed > 0]
+            self.upper[close] = self.lower[close]
+
+    def _activity_bounds(self):
+        """Return the least and greatest value each row's expression can
+        take given the column bounds"""
+
+        active, _, _ = self._entries()
+        rows    = self.entry_rows[active]
+        columns = self.entry_columns[active]
+        values  = self.entry_values[active]
+
+        least    = np.where(values > 0, values * self.lower[columns], values * self.upper[columns])
+        greatest = np.where(values > 0, values * self.upper[columns], values * self.lower[columns])
+        count    = len(self.row_active)
+        return (np.bincount(rows, weights=least, minlength=count),
+                np.bincount(rows, weights=greatest, minlength=count))
+
+    def _forcing_and_redundant_rows(self):
+        least, greatest = self._activity_bounds()
+        lower, upper    = self.row_lower, self.row_upper
+
+        with np.errstate(invalid="ignore"):
+            infeasible = self.row_active & ((least > upper + self._tolerance(upper)) |
+                                            (greatest < lower - self._tolerance(lower)))
+            if np.any(infeasible):
+                self.status = "infeasible"
+                return False
+
+            redundant     = self.row_active & (least >= lower - self._tolerance(lower)) & (greatest <= upper + self._tolerance(upper))
+            force_lowest  = self.row_active & ~redundant & np.isfinite(upper) & (least >= upper - self._tolerance(upper))
+            force_highest = self.row_active & ~redundant & ~force_lowest & np.isfinite(lower) & (greatest <= lower + self._tolerance(lower))
+
+        if not np.any(redundant | force_lowest | force_highest):
+            return False
+
+        # Fix every column in a forcing row at the bound that pushes it towards
+        # its one feasible value
+        active, _, _ = self._entries()
+        for forcing, towards_upper in ((force_lowest, False), (force_highest, True)):
+            entries = np.flatnonzero(active & forcing[self.entry_rows])
+            columns = self.entry_columns[entries]
+            positive = self.entry_values[entries] > 0
+            at_upper = positive if towards_upper else ~positive
+            values = np.where(at_upper, self.upper[columns], self.lower[columns])
+            self.lower[columns] = values
+            self.upper[columns] = values
+
+        self._remove_rows(np.flatnonzero(redundant | force_lowest | force_highest))
+        return True
+
+    def _duplicate_rows(self):
+        """Merge rows that are multiples of one another, intersecting their bounds"""
+
+        active, row_counts, _ = self._entries()
+        order   = np.flatnonzero(active)
+        rows    = self.entry_rows[order].tolist()
+        columns = self.entry_columns[order].tolist()
+        values  = self.entry_values[order].tolist()
+
+        # Group each row's terms, then key rows by their columns and their
+        # coefficients scaled so that the first is 1
+        terms = {}
+        for row, column, value in zip(rows, columns, values):
+            terms.setdefault(row, []).append((column, value))
+
+        seen, duplicates = {}, []
+        for row, row_terms in terms.items():
+            if len(row_terms) < 2:
+                continue
+            row_terms.sort()
+            scale = row_terms[0][1]
+            key   = tuple((column, round(value / scale, 12)) for column, value in row_terms)
+            if key not in seen:
+                seen[key] = (row, scale)
+                continue
+
+            # Intersect this row's bounds, in the kept row's scale, with the kept row's
+            kept, kept_scale = seen[key]
+            factor = kept_scale / scale
+            low, high = self.row_lower[row] * factor, self.row_upper[row] * factor
+            if factor < 0:
+                low, high = high, low
+            self.row_lower[kept] = max(self.row_lower[kept], low)
+            self.row_upper[kept] = min(self.row_upper[kept], high)
+            duplicates.append(row)
+
+        if not duplicates:
+            return False
+
+        self._remove_rows(np.array(duplicates, dtype=np.int64))
+        return True
+
+    def _build(self):
+        """Make the reduced problem from the active rows and columns"""
+
+        problem = self.problem
+        reduced = ir.LPProblem()
+        columns = np.flatnonzero(self.column_active)
+
+        # Renumber the active columns from zero
+        renumber = np.full(len(self.column_active), -1, dtype=np.int64)
+        renumber[columns] = np.arange(len(columns))
+        names = [problem.symbols.names[column] for column in columns.tolist()]
+        reduced.add_variables(names, self.lower[columns], self.upper[columns], self.binary[columns],
+                              self.integer[columns] & ~self.binary[columns])
+
+        objective_name = problem.objective.name if problem.objective is not None else "obj"
+        reduced.set_objective_coefficients(self.original_cost[columns], problem.maximise, objective_name)
+        reduced.objective_offset = problem.objective_offset
+
+        active, _, _ = self._entries()
+        rows = np.flatnonzero(self.row_active)
+
+        # Ranged rows, as left by merging duplicates, are written as a pair
+        blocks, relations, constants, keys = [], [], [], []
+        for row in rows.tolist():
+            lower, upper, key = self.row_lower[row], self.row_upper[row], self.keys[row]
+            if lower == upper:
+                blocks.append(row); relations.append("="); constants.append(lower); keys.append(key)
+                continue
+            if np.isfinite(upper):
+                blocks.append(row); relations.append("<="); constants.append(upper); keys.append(key)
+            if np.isfinite(lower):
+                blocks.append(row); relations.append(">="); constants.append(lower)
+                keys.append(key if not np.isfinite(upper) else self._unused_key(f"{key}_range", keys))
+
+        # Gather each output row's active entries, which are in row order
+        entries = np.flatnonzero(active)
+        blocks  = np.array(blocks, dtype=np.int64)
+        starts  = np.searchsorted(self.entry_rows[entries], blocks, "left")
+        counts  = np.searchsorted(self.entry_rows[entries], blocks, "right") - starts
+        indptr  = np.zeros(len(blocks) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        entries = entries[np.repeat(starts - indptr[:-1], counts) + np.arange(indptr[-1], dtype=np.int64)]
+
+        matrix = ir.SparseMatrix.from_csr(indptr, renumber[self.entry_columns[entries]], self.entry_values[entries])
+        reduced.add_constraints(matrix, relations, constants, keys)
+        return reduced
+
+    def _unused_key(self, key, keys):
+        while key in self.problem.constraints or key in keys:
+            key = f"{key}_"
+        return key
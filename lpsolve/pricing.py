@@ -0,0 +1,256 @@
+import numpy as np
+from . import stats
+
+# Partial pricing splits the columns into this many segments, each of at
+# least PARTIAL_MIN_SEGMENT columns
+PARTIAL_SEGMENTS    = 8
+PARTIAL_MIN_SEGMENT = 64
+
+# Devex starts a new reference framework once a weight grows past this,
+# and steepest edge recomputes its weights from scratch past STEEPEST_RESET
+DEVEX_RESET    = 1e6
+STEEPEST_RESET = 1e12
+
+
+class Pricing:
+    """Chooses the entering column for an engine's primal simplex pivots.
+
+    A strategy works through the engine's _reduced_costs and _eligible,
+    which price all columns or a slice of them, and those that keep
+    weights update them through _tableau_row, _column_products and
+    _column_norms, which give rows, dot products and norms of the columns
+    of the tableau.  update is called before each change of basis, while
+    the engine still holds the old one.
+
+    optimal() calls choose to look for a column, and pivot() takes the
+    column it found rather than pricing again."""
+
+    name  = None
+    bland = False   # Ties in the ratio test go to the lowest numbered row
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def choose(self):
+        """Return the entering column, or None if none improves the objective"""
+
+        raise NotImplementedError
+
+    def update(self, column, row, alpha):
+        """Note that column is about to enter in place of the row's basic
+        column, alpha being the entering column of the tableau"""
+
+
+class Dantzig(Pricing):
+    """The largest reduced cost in magnitude, the first of any ties, which
+    can cycle"""
+
+    name = "lowest"
+
+    @stats.timed("pricing")
+    def choose(self):
+        eligible = self.engine._eligible()
+        if not eligible.any():
+            return None
+        return int(np.argmax(np.where(eligible, np.abs(self.engine._reduced_costs()), -1.0)))
+
+
+class Bland(Pricing):
+    """Bland's rule: the lowest numbered column that improves the objective,
+    which cannot cycle but takes many iterations"""
+
+    name  = "bland"
+    bland = True
+
+    @stats.timed("pricing")
+    def choose(self):
+        eligible = self.engine._eligible()
+        if not eligible.any():
+            return None
+        return int(np.argmax(eligible))
+
+
+class _Weighted(Pricing):
+    """The largest squared reduced cost relative to a weight per column"""
+
+    @stats.timed("pricing")
+    def choose(self):
+        eligible = self.engine._eligible()
+        if not eligible.any():
+            return None
+        costs = self.engine._reduced_costs()
+        return int(np.argmax(np.where(eligible, costs * costs / self.weights, -1.0)))
+
+
+class Devex(_Weighted):
+    """Devex pricing: approximate steepest edge weights, measured against a
+    reference framework of the columns non-basic when it was set up, which
+    are updated from the pivot row alone"""
+
+    name = "devex"
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.weights = np.ones(len(engine.status_array))
+
+    @stats.timed("pricing")
+    def update(self, column, row, alpha):
+        pivot_row = self.engine._tableau_row(row)
+        ratios    = pivot_row / pivot_row[column]
+        weight    = self.weights[column]
+
+        self.weights = np.maximum(self.weights, ratios * ratios * weight)
+        self.weights[self.engine.basis[row]] = max(weight / (pivot_row[column] ** 2), 1.0)
+        if self.weights.max() > DEVEX_RESET:
+            self.weights[:] = 1.0
+
+
+class SteepestEdge(_Weighted):
+    """Steepest edge pricing: reduced costs relative to the length of each
+    column's edge, 1 + |B^-1 a_j|^2, computed in full at the start and then
+    kept exact by the Goldfarb-Reid update.  A small pivot can leave the
+    updated weights inaccurate, so they are computed in full again if one
+    grows past STEEPEST_RESET"""
+
+    name = "steepest"
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.weights = None
+
+    @stats.timed("pricing")
+    def choose(self):
+        if self.weights is None:
+            self.weights = 1.0 + self.engine._column_norms()
+        return super().choose()
+
+    @stats.timed("pricing")
+    def update(self, column, row, alpha):
+        if self.weights is None:
+            return
+        pivot_row = self.engine._tableau_row(row)
+        ratios    = pivot_row / pivot_row[column]
+        products  = self.engine._column_products(alpha)
+        weight    = self.weights[column]
+
+        with np.errstate(over="ignore", invalid="ignore"):
+            self.weights = np.maximum(self.weights - 2.0 * ratios * products + ratios * ratios * weight,
+                                      1.0 + ratios * ratios)
+            self.weights[self.engine.basis[row]] = max(weight / (pivot_row[column] ** 2), 1.0)
+        if not np.all(self.weights <= STEEPEST_RESET):
+            self.weights = None
+
+
+class Partial(Pricing):
+    """Partial pricing: the columns are split into segments and only as
+    many are priced as it takes to find an improving column, starting from
+    the segment the last one came from, which is then chosen as Dantzig's
+    rule would within its segment"""
+
+    name = "partial"
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        columns   = len(engine.status_array)
+        self.size = max(PARTIAL_MIN_SEGMENT, -(-columns // PARTIAL_SEGMENTS))
+        self.segments = -(-columns // self.size)
+        self.current  = 0
+
+    @stats.timed("pricing")
+    def choose(self):
+        for offset in range(self.segments):
+            segment  = (self.current + offset) % self.segments
+            columns  = slice(segment * self.size, (segment + 1) * self.size)
+            eligible = self.engine._eligible(columns)
+            if eligible.any():
+                self.current = segment
+                costs = self.engine._reduced_costs(columns)
+                return segment * self.size + int(np.argmax(np.where(eligible, np.abs(costs), -1.0)))
+        return None
+
+
+class DualPricing:
+    """Chooses the leaving row for the dual simplex method's pivots: the
+    basic variable furthest outside its bounds, relative to a weight per
+    row where a subclass keeps them.  update is called before each change
+    of basis, like Pricing.update, and may use the engine's _btran and
+    _ftran."""
+
+    bland = False
+
+    def __init__(self, engine):
+        self.engine  = engine
+        self.weights = np.ones(len(engine.basis))
+
+    @stats.timed("pricing")
+    def choose(self, infeasibility):
+        """Return the leaving row, given how far each row's basic variable
+        is outside its bounds (zero for those within them)"""
+
+        if self.bland:
+            rows = np.flatnonzero(infeasibility > 0)
+            return int(rows[np.argmin(self.engine.basis[rows])])
+        return int(np.argmax(infeasibility * infeasibility / self.weights))
+
+    def update(self, column, row, alpha):
+        pass
+
+
+class DualBland(DualPricing):
+    """The row whose basic variable is the lowest numbered column"""
+
+    bland = True
+
+
+class DualDevex(DualPricing):
+    """Dual Devex pricing: approximate dual steepest edge weights, against
+    a reference framework of the rows' basic variables when it was set up"""
+
+    @stats.timed("pricing")
+    def update(self, column, row, alpha):
+        ratios = alpha / alpha[row]
+        weight = self.weights[row]
+        self.weights = np.maximum(self.weights, ratios * ratios * weight)
+        self.weights[row] = max(weight / (alpha[row] ** 2), 1.0)
+        if self.weights.max() > DEVEX_RESET:
+            self.weights[:] = 1.0
+
+
+class DualSteepestEdge(DualPricing):
+    """Dual steepest edge pricing: infeasibilities relative to the length
+    of each row of B^-1, computed in full at the start and then kept exact
+    by the Forrest-Goldfarb update"""
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.weights = engine._row_norms()
+
+    @stats.timed("pricing")
+    def update(self, column, row, alpha):
+        unit = np.zeros(len(alpha))
+        unit[row] = 1.0
+        rho    = self.engine._btran(unit)
+        tau    = self.engine._ftran(rho)
+        ratios = alpha / alpha[row]
+        weight = self.weights[row]
+
+        self.weights = np.maximum(self.weights - 2.0 * ratios * tau + ratios * ratios * weight, 1e-12)
+        self.weights[row] = max(weight / (alpha[row] ** 2), 1e-12)
+
+
+# Strategies selectable by the heuristic argument of solve(); the dual
+# engine pairs each with a choice of leaving row
+PRICING      = {strategy.name: strategy for strategy in (Dantzig, Bland, Devex, SteepestEdge, Partial)}
+DUAL_PRICING = {"lowest":   DualPricing,
+                "bland":    DualBland,
+                "devex":    DualDevex,
+                "steepest": DualSteepestEdge,
+                "partial":  DualPricing}
+
+
+def get_pricing(method, engine):
+    """Return a new instance of the named strategy for the engine"""
+
+    if method not in PRICING:
+        raise ValueError(f"Unknown pivot heuristic '{method}', expected one of {', '.join(PRICING)}")
+    return PRICING[method](engine)
@@ -0,0 +1,601 @@
+import numpy as np
+from . import ir, stats
+from .crash import crash_basis
+from .log import logger
+from .pricing import get_pricing
+from .dense import BASIC, AT_LOWER, AT_UPPER, FREE, STATUS_NAMES, relaxed_bounds
+
+try:
+    import scipy.sparse
+    import scipy.sparse.linalg
+except ImportError:
+    scipy = None
+
+# Pivots between refactorisations of the basis
+REFACTOR_INTERVAL = 64
+
+# Columns solved for at once when computing steepest edge weights
+NORM_BLOCK_COLUMNS = 256
+
+
+class RevisedSimplex:
+    """The revised simplex method, following the same rules as solve.Tableau
+    but keeping only the constraint matrix and a factorised basis.
+
+    The matrix is held by column, with the objective row apart as `costs`,
+    which the method minimises (so maximising the objective variable).  The
+    basis matrix B is factorised by a sparse LU and later basis changes are
+    kept as product form eta factors, until REFACTOR_INTERVAL of them have
+    built up and B is factorised afresh.  Each pivot then solves
+    B^T y = c_B for the dual prices, prices every column from them and
+    solves B a = A_q for the entering column alone, so memory grows with
+    the non-zeroes of the matrix and the fill of the factors, rather than
+    with rows times columns.
+
+    `basis` holds the basic column of each row and `status_array` the
+    status of each column, as for dense.DenseTableau.  The initial basis
+    is chosen by crash.crash_basis (or, if crash is False, from slack
+    variables alone), and any row left over gets an artificial column.  An
+    ir.Basis from an earlier solve (see get_basis) may be given to start from
+    instead, with any rows it does not cover given their slack or singleton
+    column if they have one, or else an artificial column.
+
+    If the starting basis is infeasible, each basic variable outside its
+    bounds is moved to the bound it broke and an artificial column takes
+    its place, and phase one minimises the sum of the artificial variables
+    in place of the objective.  Once they are all zero they are fixed
+    there and phase two carries on from the feasible basis reached.
+
+    Entering columns are chosen by a strategy from pricing.PRICING, named
+    by pricing or by the method given to pivot().  Partial pricing prices
+    only the slices of columns it looks at.
+
+    Needs scipy for the sparse LU."""
+
+    def __init__(self, problem, float_tolerance=0.00001, refactor_interval=REFACTOR_INTERVAL, basis=None, crash=True,
+                 pricing="lowest"):
+
+        if scipy is None:
+            raise ImportError("The revised simplex engine needs scipy")
+
+        self.float_tolerance   = float_tolerance
+        self.refactor_interval = refactor_interval
+        self.status            = None   # "optimal", "unbounded", "infeasible" or "numerical trouble" once known
+        self.pivots            = 0
+        self.refactorisations  = 0
+        self.phase             = 2
+        self.phase_one_costs   = None
+        self.entering          = None   # Names of the variables moved by the last pivot
+        self.leaving           = None
+        self._chosen           = None   # (strategy, column) that optimal() priced, for pivot() to take
+
+        symbols          = problem.symbols
+        constraints      = list(problem.constraints.values())
+        self.columns     = list(symbols)
+        self.row_names   = [constraint.name for constraint in constraints]
+        self.rhs         = np.array([constraint.constant for constraint in constraints], dtype=np.float64)
+        self.objective_column = symbols.index[ir.OBJECTIVE_VARIABLE_NAME]
+
+        indptr, indices, data = problem.matrix.select_rows([c.expression.row for c in constraints])
+        matrix = scipy.sparse.csr_matrix((data, indices, indptr), shape=(len(constraints), len(symbols))).tocsc()
+        matrix.eliminate_zeros()
+
+        columns, values = problem.matrix.row(problem.objective.expression.row)
+        self.costs = np.zeros(len(symbols))
+        self.costs[columns] = values
+        self.costs[self.objective_column] = 0.0
+
+        self.lower, self.upper = relaxed_bounds(symbols)
+        for column in np.flatnonzero(self.lower > self.upper).tolist():
+            logger.info("*** Bounds of %s cannot be met: %s > %s", self.columns[column].name, self.lower[column],
+                        self.upper[column])
+            self.status = "infeasible"
+
+        slack = (symbols.flags & ir.FLAG_SLACK) != 0
+        start = self._warm_basis(matrix, basis, symbols.index) if basis is not None else None
+        self.matrix = self._initial_basis(matrix, slack, start, crash)
+        try:
+            self._refactor()
+        except RuntimeError:
+            logger.info("*** Starting basis is singular, so starting from a crash basis instead")
+            self.matrix = self._initial_basis(matrix, slack, crash=crash)
+            self._refactor()
+        self._reduced = None
+        self._duals   = None
+
+        self._check_start()
+        self.pricing = get_pricing(pricing, self)
+
+    def optimal(self):
+        """Check the reduced costs for a non-basic variable that can move in a
+        direction that improves the objective"""
+
+        self._chosen = (self.pricing, self.pricing.choose())
+        return self._chosen[1] is None
+
+    def _entering(self):
+        """The column optimal() chose, if the strategy is the same and the
+        engine has not pivoted since, or else a fresh choice"""
+
+        chosen, self._chosen = self._chosen, None
+        if chosen is not None and chosen[0] is self.pricing and chosen[1] is not None:
+            return chosen[1]
+        return self.pricing.choose()
+
+    def pivot(self, method):
+        """method names the pricing strategy, one of pricing.PRICING:
+
+        lowest --- selects the most extreme value
+        bland --- implement's bland's rule
+        devex --- devex reference weights
+        steepest --- steepest edge
+        partial --- partial pricing
+        """
+
+        if method != self.pricing.name:
+            self.pricing = get_pricing(method, self)
+        column    = self._entering()
+        direction = 1 if self._reduced_costs(slice(column, column + 1))[0] < 0 else -1
+        name      = self._name(column)
+
+        logger.debug("Selected %s to %s from %s", name, "increase" if direction > 0 else "decrease",
+                     STATUS_NAMES[self.status_array[column]])
+        alpha = self._ftran(self._column(column))
+        step, row, bound = self._ratio_test(alpha, column, direction, self.pricing.bland)
+        self.entering, self.leaving = name, None
+        if step == float("+infinity"):
+            if self.phase == 1:
+                # Phase one's objective is bounded, so a ray there is the factors losing accuracy:
+                # refactorise and price again, or give up if they are fresh
+                if self.etas:
+                    logger.info("*** %s appears to move without limit in phase one, refactorising", name)
+                    self._refactor()
+                    self._reduced = self._duals = None
+                    return
+                logger.info("*** %s appears to move without limit in phase one, which a bounded objective rules "
+                            "out, so the basis is too ill-conditioned to go on", name)
+                self.status = "numerical trouble"
+                return
+            logger.info("*** %s can improve the objective without limit", name)
+            self.status = "unbounded"
+            return
+
+        # Move every basic variable along with the entering one
+        self.values -= alpha * (direction * step)
+        self._reduced = self._duals = None
+
+        if row is None:
+            logger.debug("Flipping %s to its %s bound", name, STATUS_NAMES[bound])
+            self.status_array[column] = bound
+        else:
+            value = self._nonbasic_values()[column] + direction * step
+            self.leaving = self._name(self.basis[row])
+            logger.debug("%s leaves the basis at its %s bound (step: %s)", self.leaving, STATUS_NAMES[bound], step)
+            self._replace(row, column, alpha, value, bound)
+
+        if self.phase == 1:
+            self._check_phase_one()
+
+    def get_basis(self):
+        """Return the current basis, by name, to start another solve from"""
+
+        names   = [var.name for var in self.columns]
+        rows    = {}
+        for name, column in zip(self.row_names, self.basis.tolist()):
+            if column < len(names):
+                rows[name] = names[column]
+        columns = {name: STATUS_NAMES.get(status, "basic")
+                   for name, status in zip(names, self.status_array[:len(names)].tolist())}
+        return ir.Basis(rows, columns)
+
+    def get_reduced_costs(self):
+        """Return the reduced cost of each variable, by name, as the rate the
+        objective variable changes as it increases (see ir.Solution)"""
+
+        if self.phase == 2:
+            reduced = self._reduced_costs()
+        else:
+            reduced = self.costs - self.matrix.T @ self._btran(self.costs[self.basis])
+        return self._by_name([var.name for var in self.columns], -reduced[:len(self.columns)])
+
+    def get_duals(self):
+        """Return the dual value of each row, by name, as the rate the
+        objective variable changes as the row's constant increases"""
+
+        duals = self.duals() if self.phase == 2 else self._btran(self.costs[self.basis])
+        return self._by_name(self.row_names, -duals)
+
+    def _by_name(self, names, values):
+        values = np.where(np.abs(values) < self.float_tolerance, 0.0, values)
+        return dict(zip(names, values.tolist()))
+
+    @stats.timed("pivot")
+    def _replace(self, row, column, alpha, value, bound):
+        """Make column basic in place of the row's basic column, which
+        leaves at the given bound, updating the factors"""
+
+        self.pricing.update(column, row, alpha)
+
+        # An artificial variable is not let back in once it has left
+        leaving = self.basis[row]
+        if leaving >= len(self.columns):
+            self.upper[leaving] = 0.0
+
+        self.status_array[leaving] = bound
+        self.status_array[column] = BASIC
+        self.basis[row]  = column
+        self.values[row] = value
+        self.pivots     += 1
+        self._reduced    = self._duals = None
+
+        if len(self.etas) >= self.refactor_interval:
+            self._refactor()
+        else:
+            others = np.flatnonzero(alpha)
+            others = others[others != row]
+            self.etas.append((row, alpha[row], others, alpha[others]))
+
+    def duals(self):
+        """Return the dual price of each constraint row, for the phase one
+        costs while phase one lasts"""
+
+        if self._duals is None:
+            self._duals = self._btran(self._pricing_costs()[self.basis])
+        return self._duals
+
+    def progress(self):
+        """The objective being maximised and the primal and dual
+        infeasibility, as for solve.Iteration"""
+
+        values = self._nonbasic_values()
+        values[self.basis] = self.values
+        basic  = self.basis
+        primal = (np.maximum(self.lower[basic] - self.values, 0.0) +
+                  np.maximum(self.values - self.upper[basic], 0.0)).sum()
+        if self.phase == 1:
+            primal += self._infeasibility()
+        dual = np.abs(self._reduced_costs()[self._eligible()]).sum()
+        return -float(self._pricing_costs() @ values), float(primal), float(dual)
+
+    def _pricing_costs(self):
+        return self.phase_one_costs if self.phase == 1 else self.costs
+
+    def _reduced_costs(self, columns=None):
+        """Reduced costs of all columns, or of a slice of them"""
+
+        if columns is not None:
+            if self._reduced is not None:
+                return self._reduced[columns]
+
+            # Straight from the slice's entries, which are contiguous by column
+            start, stop, _ = columns.indices(self.matrix.shape[1])
+            indptr = self.matrix.indptr
+            first, last = indptr[start], indptr[stop]
+            owners   = np.repeat(np.arange(stop - start), np.diff(indptr[start:stop + 1]))
+            products = np.bincount(owners, self.matrix.data[first:last] * self.duals()[self.matrix.indices[first:last]],
+                                   minlength=stop - start)
+            return self._pricing_costs()[columns] - products
+        if self._reduced is None:
+            self._reduced = self._pricing_costs() - self.matrix.T @ self.duals()
+        return self._reduced
+
+    def _eligible(self, columns=None):
+        """Mask of non-basic columns (of all, or the given slice) whose
+        reduced cost improves the objective in a direction they can move in"""
+
+        costs   = self._reduced_costs(columns)
+        columns = slice(None) if columns is None else columns
+        status  = self.status_array[columns]
+        return ((status != BASIC) & (self.upper[columns] > self.lower[columns]) &
+                (((costs < -self.float_tolerance) & (status != AT_UPPER)) |
+                 ((costs > self.float_tolerance) & (status != AT_LOWER))))
+
+    def _tableau_row(self, row):
+        """Row of B^-1 A"""
+
+        unit = np.zeros(len(self.basis))
+        unit[row] = 1.0
+        return self.matrix.T @ self._btran(unit)
+
+    def _column_products(self, vector):
+        """Dot product of each column of B^-1 A with vector"""
+
+        return self.matrix.T @ self._btran(vector)
+
+    def _column_norms(self):
+        """Squared norm of each column of B^-1 A, solved for in blocks of
+        columns"""
+
+        norms = np.zeros(self.matrix.shape[1])
+        for start in range(0, len(norms), NORM_BLOCK_COLUMNS):
+            block = self._ftran(self.matrix[:, start:start + NORM_BLOCK_COLUMNS].toarray())
+            norms[start:start + NORM_BLOCK_COLUMNS] = np.einsum("ij,ij->j", block, block)
+        return norms
+
+    def _row_norms(self):
+        """Squared norm of each row of B^-1, solved for in blocks of rows"""
+
+        rows  = len(self.basis)
+        norms = np.zeros(rows)
+        for start in range(0, rows, NORM_BLOCK_COLUMNS):
+            block = np.zeros((rows, min(NORM_BLOCK_COLUMNS, rows - start)))
+            block[np.arange(start, start + block.shape[1]), np.arange(block.shape[1])] = 1.0
+            block = self._btran(block)
+            norms[start:start + block.shape[1]] = np.einsum("ij,ij->j", block, block)
+        return norms
+
+    @stats.timed("ratio_test")
+    def _ratio_test(self, alpha, column, direction, bland=False):
+        """Find how far the entering column can move, as dense.DenseTableau
+        does, given its column of the tableau"""
+
+        basic = self.basis
+        alpha = alpha * direction
+        lower, upper = self.lower[basic], self.upper[basic]
+
+        falling = (alpha > self.float_tolerance) & np.isfinite(lower)
+        rising  = (alpha < -self.float_tolerance) & np.isfinite(upper)
+        limits  = np.full(len(basic), np.inf)
+        limits[falling] = (self.values[falling] - lower[falling]) / alpha[falling]
+        limits[rising]  = (upper[rising] - self.values[rising]) / -alpha[rising]
+        limits[falling | rising] = np.maximum(limits[falling | rising], 0.0)
+
+        flip = self.upper[column] - self.lower[column]
+        if not (falling | rising).any() or flip <= limits.min():
+            return flip, None, AT_UPPER if direction > 0 else AT_LOWER
+
+        ties = np.flatnonzero(limits <= limits.min() + self.float_tolerance)
+        if bland:
+            chosen = ties[np.argmin(basic[ties])]
+        else:
+            chosen = ties[np.argmax(np.abs(alpha[ties]))]
+
+        return float(limits[chosen]), int(chosen), AT_LOWER if falling[chosen] else AT_UPPER
+
+    def _initial_basis(self, matrix, slack, start=None, crash=True):
+        """Choose a basic column for each row, adding artificial columns
+        fixed at zero to rows left without one, and return the matrix with
+        any artificial columns on the end.
+
+        start, if given, is a pair of arrays (basic column or -1 by row,
+        status by column) to begin from, as made by _warm_basis."""
+
+        rows, columns = matrix.shape[0], len(self.columns)
+        self.lower, self.upper, self.costs = self.lower[:columns], self.upper[:columns], self.costs[:columns]
+
+        if start is not None:
+            self.basis, self.status_array = start
+
+            # Slacks first, then other singletons, each taking the first free row
+            counts     = np.diff(matrix.indptr)
+            singletons = np.flatnonzero(counts == 1)
+            singletons = singletons[singletons != self.objective_column]
+            for candidates in (singletons[slack[singletons]], singletons[~slack[singletons]]):
+                for column in candidates.tolist():
+                    row = matrix.indices[matrix.indptr[column]]
+                    if self.basis[row] < 0 and self.status_array[column] != BASIC:
+                        self.basis[row] = column
+                        self.status_array[column] = BASIC
+        else:
+            self.basis        = np.full(rows, -1, dtype=np.int64)
+            self.status_array = self._resting_status()
+
+            residual = self.rhs - matrix @ self._nonbasic_values()
+            allowed  = self.status_array != BASIC
+            if not crash:
+                allowed &= slack
+            by_row = matrix.tocsr()
+            for row, column in crash_basis(by_row.indptr, by_row.indices, by_row.data, residual,
+                                           self.lower, self.upper, slack, allowed, self.float_tolerance):
+                self.basis[row] = column
+                self.status_array[column] = BASIC
+
+        # Artificial variables, fixed at zero, for the rest
+        empty = np.flatnonzero(self.basis < 0)
+        self.artificial_rows = empty
+        if len(empty):
+            artificial  = scipy.sparse.csc_matrix((np.ones(len(empty)), (empty, np.arange(len(empty)))),
+                                                  shape=(rows, len(empty)))
+            matrix      = scipy.sparse.hstack([matrix, artificial], format="csc")
+            self.basis[empty] = np.arange(columns, columns + len(empty))
+            self.lower  = np.concatenate((self.lower, np.zeros(len(empty))))
+            self.upper  = np.concatenate((self.upper, np.zeros(len(empty))))
+            self.costs  = np.concatenate((self.costs, np.zeros(len(empty))))
+            self.status_array = np.concatenate((self.status_array, np.full(len(empty), BASIC, dtype=np.int8)))
+
+        return matrix
+
+    def _warm_basis(self, matrix, basis, index):
+        """Map a Basis, which may come from a different version of the
+        problem, onto this one's rows and columns.
+
+        Columns keep their status where their bounds still allow it.  Rows
+        and columns that no longer exist are ignored, and rows that are new,
+        or whose basic column is gone, are left for _initial_basis to
+        fill."""
+
+        status = self._resting_status()
+        for name, column_status in basis.columns.items():
+            column = index.get(name)
+            if column is None or column == self.objective_column:
+                continue
+            if column_status == "upper" and np.isfinite(self.upper[column]):
+                status[column] = AT_UPPER
+            elif column_status == "lower" and np.isfinite(self.lower[column]):
+                status[column] = AT_LOWER
+
+        counts = np.diff(matrix.indptr)
+        rows   = np.full(matrix.shape[0], -1, dtype=np.int64)
+        for row, name in enumerate(self.row_names):
+            column = index.get(basis.rows.get(name))
+            if (column is not None and column != self.objective_column and counts[column] > 0
+                    and status[column] != BASIC):
+                rows[row] = column
+                status[column] = BASIC
+
+        return rows, status
+
+    def _resting_status(self):
+        """Status of each column with none basic, at a finite bound if any"""
+
+        status = np.where(np.isfinite(self.lower), AT_LOWER,
+                          np.where(np.isfinite(self.upper), AT_UPPER, FREE)).astype(np.int8)
+        status[self.objective_column] = BASIC   # Never priced; its value follows from the costs
+        return status
+
+    def _check_start(self):
+        """Start phase one if the starting basis is infeasible.
+
+        Each basic variable outside its bounds rests at the bound it broke
+        instead, and is replaced in the basis by an artificial column equal
+        to its own, signed so that the artificial variable starts
+        non-negative, which leaves the basis just as easy to factorise.  An
+        artificial variable already in the basis, but not at zero, has its
+        column's sign set the same way."""
+
+        bad = np.flatnonzero((self.values < self.lower[self.basis] - self.float_tolerance) |
+                             (self.values > self.upper[self.basis] + self.float_tolerance))
+        if not len(bad):
+            return
+
+        columns, matrix = len(self.columns), self.matrix
+        rows, copies, signs = [], [], []
+        for row in bad.tolist():
+            column, value = self.basis[row], self.values[row]
+            logger.info("*** Starting basis is infeasible: %s = %s, outside [%s, %s]", self._name(column), value,
+                        self.lower[column], self.upper[column])
+            if column >= columns:
+                if value < 0:
+                    matrix.data[matrix.indptr[column]:matrix.indptr[column + 1]] *= -1.0
+                continue
+            below = value < self.lower[column]
+            self.status_array[column] = AT_LOWER if below else AT_UPPER
+            rows.append(row)
+            copies.append(column)
+            signs.append(1.0 if value > (self.lower[column] if below else self.upper[column]) else -1.0)
+
+        if rows:
+            first = matrix.shape[1]
+            added = len(rows)
+            self.matrix = scipy.sparse.hstack([matrix, matrix[:, copies] @ scipy.sparse.diags(signs)], format="csc")
+            self.basis[rows] = np.arange(first, first + added)
+            self.artificial_rows = np.concatenate((self.artificial_rows, rows))
+            self.lower  = np.concatenate((self.lower, np.zeros(added)))
+            self.upper  = np.concatenate((self.upper, np.zeros(added)))
+            self.costs  = np.concatenate((self.costs, np.zeros(added)))
+            self.status_array = np.concatenate((self.status_array, np.full(added, BASIC, dtype=np.int8)))
+
+        # Every artificial variable may grow in phase one, at a cost
+        self.upper[columns:] = np.inf
+        self.phase_one_costs = np.zeros(self.matrix.shape[1])
+        self.phase_one_costs[columns:] = 1.0
+        self.phase = 1
+        self._refactor()
+        self._reduced = self._duals = None
+
+        logger.info("Phase one: %d artificial variables, infeasibility %s", self.matrix.shape[1] - columns,
+                    self._infeasibility())
+        self._check_phase_one()
+
+    def _check_phase_one(self):
+        """End phase one once the artificial variables are all zero, or
+        report the problem infeasible if they cannot be made so"""
+
+        infeasibility = self._infeasibility()
+        if infeasibility > self.float_tolerance:
+            if not self._eligible().any():
+                logger.info("*** Phase one cannot remove the last %s of infeasibility", infeasibility)
+                self.status = "infeasible"
+            return
+
+        logger.info("Phase one complete, the basis is feasible")
+        self.upper[len(self.columns):] = 0.0
+        self.phase    = 2
+        self._reduced = self._duals = None
+
+    def _infeasibility(self):
+        """The sum of the artificial variables"""
+
+        return float(self.values[self.basis >= len(self.columns)].sum())
+
+    @stats.timed("factorise")
+    def _refactor(self):
+        """Factorise the basis afresh, dropping the eta factors, and
+        recompute the values of the basic variables"""
+
+        if len(self.basis):
+            self.lu = scipy.sparse.linalg.splu(self.matrix[:, self.basis].tocsc())
+        self.etas = []
+        self.refactorisations += 1
+
+        nonbasic    = self._nonbasic_values()
+        self.values = self._ftran(self.rhs - self.matrix @ nonbasic)
+
+    def _ftran(self, vector):
+        """Solve B x = vector"""
+
+        if not len(self.basis):
+            return vector
+        result = self.lu.solve(vector)
+        for row, pivot, others, values in self.etas:
+            result[row] /= pivot
+            result[others] -= np.multiply.outer(values, result[row])
+        return result
+
+    def _btran(self, vector):
+        """Solve B^T x = vector"""
+
+        if not len(self.basis):
+            return vector
+        vector = vector.copy()
+        for row, pivot, others, values in reversed(self.etas):
+            vector[row] = (vector[row] - values @ vector[others]) / pivot
+        return self.lu.solve(vector, trans="T")
+
+    def _column(self, column):
+        """Return a column of the matrix as a dense vector"""
+
+        matrix = self.matrix
+        start, end = matrix.indptr[column], matrix.indptr[column + 1]
+        vector = np.zeros(matrix.shape[0])
+        vector[matrix.indices[start:end]] = matrix.data[start:end]
+        return vector
+
+    def _nonbasic_values(self):
+        """Values of the non-basic columns, with zero for basic ones"""
+
+        status = self.status_array
+        return np.where(status == AT_LOWER, self.lower, np.where(status == AT_UPPER, self.upper, 0.0))
+
+    def _name(self, column):
+        if column < len(self.columns):
+            return self.columns[column].name
+        return f"_a_{self.row_names[self.artificial_rows[column - len(self.columns)]]}"
+
+    def get_result(self):
+        """Extract values from the basis"""
+
+        values = self._nonbasic_values()
+        values[self.basis] = self.values
+        objective = -float(self.costs @ values)
+        values = values[:len(self.columns)]
+        values[self.objective_column] = objective
+        values[np.abs(values) < self.float_tolerance] = 0
+
+        return dict(zip(self.columns, values.tolist()))
+
+    def summarise(self):
+
+        CELL_WIDTH = 20
+
+        print(f"{len(self.basis)} rows, {self.matrix.shape[1]} columns and {self.matrix.nnz} non-zeroes; "
+              f"{self.pivots} pivots, {self.refactorisations} factorisations, {len(self.etas)} eta factors")
+        if self.phase == 1:
+            print(f"Phase one, infeasibility {self._infeasibility()}")
+        print("|".join(["expression".rjust(CELL_WIDTH), "basic".rjust(CELL_WIDTH), "value".rjust(CELL_WIDTH)]))
+        for name, column, value in zip(self.row_names, self.basis.tolist(), self.values.tolist()):
+            print("|".join([name.rjust(CELL_WIDTH), self._name(column).rjust(CELL_WIDTH), f"{value}".rjust(CELL_WIDTH)]))
+
+        at_upper = [self._name(column) for column in np.flatnonzero(self.status_array == AT_UPPER).tolist()]
+        if at_upper:
+            print(f"At upper bound: {', '.join(at_upper)}")
@@ -0,0 +1,136 @@
+import time
+import numpy as np
+from . import ir
+
+
+class Scaler:
+    """Scales the rows and columns of a problem in standard form so that its
+    coefficients are close to one, and maps solutions back.
+
+    Row i is multiplied by r[i] and column j by c[j], so that the scaled
+    problem's variables are x[j] / c[j].  The factors are found by a few
+    geometric mean passes, each dividing rows and then columns by the
+    square root of their largest and smallest coefficients, followed by
+    an equilibration pass that makes the largest coefficient of each row
+    and column one.  Factors are rounded to powers of two, so scaling
+    itself loses no precision.
+
+    Slack variables are scaled with their row so that they keep a unit
+    coefficient, and integer variables (binary or general) and the
+    objective variable are left as they are.  The objective row is not scaled, so the objective value
+    is unchanged."""
+
+    def __init__(self, problem, passes=4):
+
+        self.problem = problem
+        self.passes  = passes
+
+        self.row_scale    = None    # By matrix row
+        self.column_scale = None    # By column
+        self.range_before = None    # (smallest, largest) coefficient in magnitude
+        self.range_after  = None
+        self.elapsed      = 0.0
+
+    def scale(self):
+        """Scale the problem in place, returning it"""
+
+        start   = time.perf_counter()
+        problem = self.problem
+        symbols = problem.symbols
+
+        constraints = list(problem.constraints.values())
+        rows        = np.array([c.expression.row for c in constraints], dtype=np.int64)
+        indptr, columns, values = problem.matrix.select_rows(rows)
+        entry_rows  = np.repeat(np.arange(len(rows), dtype=np.int64), np.diff(indptr))
+
+        # Only structural columns are scaled by the passes
+        fixed   = (symbols.flags & (ir.FLAG_SLACK | ir.INTEGER_FLAGS)) != 0
+        keep    = (values != 0) & ~fixed[columns]
+        e_rows, e_columns, magnitudes = entry_rows[keep], columns[keep], np.abs(values[keep])
+
+        r = np.ones(len(rows))
+        c = np.ones(len(symbols))
+        if len(magnitudes):
+            self.range_before = (float(magnitudes.min()), float(magnitudes.max()))
+
+            for _ in range(self.passes):
+                largest, smallest = _extremes(magnitudes * r[e_rows] * c[e_columns], e_rows, len(r))
+                r /= np.sqrt(largest * smallest)
+                largest, smallest = _extremes(magnitudes * r[e_rows] * c[e_columns], e_columns, len(c))
+                c /= np.sqrt(largest * smallest)
+
+            r /= _extremes(magnitudes * r[e_rows] * c[e_columns], e_rows, len(r))[0]
+            c /= _extremes(magnitudes * r[e_rows] * c[e_columns], e_columns, len(c))[0]
+
+            r = np.exp2(np.round(np.log2(r)))
+            c = np.exp2(np.round(np.log2(c)))
+            c[fixed] = 1.0
+
+            scaled = magnitudes * r[e_rows] * c[e_columns]
+            self.range_after = (float(scaled.min()), float(scaled.max()))
+
+        # Slacks follow their row
+        slack = (symbols.flags[columns] & ir.FLAG_SLACK) != 0
+        c[columns[slack]] = 1.0 / r[entry_rows[slack]]
+
+        self.row_scale    = np.ones(problem.matrix.rows)
+        self.row_scale[rows] = r
+        self.column_scale = c
+
+        self._apply(self.row_scale, self.column_scale)
+
+        self.elapsed = time.perf_counter() - start
+        return problem
+
+    def unscale(self, solution):
+        """Restore the problem to its unscaled form and map a solution of
+        the scaled problem to it"""
+
+        self._apply(1.0 / self.row_scale, 1.0 / self.column_scale)
+
+        variable_values = {}
+        for var, value in list(solution.variables.items()) + list(solution.slack_variables.items()):
+            variable_values[var] = value * float(self.column_scale[var.index])
+
+        # The objective is not scaled, so rates scale inversely to their variable or row constant
+        reduced_costs = duals = None
+        if solution.reduced_costs is not None:
+            index = self.problem.symbols.index
+            reduced_costs = {name: cost / float(self.column_scale[index[name]])
+                             for name, cost in solution.reduced_costs.items()}
+        if solution.duals is not None:
+            rows  = {constraint.name: constraint.expression.row for constraint in self.problem.constraints.values()}
+            duals = {name: dual * float(self.row_scale[rows[name]]) for name, dual in solution.duals.items()}
+
+        return ir.Solution(self.problem, variable_values, solution.optimal, solution.objective, solution.status,
+                           solution.basis, reduced_costs, duals)
+
+    def _apply(self, row_scale, column_scale):
+        problem = self.problem
+        problem.matrix.scale(row_scale, column_scale)
+        for constraint in problem.constraints.values():
+            constraint.constant *= float(row_scale[constraint.expression.row])
+        problem.symbols.lower_bounds[:] /= column_scale
+        problem.symbols.upper_bounds[:] /= column_scale
+
+    def summarise(self):
+        if self.range_before is None:
+            print("Nothing to scale")
+            return
+        print(f"Scaled coefficients from [{self.range_before[0]:g}, {self.range_before[1]:g}] "
+              f"to [{self.range_after[0]:g}, {self.range_after[1]:g}] ({self.elapsed:.3f}s)")
+
+
+def _extremes(magnitudes, groups, count):
+    """Return the largest and smallest magnitude in each group, with one for
+    groups that have none"""
+
+    largest  = np.zeros(count)
+    smallest = np.full(count, np.inf)
+    np.maximum.at(largest, groups, magnitudes)
+    np.minimum.at(smallest, groups, magnitudes)
+
+    empty = largest == 0
+    largest[empty]  = 1.0
+    smallest[empty] = 1.0
+    return largest, smallest
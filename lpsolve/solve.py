@@ -1,86 +1,313 @@
+import functools, time
+import numpy as np
+from . import ir, log, stats
+from .branch import BranchAndBound
+from .crash import crash_basis
+from .cuts import CuttingPlanes
+from .heuristics import PrimalHeuristics
+from .dense import DenseTableau, relaxed_bounds
+from .pricing import PRICING
+from .revised import RevisedSimplex
+from .dual import DualSimplex
+from .interior import InteriorPoint
+from .log import logger
+
+# Iterations allowed in each LP solve, including every node and cut round, by default
+ITERATION_LIMIT = 10000
+
+def solve(problem, iteration_limit, heuristic="lowest", engine="tableau", basis=None, branching="fractional",
+          relax=False, processes=1, deterministic=False, cuts=0, tree_cuts=0, heuristics=(), crossover=False,
+          normal_equations="auto", callback=None):
+    """Solve the problem!
+
+    engine selects the tableau implementation, one of ENGINES, and
+    heuristic its pricing strategy, one of pricing.PRICING (the tableau
+    engine has only lowest and bland).  Engines that can (revised and dual)
+    start from basis, the basis of an earlier solution, if given.  The
+    interior engine solves its normal equations by normal_equations, one
+    of interior.NORMAL_EQUATIONS, and moves to a vertex with the heuristic
+    pricing if crossover is True.
+
+    A problem with integer variables is solved by branch and bound, with
+    branching one of branch.BRANCHING, and iteration_limit applying to
+    each node's relaxation, unless relax is True, when only its LP
+    relaxation is solved.  processes and deterministic are as for
+    BranchAndBound.  cuts rounds of cutting planes tighten the relaxation
+    first, and cover cuts are also found at nodes up to tree_cuts deep
+    (see cuts.CuttingPlanes).  The tableau engine cannot give the rows
+    Gomory cuts are made from, so the dense engine solves the LPs of the
+    cut rounds in its place.  heuristics names the primal heuristics, from
+    heuristics.HEURISTICS, to look for integer solutions with before and
+    during the search.
+
+    The solution's objective, reduced costs and dual values are in the
+    sense of the objective as given to to_standard_form, maximised or
+    minimised, and the objective includes its constant offset.
+
+    callback, if given, is called with an Iteration after every pivot of an
+    LP solve (not of the relaxations branch and bound solves).  Progress is
+    reported through log.logger; see log.configure."""
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}")
+    supported = getattr(ENGINES[engine], "PRICING", PRICING)
+    if heuristic not in supported:
+        raise ValueError(f"The {engine} engine supports {', '.join(supported)} pricing, not '{heuristic}'")
+    if basis is not None and not _warm_starts(engine):
+        raise ValueError(f"The {engine} engine cannot start from a basis")
+    options = {"crossover": crossover, "normal_equations": normal_equations} if engine == "interior" else {}
+
+    if not relax and ((problem.symbols.flags & ir.INTEGER_FLAGS) != 0).any():
+        planes = None
+        if cuts > 0 or tree_cuts > 0:
+            cut_engine = engine if hasattr(ENGINES[engine], "_tableau_row") else "dense"
+            planes  = CuttingPlanes(problem, functools.partial(_run, iteration_limit=iteration_limit,
+                                                               heuristic=heuristic, engine=cut_engine,
+                                                               options=options if cut_engine == engine else {}),
+                                    cuts, tree_cuts)
+            problem, cut_basis = planes.run(basis)
+            if cut_engine == engine:
+                basis = cut_basis
+
+        relaxation = functools.partial(_solve_relaxation, iteration_limit=iteration_limit, heuristic=heuristic,
+                                       engine=engine, options=options)
+        search = BranchAndBound(problem, relaxation, branching, processes=processes, deterministic=deterministic,
+                                cuts=planes if tree_cuts > 0 else None,
+                                heuristics=PrimalHeuristics(problem, relaxation, heuristics) if heuristics else None)
+        solution = search.solve(basis)
+        return _as_given(problem, planes.restore(solution) if planes is not None else solution)
+
+    logger.info("Building initial tableau")
+    start   = time.perf_counter()
+    tableau = _build(problem, heuristic, engine, basis, options)
+    log.dump(tableau.summarise)
 
-from copy import copy
-from . import ir
+    itcount = 0
+    looping = time.perf_counter()
+    while tableau.status is None and not tableau.optimal() and itcount < iteration_limit:
+        itcount += 1
+        logger.debug("Iteration: %d/%d", itcount, iteration_limit)
+        tableau.pivot(heuristic)
+        log.dump(tableau.summarise)
+        if callback is not None:
+            callback(Iteration(itcount, tableau, time.perf_counter() - start))
+    stats.add("iterations", time.perf_counter() - looping, itcount)
+
+    if tableau.status is None and tableau.optimal():
+        tableau.status = "optimal"
+    logger.info("%d iterations in %.3fs with '%s' pricing", itcount, time.perf_counter() - start, heuristic)
+
+    if tableau.status == "optimal":
+        logger.info("*** Exited in optimal condition")
+    elif tableau.status is not None:
+        logger.info("*** Exited with the problem found %s", tableau.status)
+    else:
+        logger.info("*** Exited in sub-optimal condition due to another stop condition")
+    return _as_given(problem, _solution(problem, tableau))
 
-def solve(problem, iteration_limit, heuristic="lowest"):
-    """Solve the problem!"""
 
-    print(f"Building initial tableau")
-    tableau = Tableau(problem)
-    tableau.summarise()
+def _solve_relaxation(problem, basis, iteration_limit, heuristic, engine, options=None):
+    """Solve a branch and bound node's LP relaxation quietly, starting from
+    basis where the engine can"""
 
-    itcount = 0
-    while not tableau.optimal() and itcount < iteration_limit:
-        itcount += 1
-        print("")
-        print(f"Iteration: {itcount}/{iteration_limit}")
-        print(f"----------------")
+    solution = _solution(problem, _run(problem, basis, iteration_limit, heuristic, engine, options), False)
+    if not _warm_starts(engine):
+        solution.basis = None   # Of no use to the next node
+    return solution
 
-        print(f"Finding pivot value")
-        tableau.pivot(heuristic)
 
-        print(f"Resulting tableau")
-        tableau.summarise()
+def _run(problem, basis, iteration_limit, heuristic, engine, options=None):
+    """Solve a problem's LP relaxation quietly, returning the tableau"""
 
-    if tableau.optimal():
-        print(f"*** Exited in optimal condition")
-    else:
-        print(f"*** Exited in sub-optimal condition due to another stop condition")
-    variable_values = tableau.get_result()
+    with log.quiet():
+        tableau = _build(problem, heuristic, engine, basis if _warm_starts(engine) else None, options)
+        itcount = 0
+        looping = time.perf_counter()
+        while tableau.status is None and not tableau.optimal() and itcount < iteration_limit:
+            itcount += 1
+            tableau.pivot(heuristic)
+        stats.add("iterations", time.perf_counter() - looping, itcount)
+        if tableau.status is None and tableau.optimal():
+            tableau.status = "optimal"
+        return tableau
+
+
+@stats.timed("build")
+def _build(problem, heuristic, engine, basis, options=None):
+    if basis is not None:
+        return ENGINES[engine](problem, basis=basis, pricing=heuristic, **(options or {}))
+    return ENGINES[engine](problem, pricing=heuristic, **(options or {}))
+
+
+def _warm_starts(engine):
+    """Whether the engine can start from a basis"""
 
-    # Strip variables and build a solution object
-    return ir.Solution(problem, variable_values, tableau.optimal())
+    return hasattr(ENGINES[engine], "get_basis") and getattr(ENGINES[engine], "WARM_START", True)
 
 
+def _solution(problem, tableau, sensitivity=True):
+    """Strip variables and build a solution object, with the reduced costs
+    and dual values where the engine gives them, if sensitivity is True"""
 
+    basis = tableau.get_basis() if hasattr(tableau, "get_basis") else None
+    reduced_costs = duals = None
+    if sensitivity and hasattr(tableau, "get_duals"):
+        reduced_costs, duals = tableau.get_reduced_costs(), tableau.get_duals()
+    return ir.Solution(problem, tableau.get_result(), tableau.status == "optimal",
+                       status=tableau.status or "iteration limit", basis=basis, reduced_costs=reduced_costs,
+                       duals=duals)
 
 
+def _as_given(problem, solution):
+    """Turn a solution's objective, reduced costs and dual values from the
+    objective variable's sense, which is maximised, to the sense of the
+    objective as given, and add the objective's constant offset, so that
+    they are the same with or without presolve"""
 
+    sign, offset = problem.objective_sign, problem.objective_offset
+    if sign == 1.0 and offset == 0.0:
+        return solution
 
+    reduced_costs = duals = None
+    if solution.reduced_costs is not None:
+        reduced_costs = {name: sign * cost for name, cost in solution.reduced_costs.items()}
+    if solution.duals is not None:
+        duals = {name: sign * dual for name, dual in solution.duals.items()}
 
+    # Adding zero keeps a zero objective from printing as -0.0
+    return ir.Solution(solution.problem, {**solution.variables, **solution.slack_variables}, solution.optimal,
+                       sign * solution.objective + offset + 0.0, solution.status, solution.basis, reduced_costs,
+                       duals)
+
+
+class Iteration:
+    """The state of a solve after one pivot, as passed to solve()'s callback.
+
+    number --- the iteration, counting from 1
+    entering --- the name of the variable that entered the basis, or was
+                 moved without entering (an interior point step has none)
+    leaving --- the name of the variable that left the basis, None for a
+                bound flip
+    objective --- the objective being maximised, phase one's in phase one
+    primal_infeasibility --- the sum of bound violations and artificial
+                             variables, zero once the basis is feasible
+    dual_infeasibility --- the sum of improving reduced costs, zero at an
+                           optimum
+    elapsed --- seconds since the solve started"""
+
+    __slots__ = ("number", "entering", "leaving", "objective", "primal_infeasibility", "dual_infeasibility",
+                 "elapsed")
+
+    def __init__(self, number, tableau, elapsed):
+
+        self.number   = number
+        self.entering = tableau.entering
+        self.leaving  = tableau.leaving
+        self.objective, self.primal_infeasibility, self.dual_infeasibility = tableau.progress()
+        self.elapsed  = elapsed
+
+    def __repr__(self):
+        return (f"Iteration({self.number}, {self.entering} -> {self.leaving}, objective {self.objective:g}, "
+                f"infeasibility {self.primal_infeasibility:g}/{self.dual_infeasibility:g})")
 
 
 
 class Tableau:
+    """A simplex tableau for a problem in standard form, with variable
+    bounds handled directly rather than as extra rows.
+
+    Each constraint row has one basic variable, whose current value is held
+    in the constant column.  Every other variable is non-basic and sits at
+    its lower bound, its upper bound, or (if free) at zero, as recorded in
+    `nonbasic`.  The objective row holds the reduced costs, with the value
+    of the objective variable in its constant column; that variable stays
+    basic and is maximised.
+
+    An entering variable may be increased from its lower bound or decreased
+    from its upper bound, and a free one moved either way.  The ratio test
+    stops it at the first basic variable to reach a bound, or at its own
+    opposite bound, in which case it flips between bounds without a pivot.
+
+    The initial basis is chosen by crash.crash_basis (or, if crash is
+    False, from slack variables alone).  Rows it leaves without a basic
+    variable, or whose basic variable starts outside its bounds, are given
+    an Artificial variable, and phase one maximises minus their sum with
+    its own objective row before phase two starts from the feasible basis
+    that leaves.  If the artificial variables cannot all be brought to
+    zero the problem is infeasible.
+
+    `basis` and `nonbasic` are updated at every pivot, so the solution,
+    the basis and the reduced costs are read from them and the objective
+    row without searching the table for unit columns.
+
+    Only the lowest and bland pricing strategies are implemented here, and
+    pricing only checks that the one to be used is one of them."""
 
     CONSTANT_KEY  = "__const__"
+    PHASE_ONE_KEY = "phase one"
+    PRICING       = ("lowest", "bland")
+    WARM_START    = False   # get_basis gives a basis, but one cannot be started from
 
-    def __init__(self, problem, float_tolerance=0.00001):
+    def __init__(self, problem, float_tolerance=0.00001, crash=True, pricing="lowest"):
 
+        if pricing not in Tableau.PRICING:
+            raise ValueError(f"Unknown pivot heuristic '{pricing}', expected one of {', '.join(Tableau.PRICING)}")
         self.float_tolerance = float_tolerance
         self.table           = {}
-        self.table_columns   = []     # Cache.  Delete if not needed.
-        self.objective_key   = problem.objective
-
-
-        # Rows correspond to constraint functions
+        self.objective_key   = problem.objective   # The row being maximised, which phase one replaces
+        self.status          = None     # "optimal", "unbounded" or "infeasible" once known
+        self.phase           = 2
+        self.artificial_rows = []
+        self.entering        = None     # Names of the variables moved by the last pivot
+        self.leaving         = None
+
+        # Rows correspond to constraint functions, filled from the sparse
+        # row of each so that only non-zero coefficients are looked up
+        variables            = list(problem.symbols)
+        self.variables       = variables
+        self.table_columns   = variables + [Tableau.CONSTANT_KEY]
+        self.slack_variables = {}       # Row -> its slack variable, whose reduced cost is its dual value
         for constraint in list(problem.constraints.values()) + [problem.objective]:
-            # Loop over variables and find their coefficients in the constraints
-            self.table[constraint] = {}
-            for var in problem.symbols.table.values():
-                self.table[constraint][var] = constraint.expression.find_coefficient_for_variable(var, default=0)
-
-                # Keep an in-order record of the variables seen so we can traverse later
-                if var not in self.table_columns:
-                    self.table_columns.append(var)
+            self.table[constraint] = dict.fromkeys(variables, 0)
+            for coefficient, var in constraint.expression.terms:
+                self.table[constraint][var] = coefficient
+                if var.slack and constraint is not problem.objective:
+                    self.slack_variables[constraint] = var
 
             # Pop the constant on the end
             self.table[constraint][Tableau.CONSTANT_KEY] = constraint.constant
-            if Tableau.CONSTANT_KEY not in self.table_columns:
-                self.table_columns.append(Tableau.CONSTANT_KEY)
 
+        # Bounds, with binary variables relaxed to [0, 1] and strictness ignored
+        self.lower = {}
+        self.upper = {}
+        for var in variables:
+            lower, upper = var.lower_bound, var.upper_bound
+            if var.binary:
+                lower, upper = max(lower, 0.0), min(upper, 1.0)
+            self.lower[var], self.upper[var] = lower, upper
+            if lower > upper:
+                logger.info("*** Bounds of %s cannot be met: %s > %s", var.name, lower, upper)
+                self.status = "infeasible"
+
+        objective_variable = problem.symbols.get(ir.OBJECTIVE_VARIABLE_NAME)
+        self.basis    = {self.objective_key: objective_variable}   # Row -> basic variable
+        self.nonbasic = {}                                         # Variable -> "lower", "upper" or "free"
+        for var in variables:
+            if var != objective_variable:
+                self.nonbasic[var] = self._resting_bound(var)
+
+        self._initial_basis(problem, crash)
+        self._add_artificials()
+
+    @stats.timed("pricing")
     def optimal(self):
         """Compute optimality by checking the final (objective function)
-        row for any values below zero.
+        row for a non-basic variable that can move in a direction that
+        improves the objective.
 
         """
 
-        for var in self.table_columns:
-            value = self.table[self.objective_key][var]
-            if value < 0:
-                return False
-
-        return True
+        return next(self._candidates(), None) is None
 
     def pivot(self, method):
         """
@@ -89,99 +316,277 @@ class Tableau:
         """
 
         if method == "lowest":
-            var, constraint = self._find_pivot_lowest()
+            var, direction = self._find_entering_lowest()
         elif method == "bland":
-            var, constraint = self._find_pivot_bland()
-
-        self._pivot(var, constraint)
+            var, direction = self._find_entering_bland()
+        else:
+            raise ValueError(f"Unknown pivot heuristic '{method}'")
 
-    def _find_pivot_bland(self):
-        """Find the pivot using bland's rule"""
+        logger.debug("Selected %s to %s from %s", var.name, "increase" if direction > 0 else "decrease",
+                     self.nonbasic[var])
+        step, constraint, bound = self._ratio_test(var, direction, method == "bland")
+        self.entering, self.leaving = var.name, None
 
-        for var, val in self.table[self.objective_key].items():
-            print(f"VAR {var if isinstance(var, str) else var.name} = {val}")
-            # Take leftmost TODO: check if this needs an error-tolerant float check
-            if val < 0:
-                print(f"Found pivot var ({var.name} = {val}) < 0")
-                pivot_var = var
-                break
-        print(f"Selected {pivot_var.name} to enter basis")
+        if step == float("+infinity"):
+            logger.info("*** %s can improve the objective without limit", var.name)
+            self.status = "unbounded"
+            return
 
-        # Find indicator by dividing by constant
-        pivot_val        = float("+infinity")
-        pivot_constraint = None
-        for key in self.table.keys():
-            if not isinstance(key, str):
-                val = self.table[key][Tableau.CONSTANT_KEY] / self.table[key][pivot_var] if self.table[key][pivot_var] != 0 else float("+infinity")
-                # print(f"CONST {self.table[key][Tableau.CONSTANT_KEY]} / {self.table[key][pivot_var]} = {val}")
-                # Smallest non-negative indicator
-                if val > 0 and val < pivot_val:
-                    print(f"Found improved pivot 0 <= {val} < {pivot_val}")
-                    pivot_constraint = key
-                    pivot_val = self.table[key][pivot_var]
-
-        return (pivot_var, pivot_constraint)
-
-    def _find_pivot_lowest(self):
-        """Find the pivot using the 'lowest value' heuristic,
-        which can cause cycling"""
-
-        smallest_objective_value = None
-        pivot_var                = None
-        for var, val in self.table[self.objective_key].items():
-            print(f"[ {var} ] = {val}")
-            if smallest_objective_value is None or val < smallest_objective_value:
-                smallest_objective_value = float(val)
-                pivot_var = var
-        print(f"Pivot var (col) in objective: {pivot_var} ({smallest_objective_value})")
-
-        # Find indicator by dividing by constant
-        pivot_val = None
-        lowest_val = None
-        pivot_constraint = None
+        # Move every basic variable along with the entering one
         for key in self.table.keys():
-            if not isinstance(key, str):
-                val = self.table[key][Tableau.CONSTANT_KEY] / self.table[key][pivot_var] if self.table[key][pivot_var] != 0 else float("+infinity")
-                # print(f" ==> {self.table[key][Tableau.CONSTANT_KEY]} / {self.table[key][pivot_var]} = {val}")
-                if lowest_val is None or (val < lowest_val and val > 0):
-                    lowest_val       = val
-                    pivot_constraint = key
-                    pivot_val        = self.table[key][pivot_var]
-        print(f"Pivot constraint (row) in objective: {pivot_constraint.name} ({pivot_val})")
-
-        return (pivot_var, pivot_constraint)
-
-
-    def _pivot(self, pivot_var, pivot_constraint):
-        print(f"Pivoting around row [{pivot_constraint}], col [{pivot_var}] (value: {self.table[pivot_constraint][pivot_var]})")
+            self.table[key][Tableau.CONSTANT_KEY] -= self.table[key][var] * direction * step
+
+        if constraint is None:
+            logger.debug("Flipping %s to its %s bound", var.name, bound)
+            self.nonbasic[var] = bound
+        else:
+            leaving = self.basis[constraint]
+            self.leaving = leaving.name
+            logger.debug("%s leaves the basis at its %s bound (step: %s)", self.leaving, bound, step)
+            value = self._value(var) + direction * step
+
+            self._pivot(var, constraint)
+            del self.nonbasic[var]
+            self.nonbasic[leaving]  = bound
+            self.basis[constraint] = var
+            self.table[constraint][Tableau.CONSTANT_KEY] = value
+
+            # An artificial variable is not let back in once it has left
+            if isinstance(leaving, Artificial):
+                self.upper[leaving] = 0.0
+
+        if self.phase == 1:
+            self._check_phase_one()
+
+    def progress(self):
+        """The objective being maximised and the primal and dual
+        infeasibility, as for Iteration"""
+
+        objective = self.table[self.objective_key][Tableau.CONSTANT_KEY]
+        primal    = 0.0
+        for constraint, var in self.basis.items():
+            if constraint is self.objective_key or constraint is self._objective_row():
+                continue
+            value   = self.table[constraint][Tableau.CONSTANT_KEY]
+            primal += max(self.lower[var] - value, 0.0) + max(value - self.upper[var], 0.0)
+            if isinstance(var, Artificial):
+                primal += value
+        return objective, primal, sum(abs(cost) for _, _, cost in self._candidates())
+
+    def _candidates(self):
+        """Yield each non-basic variable that would improve the objective,
+        with the direction it should move in and its reduced cost"""
+
+        objective = self.table[self.objective_key]
+        for var, status in self.nonbasic.items():
+            cost = objective[var]
+            if cost < -self.float_tolerance and status != "upper" and self.upper[var] > self.lower[var]:
+                yield var, 1, cost
+            elif cost > self.float_tolerance and status != "lower" and self.upper[var] > self.lower[var]:
+                yield var, -1, cost
+
+    @stats.timed("pricing")
+    def _find_entering_bland(self):
+        """Find the entering variable using bland's rule: the first that
+        improves the objective"""
+
+        return min(((var, direction) for var, direction, _ in self._candidates()), key=lambda c: c[0].index)
+
+    @stats.timed("pricing")
+    def _find_entering_lowest(self):
+        """Find the entering variable using the 'lowest value' heuristic,
+        the largest reduced cost in magnitude (the first of any ties), which
+        can cause cycling"""
+
+        var, direction, cost = max(self._candidates(), key=lambda c: (abs(c[2]), -c[0].index))
+        logger.debug("Pivot var (col) in objective: %s (%s)", var.name, cost)
+
+        return var, direction
+
+    @stats.timed("ratio_test")
+    def _ratio_test(self, var, direction, bland=False):
+        """Find how far the entering variable can move, and what stops it.
+
+        Returns the step, the row whose basic variable leaves (None for a
+        bound flip or an unbounded step) and the bound the leaving variable
+        ends at.  Limits within tolerance of the smallest are ties, which
+        are broken by the largest pivot element, or with Bland's rule by
+        the lowest index of leaving variable.  The entering variable flips
+        if its own range is no larger than every limit."""
+
+        limits = []
+        for key, basic in self.basis.items():
+            if key is self.objective_key:
+                continue
+            alpha = self.table[key][var] * direction
+            value = self.table[key][Tableau.CONSTANT_KEY]
+            if alpha > self.float_tolerance and self.lower[basic] != float("-infinity"):
+                limit, limit_bound = (value - self.lower[basic]) / alpha, "lower"
+            elif alpha < -self.float_tolerance and self.upper[basic] != float("+infinity"):
+                limit, limit_bound = (self.upper[basic] - value) / -alpha, "upper"
+            else:
+                continue
+            limits.append((max(limit, 0.0), key, limit_bound, abs(alpha), basic.index))
 
-        new_table = self._copy_table_vals(self.table)
+        flip = self.upper[var] - self.lower[var]
+        if not limits or flip <= min(limit[0] for limit in limits):
+            return flip, None, "upper" if direction > 0 else "lower"
 
-        # Create pivot row with unit values
-        for var in self.table_columns:
-            new_table[pivot_constraint][var] = self.table[pivot_constraint][var] * (1.0 / self.table[pivot_constraint][pivot_var])
+        least = min(limit[0] for limit in limits)
+        ties  = [limit for limit in limits if limit[0] <= least + self.float_tolerance]
+        if bland:
+            step, constraint, bound, _, _ = min(ties, key=lambda limit: limit[4])
+        else:
+            step, constraint, bound, _, _ = max(ties, key=lambda limit: limit[3])
 
-        # Populate column in new table with zeroes
-        for constraint in self.table.keys():
-            if constraint != pivot_constraint:
-                new_table[constraint][pivot_var] = 0
+        return step, constraint, bound
 
-        # Populate other rows
-        for constraint in self.table.keys():
-            for var in self.table_columns:
-                if constraint != pivot_constraint and var != pivot_var:      # Avoid pivot row and pivot column
+    @stats.timed("pivot")
+    def _pivot(self, pivot_var, pivot_constraint, include_constant=False):
+        """Pivot around a row and column, eliminating the column from every
+        other row.  The constant column holds values rather than right hand
+        sides once the basis is built, so is left alone unless asked"""
 
-                    neg_val_in_old_tab_pivot_col = -1 * self.table[constraint][pivot_var]
-                    val_in_new_tab_pivot_row     = new_table[pivot_constraint][var]
-                    old_tab_val                  = self.table[constraint][var]
+        logger.debug("Pivoting around row [%s], col [%s] (value: %s)", pivot_constraint, pivot_var,
+                     self.table[pivot_constraint][pivot_var])
 
-                    new_val = neg_val_in_old_tab_pivot_col * val_in_new_tab_pivot_row + old_tab_val
-                    new_table[constraint][var] = new_val
-                    # print(f"[{isinstance(constraint, str) or constraint.name}][{isinstance(var, str) or var.name}] --> {neg_val_in_old_tab_pivot_col} * {val_in_new_tab_pivot_row} + {old_tab_val} = {new_val}")
-
-        # Mutate self
-        self.table = new_table
+        columns = self.table_columns if include_constant else self.table_columns[:-1]
 
+        # Create pivot row with unit values
+        pivot_row = self.table[pivot_constraint]
+        scale     = 1.0 / pivot_row[pivot_var]
+        for var in columns:
+            pivot_row[var] *= scale
+        pivot_row[pivot_var] = 1.0
+
+        # Populate other rows, skipping those already clear of the column
+        for constraint, row in self.table.items():
+            factor = row[pivot_var]
+            if constraint is pivot_constraint or factor == 0:
+                continue
+            for var in columns:
+                row[var] -= factor * pivot_row[var]
+            row[pivot_var] = 0
+
+    def _initial_basis(self, problem, crash=True):
+        """Choose a basic variable for as many rows as crash.crash_basis
+        will and set the constant column to the values of the basic
+        variables"""
+
+        symbols     = problem.symbols
+        constraints = list(problem.constraints.values())
+        indptr, indices, data = problem.matrix.select_rows([c.expression.row for c in constraints])
+
+        residual = [self.table[constraint][Tableau.CONSTANT_KEY] -
+                    sum(coefficient * self._value(var) for coefficient, var in constraint.expression.terms
+                        if var in self.nonbasic)
+                    for constraint in constraints]
+        lower, upper = relaxed_bounds(symbols)
+        slack   = (symbols.flags & ir.FLAG_SLACK) != 0
+        allowed = np.array([var in self.nonbasic for var in self.variables], dtype=bool)
+        if not crash:
+            allowed &= slack
+
+        for row, column in crash_basis(indptr, indices, data, np.array(residual, dtype=np.float64), lower, upper,
+                                       slack, allowed, self.float_tolerance):
+            constraint, var = constraints[row], self.variables[column]
+            if not (var.slack and self.table[constraint][var] == 1):
+                self._pivot(var, constraint, include_constant=True)
+            self.basis[constraint] = var
+            del self.nonbasic[var]
+
+        # Basic values follow from the non-basic ones
+        for constraint, row in self.table.items():
+            row[Tableau.CONSTANT_KEY] -= sum(row[var] * self._value(var) for var in self.nonbasic if row[var] != 0)
+
+    def _add_artificials(self):
+        """Put an artificial variable in each row that has no basic variable
+        or whose basic variable is outside its bounds, which then rests at
+        the bound it broke, and start phase one if any are needed"""
+
+        needed = []
+        for constraint, row in self.table.items():
+            if constraint is self.objective_key:
+                continue
+            basic    = self.basis.get(constraint)
+            residual = row[Tableau.CONSTANT_KEY]
+            if basic is not None:
+                if self.lower[basic] - self.float_tolerance <= residual <= self.upper[basic] + self.float_tolerance:
+                    continue
+                logger.info("*** Starting basis is infeasible: %s = %s, outside [%s, %s]", basic.name, residual,
+                            self.lower[basic], self.upper[basic])
+                self.nonbasic[basic] = "lower" if residual < self.lower[basic] else "upper"
+                residual -= self._value(basic)
+
+            # Signed so that the artificial variable starts non-negative
+            if residual < 0:
+                for var in self.table_columns:
+                    row[var] = -row[var]
+            row[Tableau.CONSTANT_KEY] = abs(residual)
+            needed.append(constraint)
+
+        if not needed:
+            return
+
+        # One column per artificial variable, and the phase one objective row
+        # with them priced out
+        artificials = [Artificial(f"_a_{constraint.name}", len(self.variables) + i) for i, constraint in enumerate(needed)]
+        for row in self.table.values():
+            row.update(dict.fromkeys(artificials, 0))
+        for constraint, var in zip(needed, artificials):
+            self.table[constraint][var] = 1.0
+            self.basis[constraint] = var
+            self.lower[var], self.upper[var] = 0.0, float("+infinity")
+        self.table_columns = self.table_columns[:-1] + artificials + [Tableau.CONSTANT_KEY]
+
+        phase_one = dict.fromkeys(self.table_columns, 0)
+        for constraint in needed:
+            for var, coefficient in self.table[constraint].items():
+                if coefficient != 0 and not isinstance(var, Artificial):
+                    phase_one[var] -= coefficient
+        self.artificial_rows = needed
+        self.table[Tableau.PHASE_ONE_KEY] = phase_one
+        self.phase_two_key = self.objective_key
+        self.objective_key = Tableau.PHASE_ONE_KEY
+        self.phase = 1
+
+        logger.info("Phase one: %d artificial variables, infeasibility %s", len(needed), -phase_one[Tableau.CONSTANT_KEY])
+        self._check_phase_one()
+
+    def _check_phase_one(self):
+        """End phase one once the artificial variables are all zero, or
+        report the problem infeasible if they cannot be made so"""
+
+        infeasibility = -self.table[Tableau.PHASE_ONE_KEY][Tableau.CONSTANT_KEY]
+        if infeasibility > self.float_tolerance:
+            if next(self._candidates(), None) is None:
+                logger.info("*** Phase one cannot remove the last %s of infeasibility", infeasibility)
+                self.status = "infeasible"
+            return
+
+        logger.info("Phase one complete, the basis is feasible")
+        del self.table[Tableau.PHASE_ONE_KEY]
+        self.objective_key = self.phase_two_key
+        for var in self.table_columns[len(self.variables):-1]:
+            self.upper[var] = 0.0
+        self.phase = 2
+
+    def _resting_bound(self, var):
+        if self.lower[var] != float("-infinity"):
+            return "lower"
+        if self.upper[var] != float("+infinity"):
+            return "upper"
+        return "free"
+
+    def _value(self, var):
+        """The value of a non-basic variable"""
+
+        status = self.nonbasic[var]
+        if status == "lower":
+            return self.lower[var]
+        if status == "upper":
+            return self.upper[var]
+        return 0.0
 
     def get_result(self):
         """Extract values from the tableau"""
@@ -189,49 +594,56 @@ class Tableau:
         def float_round(x):
             if abs(x) < self.float_tolerance:
                 return 0
-            if abs(x) - 1 < self.float_tolerance:
-                return 1
             return x
 
-        # Lookup table from basic variable to its constraints
-        basic_variables = {}
         optimal_variable_values = {}
-
-        # Basic variables have a single 1 in their column, and all else are zeroes
-        for var in self.table_columns:
-            if not isinstance(var, str):
-                table_constraints_in_order = list(self.table.keys())
-                column = [float_round(self.table[constraint][var]) for constraint in table_constraints_in_order]
-                # print(f"VAR: {var}.  Column: {column}")
-                if sum([x == 1 for x in column]) == 1 and sum([x == 0 for x in column]) == (len(column) - 1):
-                    # print(f"Basic!")
-                    basic_variables[var] = table_constraints_in_order[column.index(1)]
-                    optimal_variable_values[var] = self.table[table_constraints_in_order[column.index(1)]][Tableau.CONSTANT_KEY]
-                else:
-                    optimal_variable_values[var] = 0
+        for var in self.variables:
+            optimal_variable_values[var] = float_round(self._value(var)) if var in self.nonbasic else 0
+        for constraint, var in self.basis.items():
+            if not isinstance(var, Artificial):
+                optimal_variable_values[var] = float_round(self.table[constraint][Tableau.CONSTANT_KEY])
 
         return optimal_variable_values
 
 
-    def _copy_table_vals(self, table):
-        """A mix of shallow and deep copy that retains keys but copies values and structure"""
 
-        new_table = {}
-        for k1, v1 in table.items():
-            new_table[k1] = {}
-            for k2, v2 in v1.items():
-                new_table[k1][k2] = copy(v2)
+    def get_basis(self):
+        """Return the current basis, by name, as RevisedSimplex.get_basis
+        does"""
+
+        objective = self._objective_row()
+        rows      = {constraint.name: var.name for constraint, var in self.basis.items()
+                     if constraint is not objective and not isinstance(var, Artificial)}
+        columns   = {var.name: self.nonbasic.get(var, "basic") for var in self.variables}
+        return ir.Basis(rows, columns)
+
+    def get_reduced_costs(self):
+        """Return the reduced cost of each variable, by name, from the
+        objective row (see ir.Solution)"""
 
-        return new_table
+        objective = self.table[self._objective_row()]
+        return {var.name: -objective[var] if var in self.nonbasic and abs(objective[var]) >= self.float_tolerance
+                else 0.0 for var in self.variables}
 
+    def get_duals(self):
+        """Return the dual value of each row with a slack variable, by name,
+        from the slack's entry in the objective row"""
 
+        objective = self.table[self._objective_row()]
+        return {constraint.name: objective[var] if abs(objective[var]) >= self.float_tolerance else 0.0
+                for constraint, var in self.slack_variables.items()}
+
+    def _objective_row(self):
+        """The key of the problem's objective row, in either phase"""
+
+        return self.phase_two_key if self.phase == 1 else self.objective_key
 
     def summarise(self):
 
         CELL_WIDTH = 20
 
         # Start by printing the var names
-        out = ["expression".rjust(CELL_WIDTH)]
+        out = ["expression".rjust(CELL_WIDTH), "basic".rjust(CELL_WIDTH)]
         for var in self.table_columns:
             if isinstance(var, str):
                 out.append(var.rjust(CELL_WIDTH))
@@ -248,6 +660,8 @@ class Tableau:
                 out.append(constraint.rjust(CELL_WIDTH))
             else:
                 out.append(constraint.name.rjust(CELL_WIDTH))
+            basic = self.basis.get(constraint)
+            out.append((basic.name if basic is not None else "").rjust(CELL_WIDTH))
 
             # Then mine the internal table for coefficients
             for var in self.table_columns:
@@ -255,8 +669,30 @@ class Tableau:
 
             print("|".join(out))
 
+        at_upper = [var.name for var, status in self.nonbasic.items() if status == "upper"]
+        if at_upper:
+            print(f"At upper bound: {', '.join(at_upper)}")
+
+
+class Artificial:
+    """An artificial variable, added by Tableau for phase one.  Has the
+    attributes of ir.Variable that the tableau uses"""
+
+    slack  = False
+    binary = False
 
+    def __init__(self, name, index):
 
+        self.name  = name
+        self.index = index
 
+    def __repr__(self):
+        return self.name
 
 
+# Tableau implementations selectable by solve(); they make the same choices
+ENGINES = {"tableau":  Tableau,
+           "dense":    DenseTableau,
+           "revised":  RevisedSimplex,
+           "dual":     DualSimplex,
+           "interior": InteriorPoint}
@@ -0,0 +1,130 @@
+import contextlib, functools, json, time, tracemalloc
+
+# The Stats being collected, or None when profiling is off.  Timed functions
+# check this and nothing else when it is None, so profiling costs one extra
+# call per timed call while disabled
+_current = None
+
+
+class Stats:
+    """Timings and peak memory collected while profiling is enabled.
+
+    timers --- name -> [calls, seconds] for each timed() function, where
+               the seconds include the time of anything it calls
+    phases --- name -> [seconds, peak bytes] for each phase() in turn
+    running --- timers entered and not yet left, so that a timed function
+                calling another with the same name is counted once
+    elapsed --- seconds from enable() to disable()
+    peak --- the most memory allocated at once, in bytes, as traced by
+             tracemalloc
+
+    Only the calling process is measured; branch and bound nodes solved
+    by worker processes are not counted."""
+
+    def __init__(self):
+
+        self.timers  = {}
+        self.phases  = {}
+        self.running = set()
+        self.start   = time.perf_counter()
+        self.elapsed = None
+        self.peak    = 0
+        self.tracing = not tracemalloc.is_tracing()    # Whether tracing was started for these
+
+    def add(self, name, seconds, calls=1):
+        timer = self.timers.setdefault(name, [0, 0.0])
+        timer[0] += calls
+        timer[1] += seconds
+
+    def finish(self):
+        """Note the total time and the peak memory, before tracing stops"""
+
+        self.elapsed = time.perf_counter() - self.start
+        self.peak    = max([peak for _, peak in self.phases.values()] + [tracemalloc.get_traced_memory()[1]])
+
+    def report(self):
+        """The statistics, once finished, as a dict of plain values ready
+        for JSON.  pivots_per_second is over the time spent in iterations,
+        counting bound flips as pivots"""
+
+        calls, seconds = self.timers.get("iterations", (0, 0.0))
+        return {"total_seconds": self.elapsed,
+                "peak_memory": self.peak,
+                "phases": {name: {"seconds": seconds, "peak_memory": peak}
+                           for name, (seconds, peak) in self.phases.items()},
+                "timers": {name: {"calls": calls, "seconds": seconds}
+                           for name, (calls, seconds) in sorted(self.timers.items())},
+                "iterations": calls,
+                "pivots_per_second": calls / seconds if seconds > 0 else None}
+
+    def write(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.report(), f, indent=2)
+            f.write("\n")
+
+
+def enable():
+    """Start collecting statistics, tracing memory allocations with
+    tracemalloc, and return the Stats they are collected in"""
+
+    global _current
+    _current = Stats()
+    if _current.tracing:
+        tracemalloc.start()
+    return _current
+
+
+def disable():
+    """Stop collecting statistics, returning those collected"""
+
+    global _current
+    stats, _current = _current, None
+    if stats is not None:
+        stats.finish()
+        if stats.tracing:
+            tracemalloc.stop()
+    return stats
+
+
+def timed(name):
+    """Decorate a function to count its calls and their time under name
+    while statistics are being collected"""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def timed_func(*args, **kwargs):
+            stats = _current
+            if stats is None or name in stats.running:
+                return func(*args, **kwargs)
+            stats.running.add(name)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.add(name, time.perf_counter() - start)
+                stats.running.discard(name)
+        return timed_func
+    return decorate
+
+
+def add(name, seconds, calls=1):
+    """Count calls taking seconds in all under name, if collecting"""
+
+    if _current is not None:
+        _current.add(name, seconds, calls)
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Time a stage of the command line's work, and the peak memory
+    allocated during it, if collecting"""
+
+    if _current is None:
+        yield
+        return
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current.phases[name] = [time.perf_counter() - start, tracemalloc.get_traced_memory()[1]]
@@ -0,0 +1,283 @@
+import re
+from decimal import Decimal
+from . import ir
+from .log import logger
+from .parser import TOKEN_PATTERNS
+
+# Longest line to write in LP files before wrapping an expression
+LP_LINE_LENGTH = 255
+
+# Names the LP parser will read back as a single identifier
+LP_IDENTIFIER_PATTERN = re.compile(dict(TOKEN_PATTERNS)["identifier"])
+
+MPS_NAME_LENGTH   = 8
+MPS_NUMBER_LENGTH = 12
+
+
+def write_lp_file(problem, filename):
+    """Write a problem to a CPLEX LP format file"""
+
+    with open(filename, "w") as fout:
+        write_lp(problem, fout)
+
+def write_mps_file(problem, filename, fixed=False):
+    """Write a problem to a free (or, with fixed=True, fixed) format MPS file"""
+
+    with open(filename, "w") as fout:
+        write_mps(problem, fout, fixed)
+
+
+def write_lp(problem, fout):
+    """Write a problem to a file object in CPLEX LP format.
+
+    A problem that has been through to_standard_form is written without
+    its objective variable, as the equivalent objective it stands for."""
+
+    terms, maximise, offset = _objective(problem)
+    variables = _variables(problem)
+    for var in variables:
+        _check_lp_name(var.name)
+    if offset != 0:
+        logger.warning("The objective's constant offset of %s cannot be read back from LP format, "
+                       "so is left out", offset)
+
+    fout.write(f"\\ Written by lpsolve\n")
+    fout.write("Maximize\n" if maximise else "Minimize\n")
+    name = problem.objective.name if problem.objective is not None else "obj"
+    _check_lp_name(name)
+    fout.write(_lp_expression(f" {name}:", terms, variables, ""))
+
+    fout.write("Subject To\n")
+    for name, constraint in problem.constraints.items():
+        _check_lp_name(name)
+        relation = _relation(constraint)
+        tail     = f" {relation} {_signed_lp_number(constraint.constant)}"
+        fout.write(_lp_expression(f" {name}:", constraint.expression.terms, variables, tail))
+
+    fout.write("Bounds\n")
+    for var in variables:
+        lower = "<" if var.lower_strict else "<="
+        upper = "<" if var.upper_strict else "<="
+        if var.lower_bound == float("-infinity") and var.upper_bound == float("+infinity"):
+            fout.write(f" {var.name} free\n")
+        elif var.fixed_value():
+            fout.write(f" {var.name} = {_signed_lp_number(var.lower_bound)}\n")
+        elif var.upper_bound == float("+infinity"):
+            if var.lower_bound != 0 or var.lower_strict:
+                fout.write(f" {var.name} {lower.replace('<', '>')} {_signed_lp_number(var.lower_bound)}\n")
+        elif var.lower_bound == 0 and not var.lower_strict:
+            fout.write(f" {var.name} {upper} {_signed_lp_number(var.upper_bound)}\n")
+        else:
+            # Each bound starts with the name, as a line starting with a
+            # negative number would be read as continuing the one before
+            fout.write(f" {var.name} {lower.replace('<', '>')} {_signed_lp_number(var.lower_bound)}\n")
+            fout.write(f" {var.name} {upper} {_signed_lp_number(var.upper_bound)}\n")
+
+    generals = [var for var in variables if var.integer and not var.binary]
+    if generals:
+        fout.write("General\n")
+        for var in generals:
+            fout.write(f" {var.name}\n")
+
+    binaries = [var for var in variables if var.binary]
+    if binaries:
+        fout.write("Binaries\n")
+        for var in binaries:
+            fout.write(f" {var.name}\n")
+
+    fout.write("End\n")
+
+
+def write_mps(problem, fout, fixed=False):
+    """Write a problem to a file object in free (or, with fixed=True,
+    fixed) MPS format.
+
+    Integer variables are written inside MARKER INTORG blocks, which mark
+    general integers, with binary ones also given a BV bound and the
+    bounds of general integer ones given as LI and UI.  MPS has no strict
+    inequalities, so these are written as non-strict."""
+
+    terms, maximise, offset = _objective(problem)
+    variables       = _variables(problem)
+    objective_name  = _unique_name(problem.objective.name if problem.objective is not None else "obj",
+                                   problem.constraints)
+    line            = _fixed_mps_line if fixed else _free_mps_line
+
+    for name in [objective_name] + list(problem.constraints.keys()) + [var.name for var in variables]:
+        _check_mps_name(name, fixed)
+
+    # Read the matrix by column, naming each row by its constraint
+    row_names = {c.expression.row: name for name, c in problem.constraints.items()}
+    if problem.objective is not None:
+        row_names[problem.objective_expression().row] = objective_name
+    columns = {}
+    for var in variables:
+        rows, values = problem.matrix.column(var.index)
+        columns[var.name] = [(row_names[row], value) for row, value in zip(rows.tolist(), values.tolist())
+                             if row in row_names]
+
+    fout.write("NAME          lpsolve\n")
+    if maximise:
+        fout.write("OBJSENSE\n    MAX\n")
+
+    fout.write("ROWS\n")
+    fout.write(line("N", objective_name))
+    for name, constraint in problem.constraints.items():
+        sense = "E" if isinstance(constraint, ir.Equation) else ("G" if constraint.greater_than else "L")
+        fout.write(line(sense, name))
+
+    fout.write("COLUMNS\n")
+    integer = False
+    for var in variables:
+        if var.integer != integer:
+            integer = var.integer
+            fout.write(line("", "MARKER", "'MARKER'", "", "'INTORG'" if integer else "'INTEND'"))
+
+        entries = columns[var.name] or [(objective_name, 0.0)]
+        for i in range(0, len(entries), 2):
+            fields = ["", var.name]
+            for row, value in entries[i:i+2]:
+                fields += [row, _mps_number(value, fixed)]
+            fout.write(line(*fields))
+    if integer:
+        fout.write(line("", "MARKER", "'MARKER'", "", "'INTEND'"))
+
+    fout.write("RHS\n")
+    if offset != 0:
+        fout.write(line("", "RHS", objective_name, _mps_number(-offset, fixed)))
+    for name, constraint in problem.constraints.items():
+        if constraint.constant != 0:
+            fout.write(line("", "RHS", name, _mps_number(constraint.constant, fixed)))
+
+    fout.write("BOUNDS\n")
+    for var in variables:
+        lower, upper = var.lower_bound, var.upper_bound
+        general      = var.integer and not var.binary
+        if var.binary:
+            # BV sets [0, 1], which tighter bounds then override
+            fout.write(line("BV", "BND", var.name))
+            if lower > 0:
+                fout.write(line("LO", "BND", var.name, _mps_number(lower, fixed)))
+            if upper < 1:
+                fout.write(line("UP", "BND", var.name, _mps_number(upper, fixed)))
+        elif lower == float("-infinity") and upper == float("+infinity"):
+            fout.write(line("FR", "BND", var.name))
+        elif lower == upper and not general:
+            fout.write(line("FX", "BND", var.name, _mps_number(lower, fixed)))
+        else:
+            if lower == float("-infinity"):
+                fout.write(line("MI", "BND", var.name))
+            elif lower != 0 or general:
+                fout.write(line("LI" if general else "LO", "BND", var.name, _mps_number(lower, fixed)))
+            if upper != float("+infinity"):
+                fout.write(line("UI" if general else "UP", "BND", var.name, _mps_number(upper, fixed)))
+
+                # Readers take a negative upper bound alone to mean unbounded below
+                if upper < 0 and lower == 0 and not general:
+                    fout.write(line("LO", "BND", var.name, _mps_number(lower, fixed)))
+
+    fout.write("ENDATA\n")
+
+
+def _objective(problem):
+    """Return the objective terms, sense and constant offset of a problem.
+
+    to_standard_form turns the objective into an equation with an extra
+    objective variable, so this is dropped to give the objective it
+    stands for, with the offset in that objective's sense."""
+
+    offset = problem.objective_offset
+    if isinstance(problem.objective, ir.Equation):
+        offset *= -problem.objective_sign
+    if problem.objective is None:
+        return [], problem.maximise, offset
+    terms = problem.objective_expression().terms
+    return [(c, var) for c, var in terms if var.name != ir.OBJECTIVE_VARIABLE_NAME], problem.maximise, offset
+
+def _variables(problem):
+    return [var for var in problem.symbols if var.name != ir.OBJECTIVE_VARIABLE_NAME]
+
+def _relation(constraint):
+    if isinstance(constraint, ir.Equation):
+        return "="
+    relation = ">" if constraint.greater_than else "<"
+    return relation if constraint.strict else f"{relation}="
+
+def _check_lp_name(name):
+    if not LP_IDENTIFIER_PATTERN.fullmatch(name) or name.startswith("free"):
+        raise ValueError(f"'{name}' cannot be written as a CPLEX LP identifier")
+
+def _unique_name(name, taken):
+    """Return name, or if it is taken, the first of name_1, name_2 and so
+    on that is not.  MPS rows share one namespace, so an objective named
+    like a constraint (both may be 'rule_1', for instance) is renamed."""
+
+    unique, count = name, 0
+    while unique in taken:
+        count += 1
+        unique = f"{name}_{count}"
+    return unique
+
+def _check_mps_name(name, fixed):
+    if not name or any(c.isspace() for c in name) or (fixed and len(name) > MPS_NAME_LENGTH):
+        raise ValueError(f"'{name}' cannot be written as a {'fixed' if fixed else 'free'} MPS name")
+
+def _lp_number(x):
+    """Format a non-negative number so that the LP tokeniser can read it,
+    which means without a negative exponent"""
+
+    if x == float("+infinity"):
+        return "inf"
+    string = repr(float(x))
+    if "e" in string:
+        string = format(Decimal(string), "f")
+    if string.endswith(".0"):
+        string = string[:-2]
+    return string
+
+def _signed_lp_number(x):
+    if x == float("+infinity"):
+        return "+inf"
+    if x == float("-infinity"):
+        return "-inf"
+    return f"-{_lp_number(-x)}" if x < 0 else _lp_number(x)
+
+def _lp_expression(label, terms, variables, tail):
+    """Format a labelled expression, wrapping long lines before an operator
+    so that the parser reads the continuation as part of the same phrase"""
+
+    if not terms and variables:
+        terms = [(0.0, variables[0])]
+
+    pieces = []
+    for i, (coefficient, var) in enumerate(terms):
+        sign = "-" if coefficient < 0 else ("+" if i > 0 else "")
+        number = "" if abs(coefficient) == 1 else f"{_lp_number(abs(coefficient))} "
+        pieces.append(f"{sign} {number}{var.name}".lstrip())
+
+    lines = [label]
+    for piece in pieces:
+        if len(lines[-1]) + len(piece) + 1 > LP_LINE_LENGTH:
+            lines.append("  ")
+        lines[-1] += f" {piece}"
+    lines[-1] += tail
+
+    return "\n".join(lines) + "\n"
+
+def _mps_number(x, fixed):
+    string = repr(float(x))
+    if string.endswith(".0"):
+        string = string[:-2]
+    if fixed:
+        digits = MPS_NUMBER_LENGTH
+        while len(string) > MPS_NUMBER_LENGTH:
+            digits -= 1
+            string = f"{x:.{digits}g}"
+    return string
+
+def _free_mps_line(*fields):
+    return f" {fields[0]:<2} {'  '.join(f for f in fields[1:] if f)}\n"
+
+def _fixed_mps_line(*fields):
+    fields = list(fields) + [""] * (6 - len(fields))
+    return f" {fields[0]:<2} {fields[1]:<8}  {fields[2]:<8}  {fields[3]:>12}   {fields[4]:<8}  {fields[5]:>12}".rstrip() + "\n"
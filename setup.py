@@ -142,7 +142,7 @@ setup(
     #
     # For an analysis of "install_requires" vs pip's requirements files see:
     # https://packaging.python.org/en/latest/requirements.html
-    install_requires=[],  # Optional
+    install_requires=['numpy'],  # Optional
 
     # List additional groups of dependencies here (e.g. development
     # dependencies). Users will be able to install these using the "extras"
@@ -155,6 +155,7 @@ setup(
     extras_require={  # Optional
         'dev': [],
         'test': [],
+        'sparse': ['scipy'],
     },
 
     # If there are data files included in your packages that need to be
@@ -0,0 +1,36 @@
+import pytest
+from lpsolve.parser import parse_string
+from lpsolve.presolve import Presolver, to_standard_form
+from lpsolve.scaling import Scaler
+from lpsolve.solve import ITERATION_LIMIT, solve
+
+
+def _solve_problem(problem, presolve=True, scaling=True, engine="tableau", **kwargs):
+    """Solve a problem the way the command line does, returning the
+    solution and a dict of its variable values by name"""
+
+    presolver = None
+    if presolve:
+        presolver = Presolver(problem)
+        problem   = presolver.reduce()
+    problem = to_standard_form(problem)
+    scaler = None
+    if scaling:
+        scaler = Scaler(problem)
+        scaler.scale()
+    solution = solve(problem, ITERATION_LIMIT, engine=engine, **kwargs)
+    if scaler is not None:
+        solution = scaler.unscale(solution)
+    if presolver is not None:
+        solution = presolver.postsolve(solution)
+    return solution, {variable.name: value for variable, value in solution.variables.items()}
+
+
+@pytest.fixture
+def solve_problem():
+    return _solve_problem
+
+
+@pytest.fixture
+def solve_text():
+    return lambda text, **kwargs: _solve_problem(parse_string(text), **kwargs)
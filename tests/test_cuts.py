@@ -0,0 +1,45 @@
+import functools
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+from lpsolve import ir
+from lpsolve.cuts import CuttingPlanes
+from lpsolve.presolve import to_standard_form
+from lpsolve.solve import _run, solve
+
+ENGINES = ["revised", "dual"]
+
+
+def _knapsack(size=20, seed=4):
+    """A random knapsack problem over binary columns, on which some cuts go
+    slack for long enough to be removed"""
+
+    rng  = np.random.default_rng(seed)
+    rows = max(size // 10, 1)
+    A = rng.integers(5, 30, size=(rows, size)).astype(float)
+
+    problem = ir.LPProblem()
+    problem.add_variables([f"x{j}" for j in range(size)], upper_bounds=1.0, binary=True)
+    problem.set_objective_coefficients(A.sum(axis=0) * rng.uniform(0.5, 1.5, size), True)
+    problem.add_constraints(A, "<=", A.sum(axis=1) * rng.uniform(0.3, 0.5, rows))
+    return to_standard_form(problem)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_basis_fits_the_problem_after_cuts_age_out(engine):
+    planes = CuttingPlanes(_knapsack(), functools.partial(_run, iteration_limit=1000, heuristic="lowest",
+                                                          engine=engine))
+    problem, basis = planes.run()
+    assert planes.pool.removed > 0
+    assert set(basis.rows) == {constraint.name for constraint in problem.constraints.values()}
+    assert set(basis.rows.values()) <= set(problem.symbols.index)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_cuts_do_not_change_the_answer(engine):
+    plain = solve(_knapsack(), 1000, engine=engine)
+    cut   = solve(_knapsack(), 1000, engine=engine, cuts=5)
+    assert plain.status == cut.status == "optimal"
+    assert cut.objective == pytest.approx(plain.objective)
@@ -0,0 +1,23 @@
+import pytest
+from lpsolve.heuristics import HEURISTICS
+
+FRACTIONAL_BOUNDS = """\
+Minimize
+ obj: x + y
+Subject To
+ c0: x + y <= 10
+Bounds
+ -1.6 <= y <= 3
+General
+ y
+End
+"""
+
+
+@pytest.mark.parametrize("heuristic", HEURISTICS)
+def test_roundings_stay_within_fractional_bounds(solve_text, heuristic):
+    # Without presolve, which would round the bounds in itself
+    solution, values = solve_text(FRACTIONAL_BOUNDS, presolve=False, heuristics=(heuristic,))
+    assert solution.optimal
+    assert values["y"] == pytest.approx(-1.0)
+    assert solution.objective == pytest.approx(-1.0)
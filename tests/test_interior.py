@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("scipy")
+
+NORMAL_EQUATIONS = ["dense", "sparse", "cg"]
+
+FREE_EQUATION = """\
+Minimize
+ obj: 9 x0 - 4 x1 + 5 x2 + 9 x3
+Subject To
+ c0: 4 x3 <= 17
+ c1: 5 x3 = 20
+ c2: x1 + x2 <= 1
+Bounds
+ x3 free
+End
+"""
+
+FREE_RAY = """\
+Minimize
+ obj: 9 x0 + 2 x1 + 8 x2
+Subject To
+ c0: 3 x0 <= 1
+Bounds
+ x1 free
+ x2 <= 2
+End
+"""
+
+FIXED = """\
+Minimize
+ obj: x0 + x1
+Subject To
+ c0: x0 + x1 <= 10
+Bounds
+ x0 = 3
+ x1 = 4
+End
+"""
+
+
+@pytest.mark.parametrize("normal_equations", NORMAL_EQUATIONS)
+@pytest.mark.parametrize("crossover", [False, True])
+def test_free_equation_is_optimal(solve_text, normal_equations, crossover):
+    solution, values = solve_text(FREE_EQUATION, engine="interior", normal_equations=normal_equations,
+                                  crossover=crossover)
+    assert solution.status == "optimal"
+    assert values["x3"] == pytest.approx(4.0, abs=1e-6)
+    assert values["x1"] == pytest.approx(1.0, abs=1e-6)
+
+
+@pytest.mark.parametrize("normal_equations", NORMAL_EQUATIONS)
+def test_free_ray_is_unbounded(solve_text, normal_equations):
+    solution, _ = solve_text(FREE_RAY, presolve=False, engine="interior", normal_equations=normal_equations)
+    assert solution.status == "unbounded"
+
+
+@pytest.mark.filterwarnings("error")
+def test_fixed_columns_start_cleanly(solve_text):
+    solution, values = solve_text(FIXED, engine="interior")
+    assert solution.status == "optimal"
+    assert values == pytest.approx({"x0": 3.0, "x1": 4.0})
@@ -0,0 +1,88 @@
+import glob, io, os
+import pytest
+from lpsolve.parser import parse_file, parse_mps_string
+from lpsolve.writer import write_mps
+
+SAMPLES = os.path.join(os.path.dirname(__file__), "..", "samples")
+
+# x is a general integer inside a MARKER block, bounded above by 10
+GENERAL_INTEGER = """\
+NAME          test
+OBJSENSE
+    MAX
+ROWS
+ N  obj
+ L  c0
+COLUMNS
+    MARKER                 'MARKER'                 'INTORG'
+    x         obj       1.0        c0        2.0
+    MARKER                 'MARKER'                 'INTEND'
+    y         obj       0.5        c0        1.0
+RHS
+    RHS       c0        15.0
+BOUNDS
+ UP BND       x         10
+ UP BND       y         1
+ENDATA
+"""
+
+
+def test_intorg_columns_are_general_integers(solve_problem):
+    problem = parse_mps_string(GENERAL_INTEGER)
+    x = problem.symbols.get("x")
+    assert x.integer and not x.binary
+
+    solution, values = solve_problem(problem)
+    assert values["x"] == pytest.approx(7.0)
+    assert solution.objective == pytest.approx(7.5)
+
+
+def test_binaries_round_trip():
+    problem = parse_mps_string(GENERAL_INTEGER.replace(" UP BND       x         10", " BV BND       x"))
+    fout = io.StringIO()
+    write_mps(problem, fout)
+    x = parse_mps_string(fout.getvalue()).symbols.get("x")
+    assert x.binary
+
+
+# The RHS on the objective row is minus a constant added to the objective
+OFFSET = """\
+NAME          test
+ROWS
+ N  obj
+ G  c0
+COLUMNS
+    x         obj       2.0        c0        1.0
+RHS
+    RHS       obj       -10.0      c0        3.0
+ENDATA
+"""
+
+
+@pytest.mark.parametrize("presolve", [True, False])
+def test_objective_rhs_is_an_offset(solve_problem, presolve):
+    solution, values = solve_problem(parse_mps_string(OFFSET), presolve=presolve)
+    assert values["x"] == pytest.approx(3.0)
+    assert solution.objective == pytest.approx(16.0)
+
+
+def test_objective_offset_round_trip():
+    fout = io.StringIO()
+    write_mps(parse_mps_string(OFFSET), fout)
+    assert parse_mps_string(fout.getvalue()).objective_offset == pytest.approx(10.0)
+
+
+@pytest.mark.parametrize("filename", sorted(glob.glob(os.path.join(SAMPLES, "*.lp"))), ids=os.path.basename)
+def test_samples_round_trip(solve_problem, filename):
+    problem = parse_file(filename)
+    fout = io.StringIO()
+    write_mps(problem, fout)
+    expected, _ = solve_problem(parse_file(filename))
+    solution, _ = solve_problem(parse_mps_string(fout.getvalue()))
+    assert solution.status == expected.status
+    assert solution.objective == pytest.approx(expected.objective)
+
+
+def test_repeated_row_names_are_rejected():
+    with pytest.raises(ValueError):
+        parse_mps_string(GENERAL_INTEGER.replace(" L  c0", " L  obj"))
@@ -0,0 +1,72 @@
+import pytest
+
+BINARY_SINGLETON = """\
+Minimize
+ obj: -5 x0
+Subject To
+ c0: x0 <= 8
+Binaries
+ x0
+End
+"""
+
+
+@pytest.mark.parametrize("presolve", [True, False])
+def test_binary_bounds_hold(solve_text, presolve):
+    # The singleton row must not loosen the binary's implied upper bound of 1
+    solution, values = solve_text(BINARY_SINGLETON, presolve=presolve)
+    assert solution.optimal
+    assert values["x0"] == pytest.approx(1.0)
+    assert solution.objective == pytest.approx(-5.0)
+
+
+MINIMISE = """\
+Minimize
+ obj: 2 x + 3 y + z
+Subject To
+ c0: x + y >= 4
+ c1: x + 3 y >= 6
+ c2: x + y + z <= 10
+Bounds
+ x <= 3
+End
+"""
+
+
+@pytest.mark.parametrize("engine", ["tableau", "revised"])
+def test_presolve_does_not_change_the_answer(solve_text, engine):
+    with_presolve, _ = solve_text(MINIMISE, engine=engine)
+    without, _ = solve_text(MINIMISE, presolve=False, engine=engine)
+    assert with_presolve.objective == pytest.approx(9.0)
+    assert without.objective == pytest.approx(9.0)
+
+    for name in with_presolve.reduced_costs.keys() & without.reduced_costs.keys():
+        assert with_presolve.reduced_costs[name] == pytest.approx(without.reduced_costs[name], abs=1e-9)
+    for name in with_presolve.duals.keys() & without.duals.keys():
+        assert with_presolve.duals[name] == pytest.approx(without.duals[name], abs=1e-9)
+
+    # Rates are in the minimised objective's sense: moving x off its upper
+    # bound saves 1, and loosening c0 (made '-x - y <= -4') saves 3
+    assert without.reduced_costs["x"] == pytest.approx(-1.0)
+    assert without.duals["_c_c0"] == pytest.approx(-3.0)
+
+
+FRACTIONAL_INTEGER_BOUND = """\
+Maximize
+ obj: x + y
+Subject To
+ c0: x <= 4
+Bounds
+ y <= 2.5
+General
+ y
+End
+"""
+
+
+@pytest.mark.parametrize("presolve", [True, False])
+def test_integer_bounds_are_rounded_in(solve_text, presolve):
+    solution, values = solve_text(FRACTIONAL_INTEGER_BOUND, presolve=presolve)
+    assert solution.optimal
+    assert values["y"] == pytest.approx(2.0)
+    assert solution.objective == pytest.approx(6.0)
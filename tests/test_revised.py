@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("scipy")
+
+from lpsolve.revised import RevisedSimplex
+
+# Needs phase one, for the equation and the >= row
+ARTIFICIAL = """\
+Maximize
+ obj: x0 + 2 x1
+Subject To
+ c0: x0 + x1 = 4
+ c1: x0 - x1 >= 1
+End
+"""
+
+
+def test_phase_one_ray_is_not_unbounded(solve_text, monkeypatch):
+    # Phase one's objective is bounded, so a ray there can only be numerical trouble
+    ratio_test = RevisedSimplex._ratio_test
+
+    def no_limit(self, *args):
+        if self.phase == 1:
+            return float("+infinity"), None, None
+        return ratio_test(self, *args)
+
+    monkeypatch.setattr(RevisedSimplex, "_ratio_test", no_limit)
+    solution, values = solve_text(ARTIFICIAL, engine="revised", presolve=False)
+    assert solution.status == "numerical trouble"
+
+
+def test_artificial_start_is_optimal(solve_text):
+    solution, values = solve_text(ARTIFICIAL, engine="revised", presolve=False)
+    assert solution.status == "optimal"
+    assert values["x0"] == pytest.approx(2.5)
+    assert values["x1"] == pytest.approx(1.5)
@@ -0,0 +1,28 @@
+import io
+from lpsolve.parser import parse_string
+from lpsolve.writer import write_lp
+
+BOUNDED = """\
+Maximize
+ obj: x1 + 2 x2 - x3
+Subject To
+ c0: x1 + x2 + x3 <= 10
+Bounds
+ -5 <= x1 <= 2
+ -3 <= x2 <= 4
+ 1 < x3 <= 6
+End
+"""
+
+
+def _bounds(problem):
+    return {var.name: (var.lower_bound, var.upper_bound, var.lower_strict, var.upper_strict)
+            for var in problem.symbols if not var.slack}
+
+
+def test_lp_round_trip_keeps_negative_lower_bounds():
+    problem = parse_string(BOUNDED)
+    assert _bounds(problem)["x1"] == (-5.0, 2.0, False, False)
+    fout = io.StringIO()
+    write_lp(problem, fout)
+    assert _bounds(parse_string(fout.getvalue())) == _bounds(problem)